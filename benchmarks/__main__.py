@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import json
+import subprocess
+from pathlib import Path
+from typing import Optional
+
+import click
+
+from . import bench_cli, bench_listing, bench_migration  # noqa: F401
+from .registry import BenchmarkResult, compare_runs, result_key, run_benchmarks
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def default_label() -> str:
+    try:
+        return subprocess.run(
+            ["git", "describe", "--tags", "--always", "--dirty"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+@click.group()
+def main() -> None:
+    pass
+
+
+@main.command()
+@click.option("--label", default=None, help="Name of the run, defaults to git describe")
+@click.option("-k", "selection", default=None, help="Only run benchmarks containing this string")
+@click.option("--output", type=click.Path(dir_okay=False, path_type=Path), default=None)
+def run(label: Optional[str], selection: Optional[str], output: Optional[Path]) -> None:
+    label = label or default_label()
+
+    def print_result(result: BenchmarkResult) -> None:
+        key = result_key(result.name, result.param)
+        click.echo(f"{key:<60} median {result.median:10.4f}s  min {result.minimum:10.4f}s")
+
+    benchmark_run = run_benchmarks(label, selection, on_result=print_result)
+    if output is None:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        output = RESULTS_DIR / f"{label}.json"
+    output.write_text(json.dumps(benchmark_run.to_json(), indent=2))
+    click.echo(f"Results written to {output}")
+
+
+@main.command()
+@click.argument("baseline", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.argument("current", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option("--threshold", type=float, default=1.2, show_default=True)
+def compare(baseline: Path, current: Path, threshold: float) -> None:
+    comparisons = compare_runs(json.loads(baseline.read_text()), json.loads(current.read_text()))
+    regressions = 0
+    for comparison in comparisons:
+        regression = comparison.ratio > threshold
+        regressions += regression
+        marker = "REGRESSION" if regression else ""
+        click.echo(
+            f"{comparison.key:<60} {comparison.baseline:10.4f}s -> {comparison.current:10.4f}s"
+            f"  x{comparison.ratio:.2f} {marker}"
+        )
+    if regressions:
+        raise click.ClickException(f"{regressions} benchmarks regressed by more than x{threshold}")
+
+
+if __name__ == "__main__":
+    main()
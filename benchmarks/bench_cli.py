@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import io
+from contextlib import contextmanager, redirect_stderr, redirect_stdout
+from typing import Callable, Iterator
+
+from gitea_github_sync.cli import OUTPUT_FORMATS, print_repositories
+from gitea_github_sync.repository import Repository, Visibility
+from tests.fake_server import FakeServer, generate_state
+
+from .registry import benchmark
+from .sync_harness import run_sync
+
+
+# The output format is explicit: auto-detection picks plain when stdout is redirected
+@benchmark(
+    params=[
+        f"{output_format}-{nb_repos}"
+        for output_format in OUTPUT_FORMATS
+        for nb_repos in (1_000, 10_000)
+    ],
+    repeat=3,
+)
+@contextmanager
+def print_repositories_with_stats(param: str) -> Iterator[Callable[[], object]]:
+    output_format, nb_repos = param.split("-")
+    visibilities = [Visibility.PUBLIC, Visibility.PRIVATE, Visibility.UNKNOWN]
+    repos = [Repository(f"some-team/repo-{i}", visibilities[i % 3]) for i in range(int(nb_repos))]
+
+    def render() -> None:
+        with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()):
+            print_repositories(repos, True, output_format)
+
+    yield render
+
+
+@benchmark(params=[1_000], repeat=3)
+@contextmanager
+def sync_end_to_end(nb_repos: int) -> Iterator[Callable[[], object]]:
+    with FakeServer() as server:
+
+        def sync() -> object:
+            server.state = generate_state(nb_github_repos=nb_repos, nb_mirrored_repos=nb_repos // 2)
+            server.exchanges.clear()
+            result = run_sync(server, [])
+            # A failing or partial sync would be timed as a fast one
+            expected_migrations = nb_repos - nb_repos // 2
+            if result["exit_code"] != 0 or result["migrations"] != expected_migrations:
+                raise RuntimeError(
+                    f"sync exited with {result['exit_code']} after {result['migrations']} "
+                    f"out of {expected_migrations} migrations: {result['stderr']}"
+                )
+            return result
+
+        yield sync
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, cast
+
+from github import Github
+from github.Repository import Repository as GithubRepository
+
+from gitea_github_sync.gitea import Gitea
+from gitea_github_sync.github import list_all_repositories
+from tests.fake_server import FakeServer, generate_state
+
+from .registry import benchmark
+
+
+@benchmark(params=[1_000, 10_000], repeat=3)
+@contextmanager
+def gitea_get_all_pages(nb_repos: int) -> Iterator[Callable[[], object]]:
+    state = generate_state(nb_github_repos=nb_repos, nb_mirrored_repos=nb_repos)
+    with FakeServer(state) as server:
+        gt = Gitea(api_url=server.gitea_api_url, api_token="fake-gitea-token")
+        yield lambda: gt._get_all_pages("/user/repos")
+
+
+class _StaticUser:
+    def __init__(self, repos: List[GithubRepository]) -> None:
+        self.repos = repos
+
+    def get_repos(self) -> List[GithubRepository]:
+        return self.repos
+
+
+class _StaticGithub:
+    def __init__(self, repos: List[GithubRepository]) -> None:
+        self.user = _StaticUser(repos)
+
+    def get_user(self) -> _StaticUser:
+        return self.user
+
+
+@benchmark(params=[1_000, 10_000, 100_000], repeat=3)
+@contextmanager
+def github_list_all_repositories(nb_repos: int) -> Iterator[Callable[[], object]]:
+    gh = Github()
+    raw_repos: List[Dict[str, Any]] = list(generate_state(nb_repos).github_repos.values())
+
+    def list_repositories() -> object:
+        # PyGithub objects are materialized from the raw payload as part of the measurement
+        repos = [gh.create_from_raw_data(GithubRepository, raw) for raw in raw_repos]
+        return list_all_repositories(cast(Github, _StaticGithub(repos)))
+
+    yield list_repositories
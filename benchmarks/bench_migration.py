@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+from gitea_github_sync.migration import (
+    iter_missing_github_repos,
+    list_missing_github_repos,
+)
+from gitea_github_sync.repository import Repository, Visibility
+
+from .registry import benchmark
+
+
+@benchmark(params=[1_000, 10_000, 100_000], repeat=3)
+@contextmanager
+def list_missing_github_repos_half_mirrored(nb_repos: int) -> Iterator[Callable[[], object]]:
+    gh_repos = [Repository(f"some-team/repo-{i}", Visibility.PUBLIC) for i in range(nb_repos)]
+    gitea_repos = [
+        Repository(f"gitea-user/repo-{i}", Visibility.PUBLIC) for i in range(0, nb_repos, 2)
+    ]
+    yield lambda: list_missing_github_repos(gh_repos=gh_repos, gitea_repos=gitea_repos)
+
+
+@benchmark(params=[1_000, 10_000, 100_000], repeat=3)
+@contextmanager
+def iter_missing_github_repos_half_mirrored(nb_repos: int) -> Iterator[Callable[[], object]]:
+    def gh_repos() -> Iterator[Repository]:
+        return (Repository(f"some-team/repo-{i}", Visibility.PUBLIC) for i in range(nb_repos))
+
+    def gitea_repos() -> Iterator[Repository]:
+        return (
+            Repository(f"gitea-user/repo-{i}", Visibility.PUBLIC) for i in range(0, nb_repos, 2)
+        )
+
+    yield lambda: sum(1 for _ in iter_missing_github_repos(gh_repos(), gitea_repos()))
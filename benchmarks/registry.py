@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import gc
+import platform
+import statistics
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, ContextManager, Dict, List, Optional, Sequence
+
+Setup = Callable[[Any], ContextManager[Callable[[], object]]]
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    name: str
+    setup: Setup
+    params: Sequence[Any]
+    repeat: int
+
+
+@dataclass(frozen=True)
+class BenchmarkResult:
+    name: str
+    param: Any
+    repeat: int
+    timings: List[float]
+    minimum: float
+    median: float
+    mean: float
+    stdev: float
+
+
+@dataclass
+class BenchmarkRun:
+    label: str
+    python_version: str = field(default_factory=platform.python_version)
+    machine: str = field(default_factory=platform.machine)
+    date: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    results: List[BenchmarkResult] = field(default_factory=list)
+
+    def to_json(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+BENCHMARKS: List[Benchmark] = []
+
+
+def benchmark(params: Sequence[Any] = (None,), repeat: int = 5) -> Callable[[Setup], Setup]:
+    """Registers a benchmark.
+
+    The decorated function is a context manager taking one of `params` and yielding the
+    callable to time, so that setup and teardown are excluded from the measurements.
+    """
+
+    def register(setup: Setup) -> Setup:
+        BENCHMARKS.append(Benchmark(setup.__name__, setup, params, repeat))
+        return setup
+
+    return register
+
+
+def result_key(name: str, param: Any) -> str:
+    return name if param is None else f"{name}[{param}]"
+
+
+def run_benchmark(bench: Benchmark, param: Any) -> BenchmarkResult:
+    timings = []
+    with bench.setup(param) as func:
+        for _ in range(bench.repeat):
+            gc.collect()
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+    return BenchmarkResult(
+        name=bench.name,
+        param=param,
+        repeat=bench.repeat,
+        timings=timings,
+        minimum=min(timings),
+        median=statistics.median(timings),
+        mean=statistics.mean(timings),
+        stdev=statistics.stdev(timings) if len(timings) > 1 else 0.0,
+    )
+
+
+def run_benchmarks(
+    label: str,
+    selection: Optional[str] = None,
+    on_result: Optional[Callable[[BenchmarkResult], None]] = None,
+) -> BenchmarkRun:
+    run = BenchmarkRun(label=label)
+    for bench in BENCHMARKS:
+        for param in bench.params:
+            if selection is not None and selection not in result_key(bench.name, param):
+                continue
+            result = run_benchmark(bench, param)
+            run.results.append(result)
+            if on_result is not None:
+                on_result(result)
+    return run
+
+
+@dataclass(frozen=True)
+class Comparison:
+    key: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline if self.baseline else float("inf")
+
+
+def compare_runs(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[Comparison]:
+    baseline_results = {
+        result_key(result["name"], result["param"]): result["median"]
+        for result in baseline["results"]
+    }
+    return [
+        Comparison(key, baseline_results[key], result["median"])
+        for result in current["results"]
+        if (key := result_key(result["name"], result["param"])) in baseline_results
+    ]
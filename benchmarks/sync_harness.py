@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import click
+
+from tests.fake_server import FakeServer, FakeServerSettings, generate_state
+
+
+def write_config(home: Path, server: FakeServer) -> None:
+    config_dir = home / ".config" / "gitea-github-sync"
+    config_dir.mkdir(parents=True)
+    (config_dir / "config.yml").write_text(
+        f"github_token: fake-github-token\n"
+        f"github_api_url: {server.github_api_url}\n"
+        f"gitea_api_url: {server.gitea_api_url}\n"
+        f"gitea_token: fake-gitea-token\n"
+    )
+
+
+def run_sync(server: FakeServer, sync_args: List[str]) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as home:
+        write_config(Path(home), server)
+        env = {**os.environ, "HOME": home}
+        start = time.perf_counter()
+        process = subprocess.run(
+            [sys.executable, "-m", "gitea_github_sync", "sync", *sync_args],
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        duration = time.perf_counter() - start
+    migrations = server.count_requests("POST", "/gitea/api/v1/repos/migrate")
+    return {
+        "exit_code": process.returncode,
+        "duration": duration,
+        "github_requests": server.count_requests("GET", "/github"),
+        "gitea_requests": sum(
+            server.count_requests(method, "/gitea") for method in ("GET", "POST", "PATCH", "DELETE")
+        ),
+        "migrations": migrations,
+        "migrations_per_second": migrations / duration if duration else 0.0,
+        "last_output_line": process.stdout.strip().splitlines()[-1] if process.stdout else "",
+        "stderr": process.stderr[-2000:],
+    }
+
+
+@click.command()
+@click.option("--github-repos", type=int, default=1000, show_default=True)
+@click.option("--mirrored-repos", type=int, default=0, show_default=True)
+@click.option("--latency", type=float, default=0.0, show_default=True)
+@click.option("--migration-latency", type=float, default=0.0, show_default=True)
+@click.option("--page-size", type=int, default=30, show_default=True)
+@click.option("--error-rate", type=float, default=0.0, show_default=True)
+@click.option("--rate-limit", type=int, default=None)
+@click.option("--output", type=click.Path(dir_okay=False, path_type=Path), default=None)
+@click.argument("sync_args", nargs=-1, type=click.UNPROCESSED)
+def main(
+    github_repos: int,
+    mirrored_repos: int,
+    latency: float,
+    migration_latency: float,
+    page_size: int,
+    error_rate: float,
+    rate_limit: Optional[int],
+    output: Optional[Path],
+    sync_args: List[str],
+) -> None:
+    """Runs `gitea-github-sync sync` end-to-end against a local fake Github and Gitea.
+
+    Extra SYNC_ARGS are passed to the sync command.
+    """
+    settings = FakeServerSettings(
+        latency=latency,
+        migration_latency=migration_latency,
+        default_page_size=page_size,
+        error_rate=error_rate,
+        rate_limit=rate_limit,
+    )
+    state = generate_state(nb_github_repos=github_repos, nb_mirrored_repos=mirrored_repos)
+    with FakeServer(state, settings) as server:
+        result = run_sync(server, list(sync_args))
+    result["parameters"] = {
+        "github_repos": github_repos,
+        "mirrored_repos": mirrored_repos,
+        "latency": latency,
+        "migration_latency": migration_latency,
+        "page_size": page_size,
+        "error_rate": error_rate,
+        "rate_limit": rate_limit,
+        "sync_args": list(sync_args),
+    }
+
+    click.echo(json.dumps({k: v for k, v in result.items() if k != "stderr"}, indent=2))
+    if output is not None:
+        output.write_text(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,93 +1,757 @@
-from typing import List
+from __future__ import annotations
+
+import csv
+import io
+import json
+import sys
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Sized,
+    TextIO,
+    Tuple,
+)
 
 import click
-from rich import print
+from rich import get_console, print
+from rich.markup import escape
+from rich.text import Text
 
-from . import config, gitea, github, migration, repository
+from . import (
+    config,
+    estimate,
+    git_mirror,
+    gitea,
+    github,
+    history,
+    migration,
+    mirror_interval,
+    priority,
+    profiles,
+    profiling,
+    progress,
+    reconcile,
+    repository,
+    throttling,
+)
 
 
-@click.group()
-def cli() -> None:
-    pass
+class CliGroup(click.Group):
+    def parse_args(self, ctx: click.Context, args: List[str]) -> List[str]:
+        # `--profile` takes an optional value, it must not consume the name of the command
+        args = [
+            (
+                f"--profile={profiling.PROFILERS[0]}"
+                if arg == "--profile" and i + 1 < len(args) and args[i + 1] in self.commands
+                else arg
+            )
+            for i, arg in enumerate(args)
+        ]
+        return super().parse_args(ctx, args)
 
 
-def print_repositories(repos: List[repository.Repository], display_stats: bool) -> None:
-    for repo in repos:
-        print(f"[b]{repo.get_org_name()}[/]/{repo.get_repo_name()}")
+def print_profile_report(paths: List[Path]) -> None:
+    for path in paths:
+        click.echo(f"Profile written to {path}", err=True)
 
-    if display_stats:
-        print()
-        print("[b]Repository stats[/]")
-        number_public_repos = sum(
-            1 if repo.visibility == repository.Visibility.PUBLIC else 0 for repo in repos
+
+@click.group(cls=CliGroup)
+@click.option(
+    "--profile",
+    type=click.Choice(profiling.PROFILERS),
+    is_flag=False,
+    flag_value=profiling.PROFILERS[0],
+    default=None,
+    help="Profile the command with cProfile (default) or tracemalloc.",
+)
+@click.option(
+    "--profile-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=Path("."),
+    show_default=True,
+    help="Directory where profiling reports are written.",
+)
+@click.pass_context
+def cli(ctx: click.Context, profile: Optional[str], profile_dir: Path) -> None:
+    if profile is not None:
+        profiler = profiling.Profiler(
+            kind=profile,
+            output_dir=profile_dir,
+            name=f"gitea-github-sync-{ctx.invoked_subcommand}-{profile}",
         )
-        number_private_repos = sum(
-            1 if repo.visibility == repository.Visibility.PRIVATE else 0 for repo in repos
+        profiler.start()
+        ctx.call_on_close(lambda: print_profile_report(profiler.stop()))
+
+
+OUTPUT_FORMATS = ["rich", "plain", "json", "jsonl", "csv"]
+
+
+@dataclass
+class RepositoryStats:
+    public: int = 0
+    private: int = 0
+    unknown: int = 0
+
+    @property
+    def total(self) -> int:
+        return self.public + self.private + self.unknown
+
+    @staticmethod
+    def from_repos(repos: List[repository.Repository]) -> RepositoryStats:
+        visibilities = Counter(repo.visibility for repo in repos)
+        public = visibilities[repository.Visibility.PUBLIC]
+        private = visibilities[repository.Visibility.PRIVATE]
+        return RepositoryStats(
+            public=public, private=private, unknown=len(repos) - public - private
         )
-        number_unknown_repos = len(repos) - number_public_repos - number_private_repos
-        print(f"Number of public repos identified: [b red]{number_public_repos}[/]")
-        print(f"Number of private repos identified: [b red]{number_private_repos}[/]")
-        print(f"Number of unknown repos identified: [b red]{number_unknown_repos}[/]")
-        print(f"Total number of repos identified: [b red]{len(repos)}[/]")
+
+    def to_dict(self) -> Dict[str, int]:
+        return {
+            "public": self.public,
+            "private": self.private,
+            "unknown": self.unknown,
+            "total": self.total,
+        }
+
+
+def repository_to_dict(repo: repository.Repository) -> Dict[str, Any]:
+    return {
+        "full_repo_name": repo.full_repo_name,
+        "owner": repo.get_org_name(),
+        "name": repo.get_repo_name(),
+        "visibility": repo.visibility.to_str(),
+    }
+
+
+def _render_stats_lines(stats: RepositoryStats, value_format: str) -> List[str]:
+    return [
+        f"Number of public repos identified: {value_format.format(stats.public)}",
+        f"Number of private repos identified: {value_format.format(stats.private)}",
+        f"Number of unknown repos identified: {value_format.format(stats.unknown)}",
+        f"Total number of repos identified: {value_format.format(stats.total)}",
+    ]
+
+
+def _print_rich(repos: List[repository.Repository], stats: Optional[RepositoryStats]) -> None:
+    # Assembling a single Text avoids parsing markup once per repository
+    text = Text()
+    for repo in repos:
+        text.append(repo.get_org_name(), style="bold")
+        text.append(f"/{repo.get_repo_name()}\n")
+    if stats is not None:
+        text.append("\n")
+        text.append("Repository stats", style="bold")
+        text.append("\n")
+        text.append_text(Text.from_markup("\n".join(_render_stats_lines(stats, "[b red]{}[/]"))))
+        text.append("\n")
+    get_console().print(text, end="")
+
+
+def _print_plain(repos: List[repository.Repository], stats: Optional[RepositoryStats]) -> None:
+    lines = [repo.full_repo_name for repo in repos]
+    if stats is not None:
+        lines.extend(["", "Repository stats", *_render_stats_lines(stats, "{}")])
+    lines.append("")
+    sys.stdout.write("\n".join(lines))
+
+
+def _print_json(repos: List[repository.Repository], stats: Optional[RepositoryStats]) -> None:
+    output: Dict[str, Any] = {"repositories": [repository_to_dict(repo) for repo in repos]}
+    if stats is not None:
+        output["stats"] = stats.to_dict()
+    sys.stdout.write(json.dumps(output) + "\n")
+
+
+def _print_jsonl(repos: List[repository.Repository], stats: Optional[RepositoryStats]) -> None:
+    sys.stdout.write("".join(json.dumps(repository_to_dict(repo)) + "\n" for repo in repos))
+    if stats is not None:
+        sys.stderr.write(json.dumps(stats.to_dict()) + "\n")
+
+
+def _print_csv(repos: List[repository.Repository], stats: Optional[RepositoryStats]) -> None:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=["full_repo_name", "owner", "name", "visibility"])
+    writer.writeheader()
+    writer.writerows(repository_to_dict(repo) for repo in repos)
+    sys.stdout.write(buffer.getvalue())
+    if stats is not None:
+        sys.stderr.write(json.dumps(stats.to_dict()) + "\n")
+
+
+PRINTERS: Dict[str, Callable[[List[repository.Repository], Optional[RepositoryStats]], None]] = {
+    "rich": _print_rich,
+    "plain": _print_plain,
+    "json": _print_json,
+    "jsonl": _print_jsonl,
+    "csv": _print_csv,
+}
+
+
+def print_repositories(
+    repos: List[repository.Repository], display_stats: bool, output_format: Optional[str] = None
+) -> None:
+    if output_format is None:
+        output_format = "rich" if sys.stdout.isatty() else "plain"
+    with profiling.section("cli.print_repositories"):
+        stats = RepositoryStats.from_repos(repos) if display_stats else None
+        PRINTERS[output_format](repos, stats)
+
+
+format_option = click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(OUTPUT_FORMATS),
+    default=None,
+    help="Output format, defaults to rich on a terminal and plain otherwise. "
+    "Stats are written to stderr with jsonl and csv.",
+)
 
 
 @click.option("--stats", is_flag=True)
+@format_option
 @cli.command()
-def list_all_github_repositories(stats: bool) -> None:
+def list_all_github_repositories(stats: bool, output_format: Optional[str]) -> None:
     gh = github.get_github()
     repos = github.list_all_repositories(gh)
-    print_repositories(repos, stats)
+    print_repositories(repos, stats, output_format)
 
 
 @click.option("--stats", is_flag=True)
+@format_option
 @cli.command()
-def list_all_gitea_repositories(stats: bool) -> None:
+def list_all_gitea_repositories(stats: bool, output_format: Optional[str]) -> None:
     gt = gitea.get_gitea()
     repos = gt.get_repos()
-    print_repositories(repos, stats)
+    print_repositories(repos, stats, output_format)
+
+
+def read_repo_names(stream: TextIO) -> List[str]:
+    lines = (line.strip() for line in stream)
+    return [line for line in lines if line and not line.startswith("#")]
+
+
+def collect_repo_names(full_repo_names: Sequence[str], from_file: Optional[TextIO]) -> List[str]:
+    names: List[str] = []
+    for name in full_repo_names:
+        if name == "-":
+            names.extend(read_repo_names(click.get_text_stream("stdin")))
+        else:
+            names.append(name)
+    if from_file is not None:
+        names.extend(read_repo_names(from_file))
+    return list(dict.fromkeys(names))
+
+
+def get_owner_mapping(conf: config.Config, gt: gitea.Gitea) -> migration.OwnerMapping:
+    return migration.OwnerMapping(mapping=conf.owner_mapping, default_owner=gt.get_user_login())
+
+
+def get_migrate_function(
+    conf: config.Config, gt: gitea.Gitea, owner_mapping: migration.OwnerMapping
+) -> Callable[[repository.Repository], None]:
+    github_url = github.github_web_url(conf.github_api_url)
+
+    def migrate(repo: repository.Repository) -> None:
+        gt.migrate_repo(
+            repo=repo,
+            github_token=conf.github_token,
+            repo_owner=owner_mapping.get_gitea_owner(repo),
+            github_url=github_url,
+            mirror_interval=mirror_interval.select_mirror_interval(
+                repo, conf.mirror_interval_tiers, datetime.now(timezone.utc)
+            ),
+            options=profiles.select_migration_options(repo, conf.migration_profiles),
+        )
+
+    return migrate
+
+
+def get_history_recorder(conf: config.Config, engine: str) -> history.HistoryRecorder:
+    def on_error(error: OSError) -> None:
+        print(
+            f"[yellow]Could not write the migration history to {conf.history_file}, "
+            f"the next migrations are not recorded: {escape(str(error))}[/]"
+        )
+
+    return history.HistoryRecorder(conf.history_file, engine, on_error=on_error)
+
+
+def print_conflicting_repositories(repos: List[repository.Repository]) -> None:
+    for repo in repos:
+        print(
+            f"[yellow]Skipping [b]{repo.full_repo_name}[/]: "
+            "its Gitea name is already claimed by another Github repository[/]"
+        )
+
+
+def print_migration_start(repo: repository.Repository) -> None:
+    print(f"Migrating [b]{repo.full_repo_name}[/]")
+
+
+def print_migration_result(
+    repo: repository.Repository, error: Optional[gitea.GiteaMigrationError]
+) -> None:
+    if error is not None:
+        print(f"[red]Migration Error for [b]{error.full_repo_name}[/]")
+
+
+def print_migration_summary(summary: migration.MigrationSummary) -> None:
+    if summary.migrated == 0:
+        print("No repos were migrated")
+    else:
+        print(f"Migrated {summary.migrated} out of {summary.total} repos successfully")
+    if summary.failed:
+        print(f"Failed {summary.failed} out of {summary.total} migrations")
+    remaining = "the remaining" if summary.nb_remaining is None else summary.nb_remaining
+    if summary.skipped:
+        print(f"[red]Skipped {remaining} repos because Gitea is unavailable[/]")
+    if summary.deferred:
+        print(
+            f"[yellow]Deferred {remaining} repos to the next run after reaching --max-duration[/]"
+        )
+
+
+def format_size(size_kb: int) -> str:
+    size = float(size_kb)
+    for unit in ["KiB", "MiB", "GiB"]:
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TiB"
+
+
+def print_estimate(sync_estimate: estimate.SyncEstimate, rate_limiting: Tuple[int, int]) -> None:
+    remaining, limit = rate_limiting
+    consumption = sync_estimate.github_rate_limit_consumption
+    print(
+        f"Estimate for {sync_estimate.nb_repos} repos with the {sync_estimate.engine} engine "
+        f"and a concurrency of {sync_estimate.concurrency}"
+    )
+    print(
+        "API calls: "
+        + ", ".join(f"{service} {calls}" for service, calls in sync_estimate.api_calls.items())
+    )
+    color = "red" if consumption > remaining else "green"
+    print(
+        f"Github rate limit consumption: [{color}]{consumption}[/] calls, "
+        f"{sync_estimate.github_calls_by_gitea} of them by Gitea"
+    )
+    print(f"Github rate limit remaining: {remaining} out of {limit}")
+    size = f"Size to clone: {format_size(sync_estimate.size_kb)}"
+    if sync_estimate.nb_unknown_sizes:
+        size += f" ({sync_estimate.nb_unknown_sizes} repos of unknown size)"
+    print(size)
+    if sync_estimate.model is None:
+        print("Projected wall time: unknown, no previous migration was recorded")
+    else:
+        print(
+            f"Projected wall time: {progress.format_duration(sync_estimate.wall_seconds)} "
+            f"(based on {sync_estimate.model.sample_size} previous migrations)"
+        )
+
+
+def run_migrations(
+    repos: Iterable[repository.Repository],
+    migrate: Callable[[repository.Repository], None],
+    concurrency: int,
+    controller: Optional[throttling.AIMDController] = None,
+    breaker: Optional[throttling.CircuitBreaker] = None,
+    recorder: Optional[history.HistoryRecorder] = None,
+    max_duration: Optional[float] = None,
+) -> migration.MigrationSummary:
+    total = len(repos) if isinstance(repos, Sized) else None
+    with progress.get_progress_reporter(total, get_console()) as reporter:
+        trips = 0
+
+        def on_start(repo: repository.Repository) -> None:
+            print_migration_start(repo)
+            reporter.start(repo)
+            if recorder is not None:
+                recorder.start(repo)
+
+        def on_result(
+            repo: repository.Repository, error: Optional[gitea.GiteaMigrationError]
+        ) -> None:
+            nonlocal trips
+            reporter.finish(repo, failed=error is not None)
+            if recorder is not None:
+                recorder.finish(repo, succeeded=error is None)
+            print_migration_result(repo, error)
+            if breaker is not None and breaker.trips > trips and not breaker.gave_up:
+                print(
+                    f"[red]Gitea looks unavailable, pausing migrations for "
+                    f"{breaker.retry_in():.0f} seconds[/]"
+                )
+            trips = 0 if breaker is None else breaker.trips
+
+        return migration.migrate_repos(
+            repos,
+            migrate,
+            concurrency=concurrency,
+            on_start=on_start,
+            on_result=on_result,
+            controller=controller,
+            breaker=breaker,
+            max_duration=max_duration,
+        )
+
+
+def parse_max_duration(
+    ctx: click.Context, param: click.Parameter, value: Optional[str]
+) -> Optional[float]:
+    if value is None:
+        return None
+    try:
+        return mirror_interval.parse_duration(value).total_seconds()
+    except ValueError:
+        raise click.BadParameter(f"expected a duration such as 45m or 2h30m, got {value!r}")
 
 
 @cli.command()
-@click.argument("full_repo_name")
-def migrate_repo(full_repo_name: str) -> None:
+@click.argument("full_repo_names", nargs=-1)
+@click.option(
+    "--from-file",
+    type=click.File("r"),
+    help="File containing one FULL_REPO_NAME per line. Use - to read from stdin.",
+)
+@click.option("--concurrency", type=click.IntRange(min=1), default=4, show_default=True)
+def migrate_repo(
+    full_repo_names: Tuple[str, ...], from_file: Optional[TextIO], concurrency: int
+) -> None:
+    names = collect_repo_names(full_repo_names, from_file)
+    if not names:
+        raise click.UsageError("At least one FULL_REPO_NAME is required")
+
     conf = config.load_config()
     gt = gitea.get_gitea()
     gh = github.get_github()
-    github_repos = github.list_all_repositories(gh)
-    try:
-        repo = next((repo for repo in github_repos if repo.full_repo_name == full_repo_name))
-    except StopIteration:
-        print(f"[b red]Repository {full_repo_name} does not exist on Github[/]")
+    github_repos = github.get_repositories(gh, names, concurrency=concurrency)
+    repos = []
+    for full_repo_name, repo in github_repos.items():
+        if repo is None:
+            print(f"[b red]Repository {full_repo_name} does not exist on Github[/]")
+        else:
+            repos.append(repo)
+    if not repos:
         raise click.Abort()
 
-    try:
-        gt.migrate_repo(repo=repo, github_token=conf.github_token)
-    except gitea.GiteaMigrationError as e:
-        print(f"[red]Migration Error for [b]{e.full_repo_name}[/]")
+    owner_mapping = get_owner_mapping(conf, gt)
+    print_conflicting_repositories(migration.list_conflicting_github_repos(repos, owner_mapping))
+    repos_to_migrate = migration.probe_missing_github_repos(
+        gt, repos, owner_mapping, concurrency=concurrency
+    )
+    for repo in repos:
+        if repo not in repos_to_migrate:
+            print(f"Repository [b]{repo.full_repo_name}[/] already exists on Gitea")
+
+    summary = run_migrations(
+        repos_to_migrate,
+        get_migrate_function(conf, gt, owner_mapping),
+        concurrency,
+        recorder=get_history_recorder(conf, engine="gitea"),
+    )
+    print_migration_summary(summary)
 
 
 @cli.command()
-def sync() -> None:
+@click.option(
+    "--engine",
+    type=click.Choice(["gitea", "git"]),
+    default="gitea",
+    show_default=True,
+    help="gitea creates pull mirrors with the Gitea migration API. "
+    "git mirrors repositories through a local cache of git clones and pushes them to Gitea.",
+)
+@click.option(
+    "--adopt-existing",
+    is_flag=True,
+    help="With the git engine, also push to existing plain Gitea repositories sharing a Github "
+    "name. Their branches and tags are overwritten by the Github ones.",
+)
+@click.option("--concurrency", type=click.IntRange(min=1), default=1, show_default=True)
+@click.option(
+    "--adaptive",
+    is_flag=True,
+    help="Adjust the number of parallel migrations to the health of Gitea, up to --concurrency.",
+)
+@click.option(
+    "--max-latency",
+    type=click.FloatRange(min=0),
+    default=None,
+    help="With --adaptive, stop adding parallel migrations while they take longer "
+    "than this many seconds.",
+)
+@click.option(
+    "--streaming",
+    is_flag=True,
+    help="Compare inventories through sorted files on disk instead of memory, "
+    "for accounts with a very large number of repositories.",
+)
+@click.option("--dry-run", is_flag=True, help="Only display the repositories to migrate")
+@click.option(
+    "--estimate",
+    "show_estimate",
+    is_flag=True,
+    help="With --dry-run, estimate the API calls, the size to clone and the duration of the "
+    "migration from previous runs.",
+)
+@click.option(
+    "--max-duration",
+    callback=parse_max_duration,
+    help="Stop starting migrations after this duration, e.g. 45m or 2h30m. Remaining "
+    "repositories are left for the next run.",
+)
+def sync(
+    engine: str,
+    adopt_existing: bool,
+    concurrency: int,
+    adaptive: bool,
+    max_latency: Optional[float],
+    streaming: bool,
+    dry_run: bool,
+    show_estimate: bool,
+    max_duration: Optional[float],
+) -> None:
+    if streaming and engine == "git":
+        raise click.UsageError("--streaming is not supported by the git engine")
+    if adopt_existing and engine != "git":
+        raise click.UsageError("--adopt-existing requires the git engine")
+    if show_estimate and not dry_run:
+        raise click.UsageError("--estimate requires --dry-run")
+    if streaming and dry_run:
+        raise click.UsageError("--dry-run is not supported with --streaming")
     conf = config.load_config()
     gt = gitea.get_gitea()
     gh = github.get_github()
+    controller = (
+        throttling.AIMDController(max_limit=concurrency, max_latency=max_latency)
+        if adaptive
+        else None
+    )
+    if streaming:
+        owner_mapping = get_owner_mapping(conf, gt)
+        streamed_repos = migration.iter_missing_github_repos(
+            gh_repos=github.iter_all_repositories(gh),
+            gitea_repos=gt.iter_repos(),
+            owner_mapping=owner_mapping,
+            on_conflict=lambda repo: print_conflicting_repositories([repo]),
+        )
+        print("Starting streaming migration")
+        summary = run_migrations(
+            streamed_repos,
+            get_migrate_function(conf, gt, owner_mapping),
+            concurrency,
+            controller,
+            throttling.CircuitBreaker(),
+            get_history_recorder(conf, engine),
+            max_duration,
+        )
+        print_migration_summary(summary)
+        return
+
     github_repos = github.list_all_repositories(gh)
     gitea_repos = gt.get_repos()
-    repos_to_sync = migration.list_missing_github_repos(
-        gh_repos=github_repos, gitea_repos=gitea_repos
+    owner_mapping = get_owner_mapping(conf, gt)
+    conflicting_repos = migration.list_conflicting_github_repos(github_repos, owner_mapping)
+    print_conflicting_repositories(conflicting_repos)
+    missing_repos = migration.list_missing_github_repos(
+        gh_repos=github_repos, gitea_repos=gitea_repos, owner_mapping=owner_mapping
     )
-    len_repos = len(repos_to_sync)
-    print(f"Starting migration for {len_repos} repos")
-    for repo in repos_to_sync:
-        print(f"Migrating [b]{repo.full_repo_name}[/]")
-        try:
-            gt.migrate_repo(repo=repo, github_token=conf.github_token)
-        except gitea.GiteaMigrationError as e:
-            print(f"[red]Migration Error for [b]{e.full_repo_name}[/]")
-            len_repos -= 1
-    if len_repos == 0:
-        print("No repos were migrated")
+    repos_to_sync = missing_repos
+    if engine == "git":
+        mirror_engine = git_mirror.GitMirrorEngine(cache_dir=conf.git_cache_dir)
+        migrate = git_mirror.get_migrate_function(
+            engine=mirror_engine,
+            gt=gt,
+            github_api_url=conf.github_api_url,
+            github_token=conf.github_token,
+            owner_mapping=owner_mapping,
+            repos_to_create={repo.full_repo_name for repo in missing_repos},
+        )
+        repos_to_sync = git_mirror.list_repos_to_push(
+            gh_repos=[repo for repo in github_repos if repo not in conflicting_repos],
+            gitea_repos=gitea_repos,
+            missing_repos=missing_repos,
+            owner_mapping=owner_mapping,
+            engine=mirror_engine,
+            adopt_existing=adopt_existing,
+        )
     else:
-        print(f"Migrated {len_repos} out of {len(repos_to_sync)} repos successfully")
-    if len_repos < len(repos_to_sync):
-        print(f"Failed {len(repos_to_sync) - len_repos} out of {len(repos_to_sync)} migrations")
+        migrate = get_migrate_function(conf, gt, owner_mapping)
+    repos_to_sync = priority.prioritize(
+        repos_to_sync, conf.migration_priority, datetime.now(timezone.utc)
+    )
+    if dry_run:
+        for repo in repos_to_sync:
+            print(f"Would migrate [b]{repo.full_repo_name}[/]")
+        print(f"{len(repos_to_sync)} repos would be migrated")
+        if show_estimate:
+            print_estimate(
+                estimate.estimate_sync(
+                    repos_to_migrate=repos_to_sync,
+                    missing_repos=missing_repos,
+                    nb_github_repos=len(github_repos),
+                    nb_gitea_repos=len(gitea_repos),
+                    engine=engine,
+                    concurrency=concurrency,
+                    history=history.load_history(conf.history_file, engine),
+                    github_page_size=gh.per_page,
+                ),
+                gh.rate_limiting,
+            )
+        return
+    print(f"Starting migration for {len(repos_to_sync)} repos")
+    summary = run_migrations(
+        repos_to_sync,
+        migrate,
+        concurrency,
+        controller,
+        throttling.CircuitBreaker(),
+        get_history_recorder(conf, engine),
+        max_duration,
+    )
+    print_migration_summary(summary)
+
+
+def print_edit_result(full_repo_name: str, error: Optional[migration.RepoOperationError]) -> None:
+    if error is not None:
+        print(f"[red]Update Error for [b]{error.full_repo_name}[/]")
+
+
+@cli.command()
+@click.option("--dry-run", is_flag=True, help="Only display the mirror intervals to update")
+@click.option("--concurrency", type=click.IntRange(min=1), default=4, show_default=True)
+def tune_mirrors(dry_run: bool, concurrency: int) -> None:
+    conf = config.load_config()
+    if not conf.mirror_interval_tiers:
+        print("No mirror interval tiers are configured")
+        return
+    gt = gitea.get_gitea()
+    gh = github.get_github()
+    owner_mapping = get_owner_mapping(conf, gt)
+    updates = mirror_interval.list_mirror_interval_updates(
+        gh_repos=github.list_all_repositories(gh),
+        gitea_repos=gt.get_repos(),
+        owner_mapping=owner_mapping,
+        tiers=conf.mirror_interval_tiers,
+        now=datetime.now(timezone.utc),
+    )
+    for update in updates:
+        print(
+            f"Mirror interval of [b]{update.gitea_full_repo_name}[/]: "
+            f"{update.current_mirror_interval} -> {update.mirror_interval}"
+        )
+    if dry_run:
+        print(f"{len(updates)} mirrors would be updated")
+        return
+
+    summary = migration.edit_repos(
+        gt,
+        [
+            (update.gitea_full_repo_name, {"mirror_interval": update.mirror_interval})
+            for update in updates
+        ],
+        concurrency=concurrency,
+        on_result=print_edit_result,
+    )
+    print(f"Updated {len(summary.updated)} out of {summary.total} mirrors")
+
+
+@cli.command()
+@click.option(
+    "--action",
+    type=click.Choice(["archive", "delete"]),
+    default="archive",
+    show_default=True,
+    help="What to do with mirrors whose Github repository no longer exists",
+)
+@click.option("--dry-run", is_flag=True, help="Only display the orphan mirrors")
+@click.option(
+    "--max-prune",
+    type=click.IntRange(min=0),
+    default=10,
+    show_default=True,
+    help="Abort without pruning anything if more mirrors are orphans",
+)
+@click.option("--concurrency", type=click.IntRange(min=1), default=4, show_default=True)
+def prune(action: str, dry_run: bool, max_prune: int, concurrency: int) -> None:
+    conf = config.load_config()
+    gt = gitea.get_gitea()
+    gh = github.get_github()
+    orphans = migration.list_orphan_mirrors(
+        gh=gh,
+        gitea_repos=gt.get_repos(),
+        gh_repos=github.list_all_repositories(gh),
+        owner_mapping=get_owner_mapping(conf, gt),
+        concurrency=concurrency,
+        github_url=github.github_web_url(conf.github_api_url),
+    )
+    if action == "archive":
+        orphans = [repo for repo in orphans if not repo.archived]
+    for repo in orphans:
+        print(f"Orphan mirror [b]{repo.full_repo_name}[/] of {repo.original_url}")
+    if dry_run:
+        print(f"{len(orphans)} orphan mirrors would be {action}d")
+        return
+    if len(orphans) > max_prune:
+        print(f"[b red]{len(orphans)} orphan mirrors found, more than --max-prune {max_prune}[/]")
+        raise click.Abort()
+
+    full_repo_names = [repo.full_repo_name for repo in orphans]
+    if action == "archive":
+        summary = migration.edit_repos(
+            gt,
+            [(full_repo_name, {"archived": True}) for full_repo_name in full_repo_names],
+            concurrency=concurrency,
+            on_result=print_edit_result,
+        )
+    else:
+        summary = migration.delete_repos(
+            gt, full_repo_names, concurrency=concurrency, on_result=print_edit_result
+        )
+    print(f"Pruned {len(summary.updated)} out of {summary.total} orphan mirrors")
+
+
+@cli.command(name="reconcile")
+@click.option("--dry-run", is_flag=True, help="Only display the changes")
+@click.option(
+    "--field",
+    "fields",
+    type=click.Choice(reconcile.FIELDS),
+    multiple=True,
+    help="Field to reconcile, can be repeated. Defaults to all fields.",
+)
+@click.option("--concurrency", type=click.IntRange(min=1), default=4, show_default=True)
+def reconcile_repos(dry_run: bool, fields: Tuple[str, ...], concurrency: int) -> None:
+    conf = config.load_config()
+    gt = gitea.get_gitea()
+    gh = github.get_github()
+    drifts = reconcile.list_repository_drifts(
+        gh_repos=github.list_all_repositories(gh),
+        gitea_repos=gt.get_repos(),
+        owner_mapping=get_owner_mapping(conf, gt),
+        fields=fields or reconcile.FIELDS,
+    )
+    for drift in drifts:
+        changes = ", ".join(change.to_str() for change in drift.changes)
+        print(f"[b]{drift.gitea_full_repo_name}[/]: {escape(changes)}")
+    if dry_run:
+        print(f"{len(drifts)} repos would be updated")
+        return
+
+    summary = migration.edit_repos(
+        gt,
+        [(drift.gitea_full_repo_name, drift.to_gitea()) for drift in drifts],
+        concurrency=concurrency,
+        on_result=print_edit_result,
+    )
+    print(f"Updated {len(summary.updated)} out of {summary.total} repos")
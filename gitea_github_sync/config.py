@@ -1,15 +1,89 @@
 from __future__ import annotations
 
 from pathlib import Path
+from typing import Dict, List, Literal, Optional
 
 from piny import PydanticValidator, StrictMatcher, YamlLoader
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
+
+
+class MirrorIntervalTier(BaseModel):
+    max_inactivity_days: Optional[int] = None
+    mirror_interval: str
+
+
+DEFAULT_MIRROR_INTERVAL_TIERS = [
+    MirrorIntervalTier(max_inactivity_days=7, mirror_interval="10m"),
+    MirrorIntervalTier(max_inactivity_days=30, mirror_interval="1h"),
+    MirrorIntervalTier(max_inactivity_days=180, mirror_interval="8h"),
+    MirrorIntervalTier(mirror_interval="24h"),
+]
+
+
+ONE_SHOT_COMPONENTS = ["issues", "labels", "milestones", "releases", "pull_requests"]
+
+
+class MigrationProfile(BaseModel):
+    name: str
+    owners: List[str] = []
+    patterns: List[str] = []
+    # Gitea drops issues, labels, milestones, releases and pull requests from pull mirrors,
+    # they are only migrated by a one-shot copy which is never updated afterwards
+    mirror: bool = True
+    wiki: bool = False
+    lfs: bool = False
+    lfs_endpoint: Optional[str] = None
+    lfs_max_repo_size_gb: Optional[float] = None
+    issues: bool = False
+    labels: bool = False
+    milestones: bool = False
+    releases: bool = False
+    pull_requests: bool = False
+
+    @model_validator(mode="after")
+    def check_mirrored_components(self) -> MigrationProfile:
+        if self.mirror:
+            components = [c for c in ONE_SHOT_COMPONENTS if getattr(self, c)]
+            if components:
+                raise ValueError(f"{', '.join(components)} can only be migrated with mirror: false")
+        return self
+
+
+PriorityCriterion = Literal["listed", "recent", "small"]
+
+
+class MigrationPriority(BaseModel):
+    repos: List[str] = []
+    order: List[PriorityCriterion] = ["listed", "recent", "small"]
+    recent_days: int = Field(default=7, gt=0)
+
+
+# Migrations clone whole repositories before Gitea answers, only a stuck Gitea should time out
+DEFAULT_GITEA_MIGRATION_TIMEOUT_SECONDS = 600.0
+
+
+def default_git_cache_dir() -> Path:
+    return Path.home() / ".cache" / "gitea-github-sync" / "git"
+
+
+def default_history_file() -> Path:
+    return Path.home() / ".local" / "state" / "gitea-github-sync" / "migration-history.jsonl"
 
 
 class Config(BaseModel):
     github_token: str
+    github_api_url: str = "https://api.github.com"
     gitea_api_url: str
     gitea_token: str
+    gitea_migration_timeout_seconds: float = Field(
+        default=DEFAULT_GITEA_MIGRATION_TIMEOUT_SECONDS, gt=0
+    )
+    owner_mapping: Dict[str, str] = {}
+    mirror_interval_tiers: List[MirrorIntervalTier] = DEFAULT_MIRROR_INTERVAL_TIERS
+    git_cache_dir: Path = Field(default_factory=default_git_cache_dir)
+    migration_profiles: List[MigrationProfile] = []
+    history_file: Path = Field(default_factory=default_history_file)
+    migration_priority: MigrationPriority = MigrationPriority()
 
 
 def config_file_location() -> Path:
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import heapq
+import math
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+from .history import MigrationRecord
+from .repository import Repository
+
+GITEA_DEFAULT_PAGE_SIZE = 30
+# Gitea fetches the repository metadata from the Github API before cloning a mirror
+GITEA_GITHUB_CALLS_PER_MIGRATION = 2
+
+
+@dataclass(frozen=True)
+class DurationModel:
+    """Migration duration as a fixed overhead plus a time proportional to the size."""
+
+    overhead_seconds: float
+    seconds_per_kb: float
+    sample_size: int
+
+    def predict(self, size_kb: Optional[int]) -> float:
+        return self.overhead_seconds + self.seconds_per_kb * (size_kb or 0)
+
+    @staticmethod
+    def fit(records: Iterable[MigrationRecord]) -> Optional[DurationModel]:
+        samples = [(r.size_kb or 0, r.seconds) for r in records if r.succeeded]
+        if not samples:
+            return None
+        n = len(samples)
+        mean_size = sum(size for size, _ in samples) / n
+        mean_seconds = sum(seconds for _, seconds in samples) / n
+        variance = sum((size - mean_size) ** 2 for size, _ in samples)
+        if variance == 0:
+            return DurationModel(mean_seconds, 0.0, n)
+        covariance = sum((size - mean_size) * (seconds - mean_seconds) for size, seconds in samples)
+        # A least squares fit clamped to non negative values, noisy histories can
+        # otherwise predict negative durations
+        seconds_per_kb = max(0.0, covariance / variance)
+        overhead_seconds = max(0.0, mean_seconds - seconds_per_kb * mean_size)
+        return DurationModel(overhead_seconds, seconds_per_kb, n)
+
+
+@dataclass
+class SyncEstimate:
+    engine: str
+    concurrency: int
+    nb_repos: int = 0
+    size_kb: int = 0
+    nb_unknown_sizes: int = 0
+    api_calls: Dict[str, int] = field(default_factory=dict)
+    github_calls_by_gitea: int = 0
+    model: Optional[DurationModel] = None
+    wall_seconds: Optional[float] = None
+
+    @property
+    def github_rate_limit_consumption(self) -> int:
+        return self.api_calls.get("github", 0) + self.github_calls_by_gitea
+
+
+def _pages(nb_items: int, page_size: int) -> int:
+    # An empty listing still needs one request
+    return max(1, math.ceil(nb_items / page_size))
+
+
+def projected_wall_seconds(durations: Iterable[float], concurrency: int) -> float:
+    """Simulates `concurrency` workers picking migrations in order from the queue."""
+    workers: List[float] = [0.0] * concurrency
+    for duration in durations:
+        heapq.heappush(workers, heapq.heappop(workers) + duration)
+    return max(workers)
+
+
+def estimate_sync(
+    repos_to_migrate: List[Repository],
+    missing_repos: List[Repository],
+    nb_github_repos: int,
+    nb_gitea_repos: int,
+    engine: str,
+    concurrency: int,
+    history: List[MigrationRecord],
+    github_page_size: int,
+    gitea_page_size: int = GITEA_DEFAULT_PAGE_SIZE,
+) -> SyncEstimate:
+    """Estimates a sync run from its migration queue. `missing_repos` are the repositories
+    created on Gitea, which only differ from `repos_to_migrate` with the git engine where
+    existing repositories are pushed again."""
+    estimate = SyncEstimate(engine=engine, concurrency=concurrency)
+    estimate.nb_repos = len(repos_to_migrate)
+    estimate.size_kb = sum(repo.size_kb or 0 for repo in missing_repos)
+    estimate.nb_unknown_sizes = sum(1 for repo in missing_repos if repo.size_kb is None)
+    # Listing both inventories, the Gitea user lookup, then one creation request per
+    # missing repository: a migration with the gitea engine, an empty repository with git
+    estimate.api_calls = {
+        "github": _pages(nb_github_repos, github_page_size),
+        "gitea": _pages(nb_gitea_repos, gitea_page_size) + 1 + len(missing_repos),
+    }
+    if engine == "gitea":
+        estimate.github_calls_by_gitea = GITEA_GITHUB_CALLS_PER_MIGRATION * len(missing_repos)
+    estimate.model = DurationModel.fit(history)
+    if estimate.model is not None:
+        model = estimate.model
+        estimate.wall_seconds = projected_wall_seconds(
+            (model.predict(repo.size_kb) for repo in repos_to_migrate), concurrency
+        )
+    return estimate
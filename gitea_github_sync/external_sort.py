@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+from contextlib import ExitStack, closing
+from pathlib import Path
+from typing import Any, Callable, Generator, Iterable, Iterator, List, TypeVar
+
+T = TypeVar("T")
+
+DEFAULT_RUN_SIZE = 10_000
+DEFAULT_MAX_OPEN_RUNS = 64
+
+
+def _read_run(path: Path, load: Callable[[str], T]) -> Generator[T, None, None]:
+    with path.open() as f:
+        for line in f:
+            yield load(line)
+
+
+def _write_run(path: Path, items: Iterable[T], dump: Callable[[T], str]) -> Path:
+    with path.open("w") as f:
+        f.writelines(f"{dump(item)}\n" for item in items)
+    return path
+
+
+def external_sort(
+    items: Iterable[T],
+    key: Callable[[T], Any],
+    dump: Callable[[T], str],
+    load: Callable[[str], T],
+    directory: Path,
+    run_size: int = DEFAULT_RUN_SIZE,
+    max_open_runs: int = DEFAULT_MAX_OPEN_RUNS,
+) -> Iterator[T]:
+    """Sorts `items` while holding at most `run_size` of them in memory.
+
+    Items are spilled to sorted runs in `directory`, one `dump`ed item per line, and the
+    runs are lazily merged back. Runs are merged in several passes when there are more
+    than `max_open_runs` of them to bound the number of open files."""
+    pending = iter(items)
+    runs: List[Path] = []
+    while True:
+        chunk = list(itertools.islice(pending, run_size))
+        if not chunk:
+            break
+        chunk.sort(key=key)
+        runs.append(_write_run(directory / f"run-{len(runs)}", chunk, dump))
+
+    generation = 0
+    while len(runs) > max_open_runs:
+        generation += 1
+        merged: List[Path] = []
+        for i in range(0, len(runs), max_open_runs):
+            group = runs[i : i + max_open_runs]
+            path = directory / f"run-{generation}-{len(merged)}"
+            merged.append(
+                _write_run(path, heapq.merge(*(_read_run(p, load) for p in group), key=key), dump)
+            )
+            for run in group:
+                run.unlink()
+        runs = merged
+
+    with ExitStack() as stack:
+        readers = [stack.enter_context(closing(_read_run(run, load))) for run in runs]
+        yield from heapq.merge(*readers, key=key)
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import base64
+import os
+import subprocess
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Collection, Iterable, List, Optional
+
+from .gitea import Gitea, GiteaMigrationError
+from .github import github_web_url
+from .migration import OwnerMapping
+from .repository import Repository, Visibility
+
+PUSHED_REFS_FILE = "gitea-github-sync-pushed-refs"
+# Written once the engine created a Gitea repository, so that it still owns the repository
+# when the first push fails
+CREATED_FILE = "gitea-github-sync-created"
+# Only branches and tags are mirrored: Github exposes pull requests under refs/pull/, a
+# namespace Gitea uses for its own pull requests
+MIRRORED_NAMESPACES = ["refs/heads/", "refs/tags/"]
+REFSPECS = [f"+{namespace}*:{namespace}*" for namespace in MIRRORED_NAMESPACES]
+
+
+@dataclass(frozen=True)
+class GitMirrorError(ValueError):
+    full_repo_name: str
+    stderr: str
+
+    def __str__(self) -> str:
+        return f"Could not mirror {self.full_repo_name}: {self.stderr.strip()}"
+
+
+@dataclass(frozen=True)
+class GitRemote:
+    url: str
+    authorization: Optional[str] = None
+
+    @staticmethod
+    def with_basic_auth(url: str, username: str, password: str) -> GitRemote:
+        credentials = base64.b64encode(f"{username}:{password}".encode()).decode()
+        return GitRemote(url=url, authorization=f"Basic {credentials}")
+
+
+def gitea_web_url(gitea_api_url: str) -> str:
+    api_url = gitea_api_url.rstrip("/")
+    return api_url[: -len("/api/v1")] if api_url.endswith("/api/v1") else api_url
+
+
+@dataclass(frozen=True)
+class GitMirrorEngine:
+    cache_dir: Path
+    git: str = "git"
+
+    def cache_path(self, full_repo_name: str) -> Path:
+        owner, name = full_repo_name.split("/")
+        return self.cache_dir / owner / f"{name}.git"
+
+    def mark_created(self, full_repo_name: str) -> None:
+        path = self.cache_path(full_repo_name)
+        path.mkdir(parents=True, exist_ok=True)
+        (path / CREATED_FILE).touch()
+
+    def owns(self, full_repo_name: str) -> bool:
+        path = self.cache_path(full_repo_name)
+        return (path / PUSHED_REFS_FILE).exists() or (path / CREATED_FILE).exists()
+
+    def _run(self, full_repo_name: str, args: List[str], remote: Optional[GitRemote] = None) -> str:
+        env = {**os.environ, "GIT_TERMINAL_PROMPT": "0"}
+        if remote is not None and remote.authorization is not None:
+            # Passed through the environment to keep credentials out of argv and git config
+            env.update(
+                {
+                    "GIT_CONFIG_COUNT": "1",
+                    "GIT_CONFIG_KEY_0": "http.extraHeader",
+                    "GIT_CONFIG_VALUE_0": f"Authorization: {remote.authorization}",
+                }
+            )
+        try:
+            result = subprocess.run(
+                [self.git, *args], env=env, capture_output=True, text=True, check=True
+            )
+        except subprocess.CalledProcessError as e:
+            raise GitMirrorError(full_repo_name, e.stderr) from e
+        return result.stdout
+
+    def _refs(self, full_repo_name: str) -> str:
+        path = self.cache_path(full_repo_name)
+        return self._run(
+            full_repo_name,
+            [
+                "-C",
+                str(path),
+                "for-each-ref",
+                "--format=%(objectname) %(refname)",
+                *MIRRORED_NAMESPACES,
+            ],
+        )
+
+    def fetch(self, full_repo_name: str, source: GitRemote) -> None:
+        path = self.cache_path(full_repo_name)
+        if not (path / "HEAD").exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._run(full_repo_name, ["init", "--quiet", "--bare", str(path)])
+        # --prune with explicit refspecs only prunes refs inside the mirrored namespaces
+        self._run(
+            full_repo_name,
+            ["-C", str(path), "fetch", "--prune", "--no-tags", source.url, *REFSPECS],
+            source,
+        )
+
+    def push(self, full_repo_name: str, target: GitRemote) -> None:
+        path = self.cache_path(full_repo_name)
+        self._run(
+            full_repo_name, ["-C", str(path), "push", "--prune", target.url, *REFSPECS], target
+        )
+
+    def mirror(
+        self, full_repo_name: str, source: GitRemote, target: GitRemote, force: bool = False
+    ) -> bool:
+        """Refreshes the local mirror of a repository and pushes it when its refs changed
+        since the last push, or when `force` is set.
+
+        Returns whether anything was pushed to the target.
+        """
+        self.fetch(full_repo_name, source)
+        refs = self._refs(full_repo_name)
+        pushed_refs_file = self.cache_path(full_repo_name) / PUSHED_REFS_FILE
+        if not force and pushed_refs_file.exists() and pushed_refs_file.read_text() == refs:
+            return False
+        self.push(full_repo_name, target)
+        pushed_refs_file.write_text(refs)
+        return True
+
+
+def list_repos_to_push(
+    gh_repos: Iterable[Repository],
+    gitea_repos: Iterable[Repository],
+    missing_repos: Collection[Repository],
+    owner_mapping: OwnerMapping,
+    engine: GitMirrorEngine,
+    adopt_existing: bool = False,
+) -> List[Repository]:
+    """Lists the repositories created on Gitea and the existing repositories previously
+    created or pushed by `engine`. Other plain Gitea repositories sharing a Github name are only
+    pushed, overwriting their refs, with `adopt_existing`."""
+    # Pull mirrors created by Gitea reject pushes, only plain repositories are refreshed
+    pushable = {repo.full_repo_name.lower() for repo in gitea_repos if repo.original_url is None}
+    missing = set(missing_repos)
+    repos = []
+    for repo in gh_repos:
+        gitea_full_repo_name = owner_mapping.get_gitea_full_repo_name(repo)
+        if repo in missing or (
+            gitea_full_repo_name is not None
+            and gitea_full_repo_name.lower() in pushable
+            and (adopt_existing or engine.owns(repo.full_repo_name))
+        ):
+            repos.append(repo)
+    return repos
+
+
+def get_migrate_function(
+    engine: GitMirrorEngine,
+    gt: Gitea,
+    github_api_url: str,
+    github_token: str,
+    owner_mapping: OwnerMapping,
+    repos_to_create: Collection[str],
+) -> Callable[[Repository], None]:
+    github_url = github_web_url(github_api_url)
+    gitea_url = gitea_web_url(gt.api_url)
+
+    def migrate(repo: Repository) -> None:
+        owner = owner_mapping.get_gitea_owner(repo)
+        if owner is None:
+            raise ValueError("The git engine requires a default owner")
+        create = repo.full_repo_name in repos_to_create
+        if create:
+            gt.create_repo(
+                name=repo.get_repo_name(),
+                private=repo.visibility == Visibility.PRIVATE,
+                org=None if owner == owner_mapping.default_owner else owner,
+            )
+            engine.mark_created(repo.full_repo_name)
+        try:
+            engine.mirror(
+                repo.full_repo_name,
+                source=GitRemote.with_basic_auth(
+                    f"{github_url}/{repo.full_repo_name}.git", "x-access-token", github_token
+                ),
+                target=GitRemote.with_basic_auth(
+                    f"{gitea_url}/{owner}/{repo.get_repo_name()}.git",
+                    "gitea-github-sync",
+                    gt.api_token,
+                ),
+                force=create,
+            )
+        except GitMirrorError as e:
+            raise GiteaMigrationError(repo.full_repo_name) from e
+
+    return migrate
@@ -1,11 +1,11 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 
 import requests
 
-from gitea_github_sync import config
+from gitea_github_sync import config, profiling
 
 from .repository import Repository, Visibility
 
@@ -13,63 +13,175 @@ from .repository import Repository, Visibility
 @dataclass(frozen=True)
 class GiteaMigrationError(ValueError):
     full_repo_name: str
+    status_code: Optional[int] = None
+    unreachable: bool = False
+
+    @property
+    def is_overload(self) -> bool:
+        # Gitea being down or too busy, as opposed to a problem with this repository
+        if self.unreachable or self.status_code == 429:
+            return True
+        return self.status_code is not None and self.status_code >= 500
 
     def __str__(self) -> str:
         return f"Could not migrate {self.full_repo_name}"
 
 
+@dataclass(frozen=True)
+class GiteaEditError(ValueError):
+    full_repo_name: str
+
+    def __str__(self) -> str:
+        return f"Could not edit {self.full_repo_name}"
+
+
+@dataclass(frozen=True)
+class GiteaDeleteError(ValueError):
+    full_repo_name: str
+
+    def __str__(self) -> str:
+        return f"Could not delete {self.full_repo_name}"
+
+
 @dataclass(frozen=True)
 class Gitea:
     api_url: str
     api_token: str
+    migration_timeout_seconds: float = config.DEFAULT_GITEA_MIGRATION_TIMEOUT_SECONDS
 
     def _get_authorization_header(self) -> Dict[str, str]:
         return {"Authorization": f"token {self.api_token}"}
 
-    def _get_all_pages(self, path: str) -> List[Dict[str, Any]]:
-        output = []
+    def _iter_pages(self, path: str) -> Iterator[List[Dict[str, Any]]]:
         url: Optional[str] = f"{self.api_url}{path}"
         while url is not None:
             auth = self._get_authorization_header()
             result = requests.get(url, headers=auth)
             result.raise_for_status()
-            data = result.json()
-            output.extend(data)
+            with profiling.section("gitea.json_decode"):
+                data = result.json()
+            yield data
 
             url = result.links["next"]["url"] if "next" in result.links else None
-        return output
+
+    def _get_all_pages(self, path: str) -> List[Dict[str, Any]]:
+        return [item for page in self._iter_pages(path) for item in page]
+
+    @staticmethod
+    def _to_repository(repo: Dict[str, Any]) -> Repository:
+        return Repository(
+            repo["full_name"],
+            visibility=Visibility.PRIVATE if repo["private"] else Visibility.PUBLIC,
+            mirror_interval=repo.get("mirror_interval") if repo.get("mirror") else None,
+            original_url=(repo.get("original_url") or None) if repo.get("mirror") else None,
+            archived=repo.get("archived", False),
+            description=repo.get("description") or None,
+        )
+
+    def iter_repos(self) -> Iterator[Repository]:
+        for page in self._iter_pages("/user/repos"):
+            yield from (self._to_repository(repo) for repo in page)
 
     def get_repos(self) -> List[Repository]:
-        repos = self._get_all_pages("/user/repos")
-        return [
-            Repository(
-                repo["full_name"],
-                visibility=Visibility.PRIVATE if repo["private"] else Visibility.PUBLIC,
-            )
-            for repo in repos
-        ]
+        return [self._to_repository(repo) for repo in self._get_all_pages("/user/repos")]
 
-    def migrate_repo(self, repo: Repository, github_token: str) -> None:
-        request_data = {
+    def get_user_login(self) -> str:
+        result = requests.get(f"{self.api_url}/user", headers=self._get_authorization_header())
+        result.raise_for_status()
+        login: str = result.json()["login"]
+        return login
+
+    def repo_exists(self, full_repo_name: str) -> bool:
+        result = requests.get(
+            f"{self.api_url}/repos/{full_repo_name}", headers=self._get_authorization_header()
+        )
+        if result.status_code == 404:
+            return False
+        result.raise_for_status()
+        return True
+
+    def migrate_repo(
+        self,
+        repo: Repository,
+        github_token: str,
+        repo_owner: Optional[str] = None,
+        mirror_interval: Optional[str] = None,
+        options: Optional[Dict[str, Any]] = None,
+        github_url: str = "https://github.com",
+    ) -> None:
+        request_data: Dict[str, Any] = {
             "auth_token": github_token,
-            "clone_addr": f"https://github.com/{repo.full_repo_name}",
+            "clone_addr": f"{github_url}/{repo.full_repo_name}",
             "repo_name": repo.get_repo_name(),
             "service": "github",
             "mirror": True,
             "private": repo.visibility == Visibility.PRIVATE,
         }
-        res = requests.post(
-            f"{self.api_url}/repos/migrate",
+        if repo_owner is not None:
+            request_data["repo_owner"] = repo_owner
+        if repo.description is not None:
+            request_data["description"] = repo.description
+        if options is not None:
+            request_data.update(options)
+        if mirror_interval is not None and request_data["mirror"]:
+            request_data["mirror_interval"] = mirror_interval
+        try:
+            res = requests.post(
+                f"{self.api_url}/repos/migrate",
+                headers=self._get_authorization_header(),
+                json=request_data,
+                timeout=self.migration_timeout_seconds,
+            )
+        except (requests.ConnectionError, requests.Timeout) as e:
+            raise GiteaMigrationError(repo.full_repo_name, unreachable=True) from e
+        try:
+            res.raise_for_status()
+        except requests.HTTPError as e:
+            raise GiteaMigrationError(repo.full_repo_name, status_code=res.status_code) from e
+
+    def create_repo(self, name: str, private: bool, org: Optional[str] = None) -> None:
+        path = "/user/repos" if org is None else f"/orgs/{org}/repos"
+        full_repo_name = f"{org}/{name}" if org is not None else name
+        try:
+            res = requests.post(
+                f"{self.api_url}{path}",
+                headers=self._get_authorization_header(),
+                json={"name": name, "private": private},
+                timeout=self.migration_timeout_seconds,
+            )
+        except (requests.ConnectionError, requests.Timeout) as e:
+            raise GiteaMigrationError(full_repo_name, unreachable=True) from e
+        try:
+            res.raise_for_status()
+        except requests.HTTPError as e:
+            raise GiteaMigrationError(full_repo_name, status_code=res.status_code) from e
+
+    def edit_repo(self, full_repo_name: str, changes: Dict[str, Any]) -> None:
+        res = requests.patch(
+            f"{self.api_url}/repos/{full_repo_name}",
             headers=self._get_authorization_header(),
-            json=request_data,
+            json=changes,
+        )
+        try:
+            res.raise_for_status()
+        except requests.HTTPError as e:
+            raise GiteaEditError(full_repo_name) from e
+
+    def delete_repo(self, full_repo_name: str) -> None:
+        res = requests.delete(
+            f"{self.api_url}/repos/{full_repo_name}", headers=self._get_authorization_header()
         )
         try:
             res.raise_for_status()
         except requests.HTTPError as e:
-            raise GiteaMigrationError(repo.full_repo_name) from e
+            raise GiteaDeleteError(full_repo_name) from e
 
 
 def get_gitea(conf: Optional[config.Config] = None) -> Gitea:
     if conf is None:
         conf = config.load_config()
-    return Gitea(api_url=conf.gitea_api_url, api_token=conf.gitea_token)
+    return Gitea(
+        api_url=conf.gitea_api_url,
+        api_token=conf.gitea_token,
+        migration_timeout_seconds=conf.gitea_migration_timeout_seconds,
+    )
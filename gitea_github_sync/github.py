@@ -1,25 +1,74 @@
 from __future__ import annotations
 
-from typing import List, Optional
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timezone
+from functools import partial
+from typing import Dict, Iterator, List, Optional, Sequence
 
-from github import Github
+from github import Github, UnknownObjectException
+from github.Repository import Repository as GithubRepository
 
-from . import config
+from . import config, profiling
 from .repository import Repository, Visibility
 
 
 def get_github(conf: Optional[config.Config] = None) -> Github:
     if conf is None:
         conf = config.load_config()
-    return Github(login_or_token=conf.github_token)
+    return Github(login_or_token=conf.github_token, base_url=conf.github_api_url)
+
+
+def github_web_url(github_api_url: str) -> str:
+    api_url = github_api_url.rstrip("/")
+    if api_url == "https://api.github.com":
+        return "https://github.com"
+    return api_url[: -len("/api/v3")] if api_url.endswith("/api/v3") else api_url
+
+
+def _to_repository(repo: GithubRepository) -> Repository:
+    pushed_at = repo.pushed_at
+    if pushed_at is not None and pushed_at.tzinfo is None:
+        # Older PyGithub versions return naive UTC datetimes
+        pushed_at = pushed_at.replace(tzinfo=timezone.utc)
+    return Repository(
+        full_repo_name=repo.full_name,
+        visibility=Visibility.from_str(repo.visibility),
+        pushed_at=pushed_at,
+        archived=bool(repo.archived),
+        size_kb=repo.size,
+        description=repo.description or None,
+    )
 
 
 def list_all_repositories(gh: Github) -> List[Repository]:
     repos = gh.get_user().get_repos()
-    return [
-        Repository(
-            full_repo_name=repo.full_name,
-            visibility=Visibility.from_str(repo.visibility),
-        )
-        for repo in repos
-    ]
+    with profiling.section("github.list_all_repositories"):
+        return [_to_repository(repo) for repo in repos]
+
+
+def iter_all_repositories(gh: Github) -> Iterator[Repository]:
+    # Iterating a PaginatedList keeps every fetched repository, pages are requested
+    # one by one instead so that only the current page is kept in memory
+    repos = gh.get_user().get_repos()
+    for page in itertools.count():
+        items = repos.get_page(page)
+        if not items:
+            return
+        yield from (_to_repository(repo) for repo in items)
+
+
+def get_repository(gh: Github, full_repo_name: str) -> Optional[Repository]:
+    try:
+        repo = gh.get_repo(full_repo_name)
+    except UnknownObjectException:
+        return None
+    return _to_repository(repo)
+
+
+def get_repositories(
+    gh: Github, full_repo_names: Sequence[str], concurrency: int = 1
+) -> Dict[str, Optional[Repository]]:
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        repos = executor.map(partial(get_repository, gh), full_repo_names)
+        return dict(zip(full_repo_names, repos))
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import json
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from .repository import Repository
+
+
+@dataclass(frozen=True)
+class MigrationRecord:
+    full_repo_name: str
+    engine: str
+    size_kb: Optional[int]
+    seconds: float
+    succeeded: bool
+    finished_at: datetime
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "full_repo_name": self.full_repo_name,
+                "engine": self.engine,
+                "size_kb": self.size_kb,
+                "seconds": round(self.seconds, 3),
+                "succeeded": self.succeeded,
+                "finished_at": self.finished_at.isoformat(),
+            }
+        )
+
+    @staticmethod
+    def from_json(line: str) -> MigrationRecord:
+        data = json.loads(line)
+        return MigrationRecord(
+            full_repo_name=data["full_repo_name"],
+            engine=data["engine"],
+            size_kb=data["size_kb"],
+            seconds=data["seconds"],
+            succeeded=data["succeeded"],
+            finished_at=datetime.fromisoformat(data["finished_at"]),
+        )
+
+
+MAX_RECORDS = 10_000
+
+
+def load_history(
+    path: Path, engine: Optional[str] = None, limit: int = 1000
+) -> List[MigrationRecord]:
+    """Returns the `limit` most recent records of `engine`, ignoring unreadable lines."""
+    if not path.exists():
+        return []
+    records: List[MigrationRecord] = []
+    # Parsed from the end so that only the returned records are decoded
+    for line in reversed(path.read_text().splitlines()):
+        if len(records) >= limit:
+            break
+        try:
+            record = MigrationRecord.from_json(line)
+        except (ValueError, KeyError, TypeError):
+            continue
+        if engine is None or record.engine == engine:
+            records.append(record)
+    return records[::-1]
+
+
+@dataclass
+class HistoryRecorder:
+    """Appends a record per finished migration to `path`.
+
+    The file is trimmed to its `max_records` most recent lines before the first record of
+    a run. Recording is a side feature: the first `OSError` is passed to `on_error` and
+    recording stops, migrations go on."""
+
+    path: Path
+    engine: str
+    clock: Callable[[], float] = time.monotonic
+    max_records: int = MAX_RECORDS
+    on_error: Optional[Callable[[OSError], None]] = None
+    _started_at: Dict[Repository, float] = field(default_factory=dict)
+    _trimmed: bool = False
+    _failed: bool = False
+
+    def start(self, repo: Repository) -> None:
+        self._started_at[repo] = self.clock()
+
+    def _trim(self) -> None:
+        if not self.path.exists():
+            return
+        lines = self.path.read_text().splitlines(keepends=True)
+        if len(lines) <= self.max_records:
+            return
+        trimmed = self.path.with_name(f"{self.path.name}.tmp")
+        trimmed.write_text("".join(lines[-self.max_records :]))
+        trimmed.replace(self.path)
+
+    def _append(self, record: MigrationRecord) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if not self._trimmed:
+            self._trim()
+            self._trimmed = True
+        with self.path.open("a") as f:
+            f.write(record.to_json() + "\n")
+
+    def finish(self, repo: Repository, succeeded: bool) -> None:
+        started_at = self._started_at.pop(repo, None)
+        if started_at is None or self._failed:
+            return
+        record = MigrationRecord(
+            full_repo_name=repo.full_repo_name,
+            engine=self.engine,
+            size_kb=repo.size_kb,
+            seconds=self.clock() - started_at,
+            succeeded=succeeded,
+            finished_at=datetime.now(timezone.utc),
+        )
+        # Appended as migrations finish so that interrupted runs are still recorded
+        try:
+            self._append(record)
+        except OSError as e:
+            self._failed = True
+            if self.on_error is not None:
+                self.on_error(e)
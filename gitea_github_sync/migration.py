@@ -1,10 +1,418 @@
-from typing import List
+from __future__ import annotations
 
-from gitea_github_sync.repository import Repository
+import json
+import tempfile
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+)
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Sized,
+    Tuple,
+    Union,
+)
+from urllib.parse import urlsplit
+
+from github import Github
+
+from gitea_github_sync import external_sort, github
+from gitea_github_sync.gitea import (
+    Gitea,
+    GiteaDeleteError,
+    GiteaEditError,
+    GiteaMigrationError,
+)
+from gitea_github_sync.repository import Repository, Visibility
+from gitea_github_sync.throttling import AIMDController, CircuitBreaker
+
+
+@dataclass(frozen=True)
+class OwnerMapping:
+    mapping: Mapping[str, str] = field(default_factory=dict)
+    default_owner: Optional[str] = None
+
+    def get_gitea_owner(self, repo: Repository) -> Optional[str]:
+        return self.mapping.get(repo.get_org_name(), self.default_owner)
+
+    def get_gitea_full_repo_name(self, repo: Repository) -> Optional[str]:
+        owner = self.get_gitea_owner(repo)
+        return None if owner is None else f"{owner}/{repo.get_repo_name()}"
+
+
+def _gitea_key(repo: Repository, owner_mapping: OwnerMapping) -> str:
+    # Without a known Gitea owner, only the bare repository name can be compared
+    full_repo_name = owner_mapping.get_gitea_full_repo_name(repo)
+    return (full_repo_name or repo.get_repo_name()).lower()
+
+
+def _split_unique_targets(
+    gh_repos: Iterable[Repository], owner_mapping: OwnerMapping
+) -> Tuple[List[Tuple[str, Repository]], List[Repository]]:
+    claimed: Set[str] = set()
+    unique: List[Tuple[str, Repository]] = []
+    conflicting: List[Repository] = []
+    for repo in gh_repos:
+        key = _gitea_key(repo, owner_mapping)
+        if key in claimed:
+            conflicting.append(repo)
+        else:
+            claimed.add(key)
+            unique.append((key, repo))
+    return unique, conflicting
+
+
+def list_conflicting_github_repos(
+    gh_repos: List[Repository], owner_mapping: Optional[OwnerMapping] = None
+) -> List[Repository]:
+    _, conflicting = _split_unique_targets(gh_repos, owner_mapping or OwnerMapping())
+    return conflicting
 
 
 def list_missing_github_repos(
-    gh_repos: List[Repository], gitea_repos: List[Repository]
+    gh_repos: List[Repository],
+    gitea_repos: List[Repository],
+    owner_mapping: Optional[OwnerMapping] = None,
+) -> List[Repository]:
+    owner_mapping = owner_mapping or OwnerMapping()
+    gitea_index = {repo.full_repo_name.lower() for repo in gitea_repos}
+    gitea_index.update(repo.get_repo_name().lower() for repo in gitea_repos)
+    unique, _ = _split_unique_targets(gh_repos, owner_mapping)
+    return [repo for key, repo in unique if key not in gitea_index]
+
+
+def _dump_github_entry(entry: Tuple[str, int, Repository]) -> str:
+    key, index, repo = entry
+    pushed_at = None if repo.pushed_at is None else repo.pushed_at.isoformat()
+    return json.dumps(
+        [
+            key,
+            index,
+            repo.full_repo_name,
+            repo.visibility.to_str(),
+            pushed_at,
+            repo.mirror_interval,
+            repo.original_url,
+            repo.archived,
+            repo.size_kb,
+            repo.description,
+        ]
+    )
+
+
+def _load_github_entry(line: str) -> Tuple[str, int, Repository]:
+    (
+        key,
+        index,
+        full_repo_name,
+        visibility,
+        pushed_at,
+        mirror_interval,
+        original_url,
+        archived,
+        size_kb,
+        description,
+    ) = json.loads(line)
+    repo = Repository(
+        full_repo_name,
+        Visibility.from_str(visibility),
+        pushed_at=None if pushed_at is None else datetime.fromisoformat(pushed_at),
+        mirror_interval=mirror_interval,
+        original_url=original_url,
+        archived=archived,
+        size_kb=size_kb,
+        description=description,
+    )
+    return key, index, repo
+
+
+def iter_missing_github_repos(
+    gh_repos: Iterable[Repository],
+    gitea_repos: Iterable[Repository],
+    owner_mapping: Optional[OwnerMapping] = None,
+    on_conflict: Optional[Callable[[Repository], None]] = None,
+    run_size: int = external_sort.DEFAULT_RUN_SIZE,
+    directory: Optional[Path] = None,
+) -> Iterator[Repository]:
+    """Streaming equivalent of `list_missing_github_repos` for inventories that do not fit
+    in memory. Both inventories are spilled to sorted runs and merge-joined on their
+    Gitea name, missing repositories are yielded in that order rather than the Github one.
+    """
+    owner_mapping = owner_mapping or OwnerMapping()
+    with tempfile.TemporaryDirectory(prefix="gitea-github-sync-", dir=directory) as tmp:
+        gitea_dir = Path(tmp) / "gitea"
+        github_dir = Path(tmp) / "github"
+        gitea_dir.mkdir()
+        github_dir.mkdir()
+        gitea_keys = iter(
+            external_sort.external_sort(
+                (
+                    key
+                    for repo in gitea_repos
+                    for key in (repo.full_repo_name.lower(), repo.get_repo_name().lower())
+                ),
+                key=lambda key: key,
+                dump=json.dumps,
+                load=json.loads,
+                directory=gitea_dir,
+                run_size=run_size,
+            )
+        )
+        # The Github position breaks ties so that the first repository claiming a name wins
+        github_entries = external_sort.external_sort(
+            ((_gitea_key(repo, owner_mapping), index, repo) for index, repo in enumerate(gh_repos)),
+            key=lambda entry: entry[:2],
+            dump=_dump_github_entry,
+            load=_load_github_entry,
+            directory=github_dir,
+            run_size=run_size,
+        )
+        gitea_key = next(gitea_keys, None)
+        previous_key: Optional[str] = None
+        for key, _, repo in github_entries:
+            if key == previous_key:
+                if on_conflict is not None:
+                    on_conflict(repo)
+                continue
+            previous_key = key
+            while gitea_key is not None and gitea_key < key:
+                gitea_key = next(gitea_keys, None)
+            if gitea_key != key:
+                yield repo
+
+
+def probe_missing_github_repos(
+    gt: Gitea,
+    gh_repos: List[Repository],
+    owner_mapping: OwnerMapping,
+    concurrency: int = 1,
+) -> List[Repository]:
+    if owner_mapping.default_owner is None:
+        raise ValueError("Probing Gitea requires a default owner")
+    unique, _ = _split_unique_targets(gh_repos, owner_mapping)
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        exists = executor.map(gt.repo_exists, (key for key, _ in unique))
+        return [repo for (_, repo), repo_exists in zip(unique, exists) if not repo_exists]
+
+
+@dataclass
+class MigrationSummary:
+    # Only counts are kept so that streamed runs do not hold on to every repository
+    migrated: int = 0
+    failed: int = 0
+    # Whether the circuit breaker or `max_duration` stopped the run, remaining repositories
+    # are not read from the iterable so they are only counted when it is sized
+    skipped: bool = False
+    deferred: bool = False
+    nb_remaining: Optional[int] = None
+
+    @property
+    def total(self) -> int:
+        return self.migrated + self.failed
+
+
+def _count_remaining(repos: Iterable[Repository], nb_started: int) -> Optional[int]:
+    return len(repos) - nb_started if isinstance(repos, Sized) else None
+
+
+def migrate_repos(
+    repos: Iterable[Repository],
+    migrate: Callable[[Repository], None],
+    concurrency: int = 1,
+    on_start: Optional[Callable[[Repository], None]] = None,
+    on_result: Optional[Callable[[Repository, Optional[GiteaMigrationError]], None]] = None,
+    controller: Optional[AIMDController] = None,
+    breaker: Optional[CircuitBreaker] = None,
+    max_duration: Optional[float] = None,
+) -> MigrationSummary:
+    # Callbacks are invoked from the calling thread so that they can print safely.
+    # With a controller, `concurrency` is ignored in favor of its adaptive limit.
+    # After `max_duration` seconds no migration is started, the rest is deferred.
+    summary = MigrationSummary()
+    deadline = None if max_duration is None else time.monotonic() + max_duration
+    pending = iter(repos)
+    nb_started = 0
+    exhausted = False
+    in_flight: Dict[Future[None], Tuple[Repository, float]] = {}
+    max_workers = concurrency if controller is None else controller.max_limit
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while True:
+            limit = concurrency if controller is None else controller.limit
+            while not exhausted and len(in_flight) < limit:
+                if deadline is not None and time.monotonic() >= deadline:
+                    summary.deferred = True
+                    summary.nb_remaining = _count_remaining(repos, nb_started)
+                    exhausted = True
+                    break
+                if breaker is not None and not breaker.allow():
+                    break
+                repo = next(pending, None)
+                if repo is None:
+                    exhausted = True
+                    break
+                nb_started += 1
+                if on_start is not None:
+                    on_start(repo)
+                in_flight[executor.submit(migrate, repo)] = (repo, time.monotonic())
+            if not in_flight:
+                if exhausted:
+                    break
+                assert breaker is not None
+                if breaker.gave_up:
+                    summary.skipped = True
+                    summary.nb_remaining = _count_remaining(repos, nb_started)
+                    break
+                retry_in = breaker.retry_in()
+                if deadline is not None:
+                    retry_in = min(retry_in, max(0.0, deadline - time.monotonic()))
+                time.sleep(retry_in)
+                continue
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                repo, started_at = in_flight.pop(future)
+                error = future.exception()
+                if error is not None and not isinstance(error, GiteaMigrationError):
+                    raise error
+                overloaded = error is not None and error.is_overload
+                if controller is not None:
+                    controller.record(started_at, time.monotonic() - started_at, overloaded)
+                if breaker is not None:
+                    breaker.record(overloaded)
+                if error is None:
+                    summary.migrated += 1
+                else:
+                    summary.failed += 1
+                if on_result is not None:
+                    on_result(repo, error)
+    return summary
+
+
+@dataclass
+class EditSummary:
+    updated: List[str] = field(default_factory=list)
+    failed: List[str] = field(default_factory=list)
+
+    @property
+    def total(self) -> int:
+        return len(self.updated) + len(self.failed)
+
+
+RepoOperationError = Union[GiteaEditError, GiteaDeleteError]
+
+
+def _run_repo_operations(
+    operations: Iterable[Tuple[str, Callable[[], None]]],
+    concurrency: int,
+    on_result: Optional[Callable[[str, Optional[RepoOperationError]], None]],
+) -> EditSummary:
+    summary = EditSummary()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = {
+            executor.submit(operation): full_repo_name for full_repo_name, operation in operations
+        }
+        for future in as_completed(futures):
+            full_repo_name = futures[future]
+            error = future.exception()
+            if error is not None and not isinstance(error, (GiteaEditError, GiteaDeleteError)):
+                raise error
+            if error is None:
+                summary.updated.append(full_repo_name)
+            else:
+                summary.failed.append(full_repo_name)
+            if on_result is not None:
+                on_result(full_repo_name, error)
+    return summary
+
+
+def edit_repos(
+    gt: Gitea,
+    edits: Iterable[Tuple[str, Dict[str, Any]]],
+    concurrency: int = 1,
+    on_result: Optional[Callable[[str, Optional[RepoOperationError]], None]] = None,
+) -> EditSummary:
+    return _run_repo_operations(
+        ((name, partial(gt.edit_repo, name, changes)) for name, changes in edits),
+        concurrency,
+        on_result,
+    )
+
+
+def delete_repos(
+    gt: Gitea,
+    full_repo_names: Iterable[str],
+    concurrency: int = 1,
+    on_result: Optional[Callable[[str, Optional[RepoOperationError]], None]] = None,
+) -> EditSummary:
+    return _run_repo_operations(
+        ((name, partial(gt.delete_repo, name)) for name in full_repo_names),
+        concurrency,
+        on_result,
+    )
+
+
+def parse_github_full_repo_name(url: str, github_url: str = "https://github.com") -> Optional[str]:
+    parsed = urlsplit(url)
+    if parsed.hostname is None or parsed.hostname != urlsplit(github_url).hostname:
+        return None
+    parts = parsed.path.strip("/").split("/")
+    if len(parts) != 2 or not all(parts):
+        return None
+    owner, name = parts
+    return f"{owner}/{name[:-4] if name.endswith('.git') else name}"
+
+
+def list_orphan_mirror_candidates(
+    gitea_repos: Iterable[Repository],
+    gh_repos: Iterable[Repository],
+    owner_mapping: OwnerMapping,
+    github_url: str = "https://github.com",
+) -> Dict[str, Tuple[str, Repository]]:
+    """Maps the Gitea name of mirrors whose Github source is not listed to that source."""
+    # Only mirrors in namespaces managed through the owner mapping are considered
+    managed_owners = {owner.lower() for owner in owner_mapping.mapping.values()}
+    if owner_mapping.default_owner is not None:
+        managed_owners.add(owner_mapping.default_owner.lower())
+    gh_index = {repo.full_repo_name.lower() for repo in gh_repos}
+    candidates = {}
+    for repo in gitea_repos:
+        if repo.original_url is None or repo.get_org_name().lower() not in managed_owners:
+            continue
+        source = parse_github_full_repo_name(repo.original_url, github_url)
+        if source is not None and source.lower() not in gh_index:
+            candidates[repo.full_repo_name] = (source, repo)
+    return candidates
+
+
+def list_orphan_mirrors(
+    gh: Github,
+    gitea_repos: Iterable[Repository],
+    gh_repos: Iterable[Repository],
+    owner_mapping: OwnerMapping,
+    concurrency: int = 1,
+    github_url: str = "https://github.com",
 ) -> List[Repository]:
-    gitea_repos_by_name = [repo.get_repo_name() for repo in gitea_repos]
-    return [repo for repo in gh_repos if repo.get_repo_name() not in gitea_repos_by_name]
+    candidates = list_orphan_mirror_candidates(gitea_repos, gh_repos, owner_mapping, github_url)
+    # Repositories missing from the listing may still be reachable, e.g. public repos of others
+    sources = github.get_repositories(
+        gh,
+        list(dict.fromkeys(source for source, _ in candidates.values())),
+        concurrency=concurrency,
+    )
+    return [repo for source, repo in candidates.values() if sources[source] is None]
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional
+
+from .config import MirrorIntervalTier
+from .migration import OwnerMapping
+from .repository import Repository
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {
+    "h": timedelta(hours=1),
+    "m": timedelta(minutes=1),
+    "s": timedelta(seconds=1),
+    "ms": timedelta(milliseconds=1),
+}
+
+
+def parse_duration(value: str) -> timedelta:
+    # Gitea serializes intervals as Go durations, e.g. 8h0m0s
+    parts = _DURATION_PART.findall(value)
+    if not parts or "".join(amount + unit for amount, unit in parts) != value:
+        raise ValueError(f"Invalid duration {value!r}")
+    return sum((_DURATION_UNITS[unit] * float(amount) for amount, unit in parts), start=timedelta())
+
+
+def _same_interval(current: Optional[str], target: str) -> bool:
+    if current is None:
+        return False
+    try:
+        return parse_duration(current) == parse_duration(target)
+    except ValueError:
+        return False
+
+
+def select_mirror_interval(
+    repo: Repository, tiers: List[MirrorIntervalTier], now: datetime
+) -> Optional[str]:
+    if not tiers:
+        return None
+    if repo.pushed_at is None:
+        return tiers[-1].mirror_interval
+    inactivity = now - repo.pushed_at
+    for tier in tiers:
+        if tier.max_inactivity_days is None or inactivity <= timedelta(
+            days=tier.max_inactivity_days
+        ):
+            return tier.mirror_interval
+    return tiers[-1].mirror_interval
+
+
+@dataclass(frozen=True)
+class MirrorIntervalUpdate:
+    gitea_full_repo_name: str
+    current_mirror_interval: Optional[str]
+    mirror_interval: str
+
+
+def list_mirror_interval_updates(
+    gh_repos: Iterable[Repository],
+    gitea_repos: Iterable[Repository],
+    owner_mapping: OwnerMapping,
+    tiers: List[MirrorIntervalTier],
+    now: datetime,
+) -> List[MirrorIntervalUpdate]:
+    gitea_mirrors = {
+        repo.full_repo_name.lower(): repo
+        for repo in gitea_repos
+        if repo.mirror_interval is not None
+    }
+    updates = []
+    for gh_repo in gh_repos:
+        gitea_full_repo_name = owner_mapping.get_gitea_full_repo_name(gh_repo)
+        if gitea_full_repo_name is None:
+            continue
+        gitea_repo = gitea_mirrors.get(gitea_full_repo_name.lower())
+        mirror_interval = select_mirror_interval(gh_repo, tiers, now)
+        if gitea_repo is None or mirror_interval is None:
+            continue
+        if not _same_interval(gitea_repo.mirror_interval, mirror_interval):
+            updates.append(
+                MirrorIntervalUpdate(
+                    gitea_full_repo_name=gitea_repo.full_repo_name,
+                    current_mirror_interval=gitea_repo.mirror_interval,
+                    mirror_interval=mirror_interval,
+                )
+            )
+    return updates
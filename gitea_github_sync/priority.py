@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import math
+from datetime import datetime
+from fnmatch import fnmatchcase
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from .config import MigrationPriority
+from .repository import Repository
+
+
+def _listed(repo: Repository, priority: MigrationPriority, now: datetime) -> float:
+    full_repo_name = repo.full_repo_name.lower()
+    return next(
+        (
+            index
+            for index, pattern in enumerate(priority.repos)
+            if fnmatchcase(full_repo_name, pattern.lower())
+        ),
+        len(priority.repos),
+    )
+
+
+def _recent(repo: Repository, priority: MigrationPriority, now: datetime) -> float:
+    if repo.pushed_at is None:
+        return math.inf
+    # Pushes within the same window are equally recent so that the next criteria apply
+    inactive_days = max(0.0, (now - repo.pushed_at).total_seconds() / 86400)
+    return inactive_days // priority.recent_days
+
+
+def _small(repo: Repository, priority: MigrationPriority, now: datetime) -> float:
+    return math.inf if repo.size_kb is None else repo.size_kb
+
+
+CRITERIA: Dict[str, Callable[[Repository, MigrationPriority, datetime], float]] = {
+    "listed": _listed,
+    "recent": _recent,
+    "small": _small,
+}
+
+
+def priority_key(repo: Repository, priority: MigrationPriority, now: datetime) -> Tuple[float, ...]:
+    """Lower keys are migrated first, criteria are compared in the configured order."""
+    return tuple(CRITERIA[criterion](repo, priority, now) for criterion in priority.order)
+
+
+def prioritize(
+    repos: Iterable[Repository], priority: MigrationPriority, now: datetime
+) -> List[Repository]:
+    # A stable sort keeps the Github order between repositories of equal priority
+    return sorted(repos, key=lambda repo: priority_key(repo, priority, now))
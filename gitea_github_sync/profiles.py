@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from fnmatch import fnmatchcase
+from typing import Any, Dict, List, Optional
+
+from .config import MigrationProfile
+from .repository import Repository
+
+KB_PER_GB = 1024 * 1024
+
+
+def profile_matches(repo: Repository, profile: MigrationProfile) -> bool:
+    owner = repo.get_org_name().lower()
+    full_repo_name = repo.full_repo_name.lower()
+    if profile.owners and owner not in {o.lower() for o in profile.owners}:
+        return False
+    if profile.patterns and not any(
+        fnmatchcase(full_repo_name, pattern.lower()) for pattern in profile.patterns
+    ):
+        return False
+    return True
+
+
+def select_profile(
+    repo: Repository, profiles: List[MigrationProfile]
+) -> Optional[MigrationProfile]:
+    return next((profile for profile in profiles if profile_matches(repo, profile)), None)
+
+
+def migration_options(repo: Repository, profile: MigrationProfile) -> Dict[str, Any]:
+    lfs = profile.lfs
+    if lfs and profile.lfs_max_repo_size_gb is not None and repo.size_kb is not None:
+        lfs = repo.size_kb <= profile.lfs_max_repo_size_gb * KB_PER_GB
+    options: Dict[str, Any] = {
+        "mirror": profile.mirror,
+        "wiki": profile.wiki,
+        "lfs": lfs,
+        "issues": profile.issues,
+        "labels": profile.labels,
+        "milestones": profile.milestones,
+        "releases": profile.releases,
+        "pull_requests": profile.pull_requests,
+    }
+    if lfs and profile.lfs_endpoint is not None:
+        options["lfs_endpoint"] = profile.lfs_endpoint
+    return options
+
+
+def select_migration_options(
+    repo: Repository, profiles: List[MigrationProfile]
+) -> Optional[Dict[str, Any]]:
+    profile = select_profile(repo, profiles)
+    return None if profile is None else migration_options(repo, profile)
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import cProfile
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from threading import Lock
+from types import FrameType
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+PROFILERS = ["cprofile", "tracemalloc"]
+
+# (file, line, function name) as used by pstats
+FunctionKey = Tuple[str, int, str]
+
+
+@dataclass
+class SectionStats:
+    calls: int = 0
+    seconds: float = 0.0
+    # Change of the traced memory while in the section, negative when it freed more than
+    # it allocated
+    net_allocated_bytes: int = 0
+
+
+@dataclass
+class _Sections:
+    enabled: bool = False
+    stats: Dict[str, SectionStats] = field(default_factory=dict)
+    lock: Lock = field(default_factory=Lock)
+
+
+_sections = _Sections()
+
+
+@contextmanager
+def section(name: str) -> Iterator[None]:
+    """Tags a hot spot so that its time and allocations are reported separately when a
+    command runs with `--profile`."""
+    if not _sections.enabled:
+        yield
+        return
+    tracing = tracemalloc.is_tracing()
+    memory_before = tracemalloc.get_traced_memory()[0] if tracing else 0
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        net_allocated = tracemalloc.get_traced_memory()[0] - memory_before if tracing else 0
+        with _sections.lock:
+            stats = _sections.stats.setdefault(name, SectionStats())
+            stats.calls += 1
+            stats.seconds += seconds
+            stats.net_allocated_bytes += net_allocated
+
+
+def _label(func: FunctionKey) -> str:
+    filename, line, name = func
+    return f"{name} ({Path(filename).name}:{line})" if line else name
+
+
+def collapsed_stacks(stats: pstats.Stats, min_share: float = 0.001) -> List[str]:
+    """Approximates collapsed stacks from the caller/callee graph of cProfile stats.
+
+    The time of a function called from several places is split between its callers in
+    proportion to the cumulative time recorded for each call edge."""
+    raw = stats.stats  # type: ignore[attr-defined]
+    callees: Dict[FunctionKey, List[FunctionKey]] = {}
+    for func, (_, _, _, _, callers) in raw.items():
+        for caller in callers:
+            callees.setdefault(caller, []).append(func)
+    total = sum(tt for _, _, tt, _, _ in raw.values()) or 1.0
+    lines: Dict[str, float] = {}
+
+    def walk(func: FunctionKey, stack: List[str], share: float) -> None:
+        _, _, tt, ct, _ = raw[func]
+        stack = [*stack, _label(func)]
+        if tt * share > 0:
+            key = ";".join(stack)
+            lines[key] = lines.get(key, 0.0) + tt * share
+        for callee in callees.get(func, []):
+            if _label(callee) in stack:
+                continue
+            callee_ct = raw[callee][3]
+            edge_ct = raw[callee][4][func][3]
+            if not callee_ct or edge_ct * share < min_share * total:
+                continue
+            walk(callee, stack, share * edge_ct / callee_ct)
+
+    for func, (_, _, _, ct, callers) in raw.items():
+        # Functions entered before the profiler was enabled have no recorded caller
+        called = sum(edge[3] for caller, edge in callers.items() if caller != func)
+        if ct and ct - called >= min_share * total:
+            walk(func, [], (ct - called) / ct)
+    microseconds = {key: round(seconds * 1_000_000) for key, seconds in lines.items()}
+    return [f"{key} {value}" for key, value in microseconds.items() if value > 0]
+
+
+def _format_sections() -> List[str]:
+    with _sections.lock:
+        sections = sorted(_sections.stats.items(), key=lambda item: -item[1].seconds)
+    return [
+        f"{name}\tcalls={stats.calls}\tseconds={stats.seconds:.3f}\t"
+        f"net_allocated_kib={stats.net_allocated_bytes / 1024:.1f}"
+        for name, stats in sections
+    ]
+
+
+@dataclass
+class Profiler:
+    kind: str
+    output_dir: Path
+    name: str
+    top: int = 25
+    _profile: Optional[cProfile.Profile] = None
+    _thread_profiles: List[cProfile.Profile] = field(default_factory=list)
+
+    def path(self, suffix: str) -> Path:
+        return self.output_dir / f"{self.name}.{suffix}"
+
+    def start(self) -> None:
+        with _sections.lock:
+            _sections.enabled = True
+            _sections.stats.clear()
+        if self.kind == "cprofile":
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+            # cProfile only follows the thread that enabled it before Python 3.12, migrations
+            # and lookups run in thread pools that get a profile of their own
+            if sys.version_info < (3, 12):
+                threading.setprofile(self._profile_thread)
+        else:
+            tracemalloc.start(25)
+
+    def _profile_thread(self, frame: FrameType, event: str, arg: Any) -> None:
+        # Called on the first event of every thread started while profiling, enabling a
+        # profile replaces this hook for the thread
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            sys.setprofile(None)
+            return
+        self._thread_profiles.append(profile)
+
+    def stop(self) -> List[Path]:
+        _sections.enabled = False
+        threading.setprofile(None)
+        if self._profile is not None:
+            self._profile.disable()
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        written = []
+        if self._profile is not None:
+            stats = pstats.Stats(self._profile, *self._thread_profiles)
+            stats.dump_stats(str(self.path("pstats")))
+            self.path("collapsed").write_text("\n".join(collapsed_stacks(stats)) + "\n")
+            written += [self.path("pstats"), self.path("collapsed")]
+        if tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+            top_stats = snapshot.statistics("lineno")[: self.top]
+            self.path("memory.txt").write_text("\n".join(str(stat) for stat in top_stats) + "\n")
+            written.append(self.path("memory.txt"))
+        self.path("sections.txt").write_text("\n".join(_format_sections()) + "\n")
+        written.append(self.path("sections.txt"))
+        return written
@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import sys
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import timedelta
+from threading import Event, Lock, Thread
+from types import TracebackType
+from typing import Callable, Deque, Dict, Optional, TextIO, Type
+
+from rich.console import Console
+from rich.progress import (
+    BarColumn,
+    MofNCompleteColumn,
+    Progress,
+    ProgressColumn,
+    Task,
+    TaskID,
+    TextColumn,
+)
+from rich.text import Text
+
+from .repository import Repository
+
+
+def format_duration(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "-"
+    return str(timedelta(seconds=round(seconds)))
+
+
+@dataclass(frozen=True)
+class ProgressSnapshot:
+    total: Optional[int]
+    migrated: int
+    failed: int
+    in_flight: int
+    elapsed: float
+    average_duration: Optional[float]
+    throughput: Optional[float]
+
+    @property
+    def done(self) -> int:
+        return self.migrated + self.failed
+
+    @property
+    def eta(self) -> Optional[float]:
+        if not self.throughput or self.total is None:
+            return None
+        return (self.total - self.done) / self.throughput
+
+    def _format_average_duration(self) -> str:
+        return "-" if self.average_duration is None else f"{self.average_duration:.1f}s"
+
+    def _format_throughput(self) -> str:
+        return "-" if self.throughput is None else f"{self.throughput * 60:.1f}/min"
+
+    def to_log_line(self) -> str:
+        total = "?" if self.total is None else self.total
+        return (
+            f"progress done={self.done}/{total} migrated={self.migrated} "
+            f"failed={self.failed} in_flight={self.in_flight} "
+            f"avg={self._format_average_duration()} throughput={self._format_throughput()} "
+            f"eta={format_duration(self.eta)}"
+        )
+
+    def to_status(self) -> str:
+        return (
+            f"in flight {self.in_flight} · failed {self.failed} · "
+            f"avg {self._format_average_duration()} · {self._format_throughput()} · "
+            f"ETA {format_duration(self.eta)}"
+        )
+
+
+@dataclass
+class MigrationProgress:
+    total: Optional[int]
+    window: int = 20
+    clock: Callable[[], float] = time.monotonic
+    migrated: int = 0
+    failed: int = 0
+    _started_at: Dict[Repository, float] = field(default_factory=dict)
+    _durations: Deque[float] = field(default_factory=deque)
+    _first_start: Optional[float] = None
+    _lock: Lock = field(default_factory=Lock)
+
+    def start(self, repo: Repository) -> None:
+        now = self.clock()
+        with self._lock:
+            if self._first_start is None:
+                self._first_start = now
+            self._started_at[repo] = now
+
+    def finish(self, repo: Repository, failed: bool) -> None:
+        now = self.clock()
+        with self._lock:
+            started_at = self._started_at.pop(repo, now)
+            self._durations.append(now - started_at)
+            if len(self._durations) > self.window:
+                self._durations.popleft()
+            if failed:
+                self.failed += 1
+            else:
+                self.migrated += 1
+
+    def snapshot(self) -> ProgressSnapshot:
+        now = self.clock()
+        with self._lock:
+            elapsed = 0.0 if self._first_start is None else now - self._first_start
+            done = self.migrated + self.failed
+            return ProgressSnapshot(
+                total=self.total,
+                migrated=self.migrated,
+                failed=self.failed,
+                in_flight=len(self._started_at),
+                elapsed=elapsed,
+                average_duration=(
+                    sum(self._durations) / len(self._durations) if self._durations else None
+                ),
+                throughput=done / elapsed if done and elapsed > 0 else None,
+            )
+
+
+class ProgressReporter:
+    def __init__(self, progress: MigrationProgress) -> None:
+        self.progress = progress
+
+    def start(self, repo: Repository) -> None:
+        self.progress.start(repo)
+        self.refresh()
+
+    def finish(self, repo: Repository, failed: bool) -> None:
+        self.progress.finish(repo, failed)
+        self.refresh()
+
+    def refresh(self) -> None:
+        pass
+
+    def __enter__(self) -> ProgressReporter:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        pass
+
+
+class LogProgressReporter(ProgressReporter):
+    def __init__(
+        self, progress: MigrationProgress, interval: float = 30, file: Optional[TextIO] = None
+    ) -> None:
+        super().__init__(progress)
+        self.interval = interval
+        self.file = file
+        self._stopped = Event()
+        self._thread = Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        # Logs on a timer rather than on results so that a stuck migration is still visible
+        while not self._stopped.wait(self.interval):
+            self.log()
+
+    def log(self) -> None:
+        print(self.progress.snapshot().to_log_line(), file=self.file or sys.stderr, flush=True)
+
+    def __enter__(self) -> ProgressReporter:
+        self._thread.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self._stopped.set()
+        self._thread.join()
+
+
+class _StatusColumn(ProgressColumn):
+    def __init__(self, progress: MigrationProgress) -> None:
+        super().__init__()
+        self.progress = progress
+
+    def render(self, task: Task) -> Text:
+        # Rendered from the refresh thread so that the throughput and ETA keep moving
+        return Text(self.progress.snapshot().to_status())
+
+
+class RichProgressReporter(ProgressReporter):
+    def __init__(self, progress: MigrationProgress, console: Console) -> None:
+        super().__init__(progress)
+        self._progress_bar = Progress(
+            TextColumn("[progress.description]{task.description}"),
+            BarColumn(),
+            MofNCompleteColumn(),
+            _StatusColumn(progress),
+            console=console,
+        )
+        self._task: Optional[TaskID] = None
+
+    def refresh(self) -> None:
+        if self._task is not None:
+            self._progress_bar.update(self._task, completed=self.progress.snapshot().done)
+
+    def __enter__(self) -> ProgressReporter:
+        self._progress_bar.start()
+        self._task = self._progress_bar.add_task("Migrating", total=self.progress.total)
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.refresh()
+        self._progress_bar.stop()
+
+
+def get_progress_reporter(total: Optional[int], console: Console) -> ProgressReporter:
+    progress = MigrationProgress(total=total)
+    if console.is_terminal:
+        return RichProgressReporter(progress, console)
+    return LogProgressReporter(progress)
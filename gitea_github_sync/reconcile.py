@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Collection, Dict, Iterable, List
+
+from .migration import OwnerMapping
+from .repository import Repository, Visibility
+
+FIELDS = ["visibility", "description", "archived"]
+
+
+@dataclass(frozen=True)
+class FieldChange:
+    field: str
+    current: Any
+    expected: Any
+
+    def to_gitea(self) -> Dict[str, Any]:
+        if self.field == "visibility":
+            return {"private": self.expected == Visibility.PRIVATE}
+        if self.field == "description":
+            return {"description": self.expected or ""}
+        return {self.field: self.expected}
+
+    def to_str(self) -> str:
+        def render(value: Any) -> str:
+            return value.to_str() if isinstance(value, Visibility) else repr(value)
+
+        return f"{self.field}: {render(self.current)} -> {render(self.expected)}"
+
+
+@dataclass(frozen=True)
+class RepositoryDrift:
+    gitea_full_repo_name: str
+    changes: List[FieldChange]
+
+    def to_gitea(self) -> Dict[str, Any]:
+        # Only the fields that drifted are sent to Gitea
+        payload: Dict[str, Any] = {}
+        for change in self.changes:
+            payload.update(change.to_gitea())
+        return payload
+
+
+def _field_changes(
+    gh_repo: Repository, gitea_repo: Repository, fields: Collection[str]
+) -> List[FieldChange]:
+    changes = []
+    # Internal or unknown Github visibilities have no Gitea equivalent and are left alone
+    if (
+        "visibility" in fields
+        and gh_repo.visibility in (Visibility.PUBLIC, Visibility.PRIVATE)
+        and gh_repo.visibility != gitea_repo.visibility
+    ):
+        changes.append(FieldChange("visibility", gitea_repo.visibility, gh_repo.visibility))
+    if "description" in fields and gh_repo.description != gitea_repo.description:
+        changes.append(FieldChange("description", gitea_repo.description, gh_repo.description))
+    if "archived" in fields and gh_repo.archived != gitea_repo.archived:
+        changes.append(FieldChange("archived", gitea_repo.archived, gh_repo.archived))
+    return changes
+
+
+def list_repository_drifts(
+    gh_repos: Iterable[Repository],
+    gitea_repos: Iterable[Repository],
+    owner_mapping: OwnerMapping,
+    fields: Collection[str] = tuple(FIELDS),
+) -> List[RepositoryDrift]:
+    gitea_index = {repo.full_repo_name.lower(): repo for repo in gitea_repos}
+    drifts = []
+    for gh_repo in gh_repos:
+        gitea_full_repo_name = owner_mapping.get_gitea_full_repo_name(gh_repo)
+        if gitea_full_repo_name is None:
+            continue
+        gitea_repo = gitea_index.get(gitea_full_repo_name.lower())
+        if gitea_repo is None:
+            continue
+        changes = _field_changes(gh_repo, gitea_repo, fields)
+        if changes:
+            drifts.append(RepositoryDrift(gitea_repo.full_repo_name, changes))
+    return drifts
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from datetime import datetime
 from enum import Flag, auto
+from typing import Optional
 
 
 class Visibility(Flag):
@@ -18,11 +20,20 @@ class Visibility(Flag):
         else:
             return Visibility.UNKNOWN
 
+    def to_str(self) -> str:
+        return (self.name or "unknown").lower()
+
 
 @dataclass(frozen=True)
 class Repository:
     full_repo_name: str
     visibility: Visibility
+    pushed_at: Optional[datetime] = None
+    mirror_interval: Optional[str] = None
+    original_url: Optional[str] = None
+    archived: bool = False
+    size_kb: Optional[int] = None
+    description: Optional[str] = None
 
     def get_org_name(self) -> str:
         return self.full_repo_name.split("/")[0]
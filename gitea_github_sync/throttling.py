@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+
+@dataclass
+class AIMDController:
+    """Additive increase, multiplicative decrease of the number of in-flight migrations.
+
+    The limit grows by one every `limit` healthy results, holds while results are slower
+    than `max_latency`, and is multiplied by `decrease_factor` on overload. Results of
+    migrations started before the last decrease do not decrease it again."""
+
+    min_limit: int = 1
+    max_limit: int = 16
+    max_latency: Optional[float] = None
+    decrease_factor: float = 0.5
+    clock: Callable[[], float] = time.monotonic
+    _limit: float = field(init=False)
+    _last_decrease: float = field(init=False, default=-math.inf)
+
+    def __post_init__(self) -> None:
+        if not 1 <= self.min_limit <= self.max_limit:
+            raise ValueError("Expected 1 <= min_limit <= max_limit")
+        self._limit = self.min_limit
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def record(self, started_at: float, latency: float, overloaded: bool) -> None:
+        if overloaded:
+            if started_at >= self._last_decrease:
+                self._limit = max(self.min_limit, self._limit * self.decrease_factor)
+                self._last_decrease = self.clock()
+        elif self.max_latency is None or latency <= self.max_latency:
+            self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+
+
+@dataclass
+class CircuitBreaker:
+    """Stops new migrations after `failure_threshold` consecutive overload failures.
+
+    Once `reset_timeout` elapsed a single probe migration is allowed: a success closes the
+    circuit, a failure opens it again for twice as long, up to `max_reset_timeout`. The
+    breaker gives up after `max_trips` consecutive openings."""
+
+    failure_threshold: int = 5
+    reset_timeout: float = 60
+    max_reset_timeout: float = 600
+    max_trips: int = 5
+    clock: Callable[[], float] = time.monotonic
+    consecutive_failures: int = 0
+    trips: int = 0
+    _opened_at: Optional[float] = None
+    _probing: bool = False
+
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None
+
+    @property
+    def gave_up(self) -> bool:
+        return self.trips >= self.max_trips
+
+    def _current_reset_timeout(self) -> float:
+        return min(self.max_reset_timeout, self.reset_timeout * 2.0 ** max(0, self.trips - 1))
+
+    def retry_in(self) -> float:
+        if self._opened_at is None:
+            return 0
+        return max(0.0, self._opened_at + self._current_reset_timeout() - self.clock())
+
+    def allow(self) -> bool:
+        if self._opened_at is None:
+            return True
+        if self._probing or self.gave_up or self.retry_in() > 0:
+            return False
+        self._probing = True
+        return True
+
+    def _open(self) -> None:
+        self.trips += 1
+        self._opened_at = self.clock()
+
+    def record(self, overloaded: bool) -> None:
+        if not overloaded:
+            self.consecutive_failures = 0
+            self.trips = 0
+            self._opened_at = None
+            self._probing = False
+            return
+        self.consecutive_failures += 1
+        if self._probing:
+            self._probing = False
+            self._open()
+        elif self._opened_at is None and self.consecutive_failures >= self.failure_threshold:
+            self._open()
@@ -0,0 +1,449 @@
+from __future__ import annotations
+
+import json
+import random
+import re
+import threading
+import time
+from collections import defaultdict, deque
+from dataclasses import asdict, dataclass, field, replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple, Type
+from urllib.parse import parse_qs, urlsplit
+
+GITHUB_PREFIX = "/github"
+GITEA_PREFIX = "/gitea/api/v1"
+GITHUB_MAX_PAGE_SIZE = 100
+GITHUB_DEFAULT_RATE_LIMIT = 5000
+GITEA_MAX_PAGE_SIZE = 50
+
+
+@dataclass
+class FakeServerSettings:
+    latency: float = 0.0
+    migration_latency: float = 0.0
+    default_page_size: int = 30
+    error_rate: float = 0.0
+    failing_repos: Set[str] = field(default_factory=set)
+    rate_limit: Optional[int] = None
+    rate_limit_window: float = 3600.0
+    seed: int = 0
+
+
+@dataclass
+class FakeState:
+    github_repos: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    gitea_repos: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    gitea_user: str = "gitea-user"
+
+
+@dataclass(frozen=True)
+class Exchange:
+    method: str
+    path: str
+    request_body: Optional[Any]
+    status: int
+    headers: Dict[str, str]
+    response_body: Optional[Any]
+    duration: float
+
+
+def github_repo_json(full_name: str, private: bool = False, **extra: Any) -> Dict[str, Any]:
+    owner, name = full_name.split("/")
+    return {
+        "id": abs(hash(full_name)) % 10**9,
+        "name": name,
+        "full_name": full_name,
+        "owner": {"login": owner},
+        "private": private,
+        "visibility": "private" if private else "public",
+        "html_url": f"https://github.com/{full_name}",
+        "description": None,
+        "archived": False,
+        "size": 0,
+        "pushed_at": "2023-01-01T00:00:00Z",
+        **extra,
+    }
+
+
+def gitea_repo_json(full_name: str, private: bool = False, **extra: Any) -> Dict[str, Any]:
+    owner, name = full_name.split("/")
+    return {
+        "id": abs(hash(full_name)) % 10**9,
+        "name": name,
+        "full_name": full_name,
+        "owner": {"login": owner},
+        "private": private,
+        "mirror": False,
+        "original_url": "",
+        "mirror_interval": "",
+        "description": "",
+        "archived": False,
+        **extra,
+    }
+
+
+def generate_state(
+    nb_github_repos: int,
+    nb_mirrored_repos: int = 0,
+    owners: Tuple[str, ...] = ("some-team",),
+    private_ratio: float = 0.5,
+    seed: int = 0,
+) -> FakeState:
+    rand = random.Random(seed)
+    state = FakeState()
+    for i in range(nb_github_repos):
+        full_name = f"{owners[i % len(owners)]}/repo-{i:06d}"
+        state.github_repos[full_name] = github_repo_json(
+            full_name, private=rand.random() < private_ratio, size=rand.randint(0, 500_000)
+        )
+    for full_name in list(state.github_repos)[:nb_mirrored_repos]:
+        gitea_full_name = f"{state.gitea_user}/{full_name.split('/')[1]}"
+        state.gitea_repos[gitea_full_name.lower()] = gitea_repo_json(
+            gitea_full_name,
+            private=state.github_repos[full_name]["private"],
+            mirror=True,
+            original_url=f"https://github.com/{full_name}",
+        )
+    return state
+
+
+Route = Tuple[str, "re.Pattern[str]", Callable[..., Tuple[int, Any, Dict[str, str]]]]
+
+
+class FakeServer:
+    """Emulates the subset of the Github and Gitea APIs used by gitea-github-sync.
+
+    Both services are served by the same HTTP server, Github under `/github` and Gitea
+    under `/gitea/api/v1`. Every exchange can be recorded and saved to a JSON fixture,
+    which `FakeServer.replay` serves back in the recorded order.
+    """
+
+    def __init__(
+        self,
+        state: Optional[FakeState] = None,
+        settings: Optional[FakeServerSettings] = None,
+        record: bool = False,
+    ) -> None:
+        self.state = state or FakeState()
+        self.settings = settings or FakeServerSettings()
+        self.record = record
+        self.exchanges: List[Exchange] = []
+        self._lock = threading.Lock()
+        self._random = random.Random(self.settings.seed)
+        self._rate_limit_usage: Dict[str, Tuple[float, int]] = {}
+        self._replay: Optional[Dict[Tuple[str, str], Deque[Exchange]]] = None
+        self._routes: List[Route] = [
+            ("GET", re.compile(rf"^{GITHUB_PREFIX}/rate_limit$"), self._github_rate_limit),
+            ("GET", re.compile(rf"^{GITHUB_PREFIX}/user/repos$"), self._github_list_repos),
+            ("GET", re.compile(rf"^{GITHUB_PREFIX}/repos/([^/]+/[^/]+)$"), self._github_get_repo),
+            ("GET", re.compile(rf"^{GITEA_PREFIX}/user$"), self._gitea_get_user),
+            ("GET", re.compile(rf"^{GITEA_PREFIX}/user/repos$"), self._gitea_list_repos),
+            ("POST", re.compile(rf"^{GITEA_PREFIX}/repos/migrate$"), self._gitea_migrate),
+            ("GET", re.compile(rf"^{GITEA_PREFIX}/repos/([^/]+/[^/]+)$"), self._gitea_get_repo),
+            ("PATCH", re.compile(rf"^{GITEA_PREFIX}/repos/([^/]+/[^/]+)$"), self._gitea_edit_repo),
+            (
+                "DELETE",
+                re.compile(rf"^{GITEA_PREFIX}/repos/([^/]+/[^/]+)$"),
+                self._gitea_delete_repo,
+            ),
+        ]
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def replay(cls, recording: Path) -> FakeServer:
+        server = cls()
+        fixture = json.loads(recording.read_text())
+        server._replay = defaultdict(deque)
+        for exchange in fixture["exchanges"]:
+            # Links returned by the recorded server point to its own address
+            exchange["headers"] = {
+                name: value.replace(fixture["base_url"], server.base_url)
+                for name, value in exchange["headers"].items()
+            }
+            server._replay[(exchange["method"], exchange["path"])].append(Exchange(**exchange))
+        return server
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    @property
+    def github_api_url(self) -> str:
+        return f"{self.base_url}{GITHUB_PREFIX}"
+
+    @property
+    def gitea_api_url(self) -> str:
+        return f"{self.base_url}{GITEA_PREFIX}"
+
+    def start(self) -> FakeServer:
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> FakeServer:
+        return self.start()
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.stop()
+
+    def save_recording(self, path: Path) -> None:
+        fixture = {
+            "base_url": self.base_url,
+            "exchanges": [asdict(exchange) for exchange in self.exchanges],
+        }
+        path.write_text(json.dumps(fixture, indent=2))
+
+    def count_requests(self, method: str, path_prefix: str = "") -> int:
+        return sum(
+            1
+            for exchange in self.exchanges
+            if exchange.method == method and exchange.path.startswith(path_prefix)
+        )
+
+    def _handler_class(self) -> Type[BaseHTTPRequestHandler]:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+            def _handle(self) -> None:
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length)) if length else None
+                start = time.perf_counter()
+                status, response_body, headers = server.dispatch(
+                    self.command, self.path, body, self.headers.get("Host", "")
+                )
+                # Recorded before responding so that clients observe their own requests
+                server._record(
+                    Exchange(
+                        method=self.command,
+                        path=self.path,
+                        request_body=body,
+                        status=status,
+                        headers=headers,
+                        response_body=response_body,
+                        duration=time.perf_counter() - start,
+                    )
+                )
+                payload = b"" if response_body is None else json.dumps(response_body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = do_POST = do_PATCH = do_DELETE = _handle
+
+        return Handler
+
+    def _record(self, exchange: Exchange) -> None:
+        if not self.record:
+            # Bodies are only kept when recording to bound memory usage under load
+            exchange = replace(exchange, request_body=None, response_body=None)
+        with self._lock:
+            self.exchanges.append(exchange)
+
+    def dispatch(
+        self, method: str, raw_path: str, body: Optional[Any], host: str
+    ) -> Tuple[int, Any, Dict[str, str]]:
+        if self._replay is not None:
+            return self._replay_exchange(method, raw_path)
+
+        url = urlsplit(raw_path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        if self.settings.latency:
+            time.sleep(self.settings.latency)
+
+        service = "github" if url.path.startswith(GITHUB_PREFIX) else "gitea"
+        rate_limit_headers, exceeded = self._consume_rate_limit(service)
+        if exceeded:
+            status = 403 if service == "github" else 429
+            return status, {"message": "API rate limit exceeded"}, rate_limit_headers
+        with self._lock:
+            inject_error = self._random.random() < self.settings.error_rate
+        if inject_error:
+            return 500, {"message": "injected error"}, rate_limit_headers
+
+        for route_method, pattern, handler in self._routes:
+            match = pattern.match(url.path)
+            if route_method == method and match is not None:
+                base = f"http://{host}{url.path}"
+                status, response_body, headers = handler(
+                    *match.groups(), query=query, body=body, base=base
+                )
+                return status, response_body, {**rate_limit_headers, **headers}
+        return 404, {"message": "Not Found"}, rate_limit_headers
+
+    def _replay_exchange(self, method: str, raw_path: str) -> Tuple[int, Any, Dict[str, str]]:
+        assert self._replay is not None
+        with self._lock:
+            recorded = self._replay.get((method, raw_path))
+            if not recorded:
+                return 501, {"message": f"No recorded exchange for {method} {raw_path}"}, {}
+            exchange = recorded.popleft() if len(recorded) > 1 else recorded[0]
+        return exchange.status, exchange.response_body, exchange.headers
+
+    def _consume_rate_limit(self, service: str) -> Tuple[Dict[str, str], bool]:
+        limit = self.settings.rate_limit
+        if limit is None:
+            return {}, False
+        now = time.time()
+        with self._lock:
+            window_start, used = self._rate_limit_usage.get(service, (now, 0))
+            if now - window_start >= self.settings.rate_limit_window:
+                window_start, used = now, 0
+            exceeded = used >= limit
+            if not exceeded:
+                used += 1
+            self._rate_limit_usage[service] = (window_start, used)
+        reset = int(window_start + self.settings.rate_limit_window)
+        headers = {
+            "X-RateLimit-Limit": str(limit),
+            "X-RateLimit-Remaining": str(limit - used),
+            "X-RateLimit-Used": str(used),
+            "X-RateLimit-Reset": str(reset),
+        }
+        if exceeded:
+            headers["Retry-After"] = str(max(reset - int(now), 1))
+        return headers, exceeded
+
+    def _paginate(
+        self, items: List[Dict[str, Any]], page: int, page_size: int, base: str, size_param: str
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, str]]:
+        last_page = max((len(items) + page_size - 1) // page_size, 1)
+        links = []
+        if page < last_page:
+            links.append(f'<{base}?{size_param}={page_size}&page={page + 1}>; rel="next"')
+            links.append(f'<{base}?{size_param}={page_size}&page={last_page}>; rel="last"')
+        if page > 1:
+            links.append(f'<{base}?{size_param}={page_size}&page=1>; rel="first"')
+            links.append(f'<{base}?{size_param}={page_size}&page={page - 1}>; rel="prev"')
+        headers = {"Link": ", ".join(links)} if links else {}
+        headers["X-Total-Count"] = str(len(items))
+        return items[(page - 1) * page_size : page * page_size], headers
+
+    def _page_size(self, query: Dict[str, str], size_param: str, maximum: int) -> int:
+        return min(int(query.get(size_param, self.settings.default_page_size)), maximum)
+
+    def _github_rate_limit(
+        self, query: Dict[str, str], body: Any, base: str
+    ) -> Tuple[int, Any, Dict[str, str]]:
+        limit = self.settings.rate_limit
+        with self._lock:
+            used = self._rate_limit_usage.get("github", (0.0, 0))[1] if limit is not None else 0
+        limit = limit if limit is not None else GITHUB_DEFAULT_RATE_LIMIT
+        rate = {"limit": limit, "remaining": limit - used, "used": used, "reset": 0}
+        headers = {"X-RateLimit-Limit": str(limit), "X-RateLimit-Remaining": str(limit - used)}
+        return 200, {"resources": {"core": rate}, "rate": rate}, headers
+
+    def _github_list_repos(
+        self, query: Dict[str, str], body: Any, base: str
+    ) -> Tuple[int, Any, Dict[str, str]]:
+        with self._lock:
+            repos = list(self.state.github_repos.values())
+        page_size = self._page_size(query, "per_page", GITHUB_MAX_PAGE_SIZE)
+        page, headers = self._paginate(
+            repos, int(query.get("page", 1)), page_size, base, "per_page"
+        )
+        return 200, page, headers
+
+    def _github_get_repo(
+        self, full_name: str, query: Dict[str, str], body: Any, base: str
+    ) -> Tuple[int, Any, Dict[str, str]]:
+        with self._lock:
+            repo = self.state.github_repos.get(full_name)
+        if repo is None:
+            return 404, {"message": "Not Found"}, {}
+        return 200, repo, {}
+
+    def _gitea_get_user(
+        self, query: Dict[str, str], body: Any, base: str
+    ) -> Tuple[int, Any, Dict[str, str]]:
+        return 200, {"id": 1, "login": self.state.gitea_user}, {}
+
+    def _gitea_list_repos(
+        self, query: Dict[str, str], body: Any, base: str
+    ) -> Tuple[int, Any, Dict[str, str]]:
+        with self._lock:
+            repos = list(self.state.gitea_repos.values())
+        page_size = self._page_size(query, "limit", GITEA_MAX_PAGE_SIZE)
+        page, headers = self._paginate(repos, int(query.get("page", 1)), page_size, base, "limit")
+        return 200, page, headers
+
+    def _find_gitea_repo(self, full_name: str) -> Optional[str]:
+        # Gitea repository names are case-insensitive, the state is keyed on lowercase names
+        key = full_name.lower()
+        return key if key in self.state.gitea_repos else None
+
+    def _gitea_get_repo(
+        self, full_name: str, query: Dict[str, str], body: Any, base: str
+    ) -> Tuple[int, Any, Dict[str, str]]:
+        with self._lock:
+            key = self._find_gitea_repo(full_name)
+            repo = None if key is None else self.state.gitea_repos[key]
+        if repo is None:
+            return 404, {"message": "Not Found"}, {}
+        return 200, repo, {}
+
+    def _gitea_migrate(
+        self, query: Dict[str, str], body: Any, base: str
+    ) -> Tuple[int, Any, Dict[str, str]]:
+        owner = body.get("repo_owner") or self.state.gitea_user
+        full_name = f"{owner}/{body['repo_name']}"
+        source = "/".join(body["clone_addr"].split("/")[-2:])
+        if self.settings.migration_latency:
+            time.sleep(self.settings.migration_latency)
+        if source in self.settings.failing_repos:
+            return 500, {"message": f"Could not clone {source}"}, {}
+        with self._lock:
+            if self._find_gitea_repo(full_name) is not None:
+                return 409, {"message": "The repository with the same name already exists."}, {}
+            repo = gitea_repo_json(
+                full_name,
+                private=bool(body.get("private")),
+                mirror=bool(body.get("mirror")),
+                original_url=body["clone_addr"],
+                mirror_interval=body.get("mirror_interval", "8h0m0s"),
+            )
+            self.state.gitea_repos[full_name.lower()] = repo
+        return 201, repo, {}
+
+    def _gitea_edit_repo(
+        self, full_name: str, query: Dict[str, str], body: Any, base: str
+    ) -> Tuple[int, Any, Dict[str, str]]:
+        with self._lock:
+            key = self._find_gitea_repo(full_name)
+            if key is None:
+                return 404, {"message": "Not Found"}, {}
+            self.state.gitea_repos[key].update(body)
+            return 200, self.state.gitea_repos[key], {}
+
+    def _gitea_delete_repo(
+        self, full_name: str, query: Dict[str, str], body: Any, base: str
+    ) -> Tuple[int, Any, Dict[str, str]]:
+        with self._lock:
+            key = self._find_gitea_repo(full_name)
+            if key is None:
+                return 404, {"message": "Not Found"}, {}
+            del self.state.gitea_repos[key]
+        return 204, None, {}
@@ -1,15 +1,27 @@
+import json
 import textwrap
+from datetime import datetime, timezone
 from io import StringIO
-from typing import List
-from unittest.mock import MagicMock, PropertyMock, call, patch
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+from unittest.mock import ANY, MagicMock, PropertyMock, call, patch
 
 import pytest
 from click.testing import CliRunner
+from github import Github
 
-from gitea_github_sync.cli import cli, print_repositories
-from gitea_github_sync.gitea import GiteaMigrationError
+from gitea_github_sync.cli import RepositoryStats, cli, print_repositories
+from gitea_github_sync.config import DEFAULT_MIRROR_INTERVAL_TIERS, MigrationProfile
+from gitea_github_sync.git_mirror import PUSHED_REFS_FILE, GitMirrorEngine
+from gitea_github_sync.gitea import GiteaEditError, GiteaMigrationError
+from gitea_github_sync.history import MigrationRecord
+from gitea_github_sync.migration import OwnerMapping
+from gitea_github_sync.mirror_interval import MirrorIntervalUpdate
+from gitea_github_sync.reconcile import FIELDS, FieldChange, RepositoryDrift
 from gitea_github_sync.repository import Repository, Visibility
 
+GITEA_USER = "gitea-user"
+
 
 @pytest.fixture
 def repositories_fixture() -> List[Repository]:
@@ -44,7 +56,7 @@ def test_list_all_github_repositories(
     result = runner.invoke(cli, command)
 
     assert result.exit_code == 0
-    mock_print_repositories.assert_called_once_with(repositories_fixture, expected_stat)
+    mock_print_repositories.assert_called_once_with(repositories_fixture, expected_stat, None)
 
 
 @pytest.mark.parametrize("expected_stat", [True, False])
@@ -69,17 +81,28 @@ def test_list_all_gitea_repositories(
     result = runner.invoke(cli, command)
 
     assert result.exit_code == 0
-    mock_print_repositories.assert_called_once_with(repositories_fixture, expected_stat)
+    mock_print_repositories.assert_called_once_with(repositories_fixture, expected_stat, None)
+
+
+def get_repository_side_effect(
+    repos: List[Repository],
+) -> Callable[[Github, str], Optional[Repository]]:
+    repos_by_name = {repo.full_repo_name: repo for repo in repos}
+
+    def get_repository(gh: Github, full_repo_name: str) -> Optional[Repository]:
+        return repos_by_name.get(full_repo_name)
+
+    return get_repository
 
 
 @patch("gitea_github_sync.cli.config.load_config", autospec=True)
-@patch("gitea_github_sync.cli.github.list_all_repositories", autospec=True)
+@patch("gitea_github_sync.cli.github.get_repository", autospec=True)
 @patch("gitea_github_sync.cli.github.get_github", autospec=True)
 @patch("gitea_github_sync.cli.gitea.get_gitea", autospec=True)
 def test_migrate_repo(
     mock_get_gitea: MagicMock,
     mock_get_github: MagicMock,
-    mock_list_all_repositories: MagicMock,
+    mock_get_repository: MagicMock,
     mock_load_config: MagicMock,
     repositories_fixture: List[Repository],
 ) -> None:
@@ -89,31 +112,120 @@ def test_migrate_repo(
     type(mock_load_config.return_value).github_token = PropertyMock(
         return_value=expected_github_token
     )
-    mock_list_all_repositories.return_value = repositories_fixture + [expected_repo]
+    mock_load_config.return_value.owner_mapping = {}
+    mock_load_config.return_value.github_api_url = "https://api.github.com"
+    mock_load_config.return_value.mirror_interval_tiers = []
+    mock_load_config.return_value.migration_profiles = []
+    mock_get_gitea.return_value.get_user_login.return_value = GITEA_USER
+    mock_get_gitea.return_value.repo_exists.return_value = False
+    mock_get_repository.side_effect = get_repository_side_effect(
+        repositories_fixture + [expected_repo]
+    )
 
     runner = CliRunner()
     command = ["migrate-repo", "Muscaw/gitea-github-sync"]
     result = runner.invoke(cli, command)
 
     assert result.exit_code == 0
-    mock_list_all_repositories.assert_called_once_with(mock_get_github.return_value)
+    assert result.stdout == textwrap.dedent(
+        """\
+        Migrating Muscaw/gitea-github-sync
+        Migrated 1 out of 1 repos successfully
+        """
+    )
+    mock_get_repository.assert_called_once_with(
+        mock_get_github.return_value, "Muscaw/gitea-github-sync"
+    )
     mock_get_gitea.return_value.migrate_repo.assert_called_once_with(
-        repo=expected_repo, github_token=expected_github_token
+        repo=expected_repo,
+        github_token=expected_github_token,
+        repo_owner=GITEA_USER,
+        github_url="https://github.com",
+        mirror_interval=None,
+        options=None,
     )
 
 
+@pytest.mark.parametrize(
+    "command, stdin",
+    [
+        pytest.param(
+            ["migrate-repo", "some-team/a-repo", "some-team/b-repo", "some-team/c-repo"],
+            None,
+            id="arguments",
+        ),
+        pytest.param(
+            ["migrate-repo", "some-team/a-repo", "-"],
+            "some-team/b-repo\n\n# comment\nsome-team/c-repo\nsome-team/a-repo\n",
+            id="stdin",
+        ),
+        pytest.param(
+            ["migrate-repo", "--from-file", "-"],
+            "some-team/a-repo\nsome-team/b-repo\nsome-team/c-repo\n",
+            id="from-file",
+        ),
+    ],
+)
 @patch("gitea_github_sync.cli.config.load_config", autospec=True)
-@patch("gitea_github_sync.cli.github.list_all_repositories", autospec=True)
+@patch("gitea_github_sync.cli.github.get_repository", autospec=True)
+@patch("gitea_github_sync.cli.github.get_github", autospec=True)
+@patch("gitea_github_sync.cli.gitea.get_gitea", autospec=True)
+def test_migrate_repo_multiple_repos(
+    mock_get_gitea: MagicMock,
+    mock_get_github: MagicMock,
+    mock_get_repository: MagicMock,
+    mock_load_config: MagicMock,
+    command: List[str],
+    stdin: Optional[str],
+    repositories_fixture: List[Repository],
+) -> None:
+    expected_github_token = "some-github-token"
+
+    type(mock_load_config.return_value).github_token = PropertyMock(
+        return_value=expected_github_token
+    )
+    mock_load_config.return_value.owner_mapping = {}
+    mock_load_config.return_value.github_api_url = "https://api.github.com"
+    mock_load_config.return_value.mirror_interval_tiers = []
+    mock_load_config.return_value.migration_profiles = []
+    mock_get_gitea.return_value.get_user_login.return_value = GITEA_USER
+    mock_get_gitea.return_value.repo_exists.return_value = False
+    mock_get_repository.side_effect = get_repository_side_effect(repositories_fixture)
+
+    runner = CliRunner()
+    result = runner.invoke(cli, command + ["--concurrency", "2"], input=stdin)
+
+    assert result.exit_code == 0
+    assert "Migrated 3 out of 3 repos successfully" in result.stdout
+    assert mock_get_repository.call_count == 3
+    mock_get_gitea.return_value.migrate_repo.assert_has_calls(
+        [
+            call(
+                repo=repo,
+                github_token=expected_github_token,
+                repo_owner=GITEA_USER,
+                github_url="https://github.com",
+                mirror_interval=None,
+                options=None,
+            )
+            for repo in repositories_fixture
+        ],
+        any_order=True,
+    )
+
+
+@patch("gitea_github_sync.cli.config.load_config", autospec=True)
+@patch("gitea_github_sync.cli.github.get_repository", autospec=True)
 @patch("gitea_github_sync.cli.github.get_github", autospec=True)
 @patch("gitea_github_sync.cli.gitea.get_gitea", autospec=True)
 def test_migrate_repo_no_match(
     mock_get_gitea: MagicMock,
     mock_get_github: MagicMock,
-    mock_list_all_repositories: MagicMock,
+    mock_get_repository: MagicMock,
     mock_load_config: MagicMock,
     repositories_fixture: List[Repository],
 ) -> None:
-    mock_list_all_repositories.return_value = repositories_fixture
+    mock_get_repository.side_effect = get_repository_side_effect(repositories_fixture)
     repo_name = "Muscaw/gitea-github-sync"
 
     runner = CliRunner()
@@ -123,20 +235,136 @@ def test_migrate_repo_no_match(
     assert result.exit_code != 0
     assert "Aborted!" in result.stdout
     assert f"Repository {repo_name} does not exist on Github" in result.stdout
-    mock_list_all_repositories.assert_called_once_with(mock_get_github.return_value)
+    mock_get_repository.assert_called_once_with(mock_get_github.return_value, repo_name)
     mock_get_gitea.return_value.migrate_repo.assert_not_called()
     mock_load_config.assert_called_once()
 
 
+@patch("gitea_github_sync.cli.config.load_config", autospec=True)
+@patch("gitea_github_sync.cli.github.get_repository", autospec=True)
+@patch("gitea_github_sync.cli.github.get_github", autospec=True)
+@patch("gitea_github_sync.cli.gitea.get_gitea", autospec=True)
+def test_migrate_repo_partial_match(
+    mock_get_gitea: MagicMock,
+    mock_get_github: MagicMock,
+    mock_get_repository: MagicMock,
+    mock_load_config: MagicMock,
+    repositories_fixture: List[Repository],
+) -> None:
+    expected_github_token = "some-github-token"
+
+    type(mock_load_config.return_value).github_token = PropertyMock(
+        return_value=expected_github_token
+    )
+    mock_load_config.return_value.owner_mapping = {}
+    mock_load_config.return_value.github_api_url = "https://api.github.com"
+    mock_load_config.return_value.mirror_interval_tiers = []
+    mock_load_config.return_value.migration_profiles = []
+    mock_get_gitea.return_value.get_user_login.return_value = GITEA_USER
+    mock_get_gitea.return_value.repo_exists.return_value = False
+    mock_get_repository.side_effect = get_repository_side_effect(repositories_fixture)
+
+    runner = CliRunner()
+    command = ["migrate-repo", "some-team/a-repo", "Muscaw/gitea-github-sync"]
+    result = runner.invoke(cli, command)
+
+    assert result.exit_code == 0
+    assert "Repository Muscaw/gitea-github-sync does not exist on Github" in result.stdout
+    assert "Migrated 1 out of 1 repos successfully" in result.stdout
+    mock_get_gitea.return_value.migrate_repo.assert_called_once_with(
+        repo=repositories_fixture[0],
+        github_token=expected_github_token,
+        repo_owner=GITEA_USER,
+        github_url="https://github.com",
+        mirror_interval=None,
+        options=None,
+    )
+
+
+@patch("gitea_github_sync.cli.config.load_config", autospec=True)
+@patch("gitea_github_sync.cli.github.get_repository", autospec=True)
+@patch("gitea_github_sync.cli.github.get_github", autospec=True)
+@patch("gitea_github_sync.cli.gitea.get_gitea", autospec=True)
+def test_migrate_repo_existing_on_gitea(
+    mock_get_gitea: MagicMock,
+    mock_get_github: MagicMock,
+    mock_get_repository: MagicMock,
+    mock_load_config: MagicMock,
+    repositories_fixture: List[Repository],
+) -> None:
+    mock_load_config.return_value.owner_mapping = {"some-team": "gitea-team"}
+    mock_load_config.return_value.github_api_url = "https://api.github.com"
+    mock_load_config.return_value.mirror_interval_tiers = []
+    mock_load_config.return_value.migration_profiles = []
+    mock_get_gitea.return_value.get_user_login.return_value = GITEA_USER
+    mock_get_gitea.return_value.repo_exists.side_effect = (
+        lambda full_repo_name: full_repo_name == "gitea-team/a-repo"
+    )
+    mock_get_repository.side_effect = get_repository_side_effect(repositories_fixture)
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["migrate-repo", "some-team/a-repo", "some-team/b-repo"])
+
+    assert result.exit_code == 0
+    assert "Repository some-team/a-repo already exists on Gitea" in result.stdout
+    assert "Migrated 1 out of 1 repos successfully" in result.stdout
+    mock_get_gitea.return_value.migrate_repo.assert_called_once_with(
+        repo=repositories_fixture[1],
+        github_token=mock_load_config.return_value.github_token,
+        repo_owner="gitea-team",
+        github_url="https://github.com",
+        mirror_interval=None,
+        options=None,
+    )
+
+
+@patch("gitea_github_sync.cli.migration.list_missing_github_repos", autospec=True)
 @patch("gitea_github_sync.cli.config.load_config", autospec=True)
 @patch("gitea_github_sync.cli.github.list_all_repositories", autospec=True)
 @patch("gitea_github_sync.cli.github.get_github", autospec=True)
 @patch("gitea_github_sync.cli.gitea.get_gitea", autospec=True)
-def test_migrate_repo_gitea_migration_error(
+def test_sync_conflicting_repos(
     mock_get_gitea: MagicMock,
     mock_get_github: MagicMock,
     mock_list_all_repositories: MagicMock,
     mock_load_config: MagicMock,
+    mock_list_missing_github_repos: MagicMock,
+) -> None:
+    mock_load_config.return_value.owner_mapping = {}
+    mock_load_config.return_value.mirror_interval_tiers = []
+    mock_load_config.return_value.migration_profiles = []
+    mock_get_gitea.return_value.get_user_login.return_value = GITEA_USER
+    mock_list_all_repositories.return_value = [
+        Repository("team-a/tools", Visibility.PUBLIC),
+        Repository("team-b/tools", Visibility.PUBLIC),
+    ]
+    mock_list_missing_github_repos.return_value = []
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["sync"])
+
+    assert result.exit_code == 0
+    assert "Skipping team-b/tools" in result.stdout
+
+
+@patch("gitea_github_sync.cli.gitea.get_gitea", autospec=True)
+def test_migrate_repo_without_names(mock_get_gitea: MagicMock) -> None:
+    runner = CliRunner()
+    result = runner.invoke(cli, ["migrate-repo"])
+
+    assert result.exit_code == 2
+    mock_get_gitea.assert_not_called()
+
+
+@patch("gitea_github_sync.cli.config.load_config", autospec=True)
+@patch("gitea_github_sync.cli.github.get_repository", autospec=True)
+@patch("gitea_github_sync.cli.github.get_github", autospec=True)
+@patch("gitea_github_sync.cli.gitea.get_gitea", autospec=True)
+def test_migrate_repo_gitea_migration_error(
+    mock_get_gitea: MagicMock,
+    mock_get_github: MagicMock,
+    mock_get_repository: MagicMock,
+    mock_load_config: MagicMock,
     repositories_fixture: List[Repository],
 ) -> None:
     expected_repo = Repository("Muscaw/gitea-github-sync", Visibility.PRIVATE)
@@ -145,7 +373,15 @@ def test_migrate_repo_gitea_migration_error(
     type(mock_load_config.return_value).github_token = PropertyMock(
         return_value=expected_github_token
     )
-    mock_list_all_repositories.return_value = repositories_fixture + [expected_repo]
+    mock_load_config.return_value.owner_mapping = {}
+    mock_load_config.return_value.github_api_url = "https://api.github.com"
+    mock_load_config.return_value.mirror_interval_tiers = []
+    mock_load_config.return_value.migration_profiles = []
+    mock_get_gitea.return_value.get_user_login.return_value = GITEA_USER
+    mock_get_gitea.return_value.repo_exists.return_value = False
+    mock_get_repository.side_effect = get_repository_side_effect(
+        repositories_fixture + [expected_repo]
+    )
     mock_get_gitea.return_value.migrate_repo.side_effect = GiteaMigrationError(
         full_repo_name=expected_repo.full_repo_name
     )
@@ -156,9 +392,14 @@ def test_migrate_repo_gitea_migration_error(
 
     assert result.exit_code == 0
     assert "Migration Error for Muscaw/gitea-github-sync" in result.stdout
-    mock_list_all_repositories.assert_called_once_with(mock_get_github.return_value)
+    assert "Failed 1 out of 1 migrations" in result.stdout
     mock_get_gitea.return_value.migrate_repo.assert_called_once_with(
-        repo=expected_repo, github_token=expected_github_token
+        repo=expected_repo,
+        github_token=expected_github_token,
+        repo_owner=GITEA_USER,
+        github_url="https://github.com",
+        mirror_interval=None,
+        options=None,
     )
 
 
@@ -215,6 +456,12 @@ def test_sync(
     type(mock_load_config.return_value).github_token = PropertyMock(
         return_value=expected_github_token
     )
+    mock_load_config.return_value.owner_mapping = {}
+    mock_load_config.return_value.github_api_url = "https://api.github.com"
+    mock_load_config.return_value.mirror_interval_tiers = []
+    mock_load_config.return_value.migration_profiles = []
+    mock_get_gitea.return_value.get_user_login.return_value = GITEA_USER
+    mock_get_gitea.return_value.repo_exists.return_value = False
     mock_list_missing_github_repos.return_value = repos_to_sync
 
     runner = CliRunner()
@@ -228,9 +475,20 @@ def test_sync(
     mock_list_missing_github_repos.assert_called_once_with(
         gh_repos=mock_list_all_repositories.return_value,
         gitea_repos=mock_get_gitea.return_value.get_repos.return_value,
+        owner_mapping=OwnerMapping(mapping={}, default_owner=GITEA_USER),
     )
     mock_get_gitea.return_value.migrate_repo.assert_has_calls(
-        [call(repo=repo, github_token=expected_github_token) for repo in repos_to_sync]
+        [
+            call(
+                repo=repo,
+                github_token=expected_github_token,
+                repo_owner=GITEA_USER,
+                github_url="https://github.com",
+                mirror_interval=None,
+                options=None,
+            )
+            for repo in repos_to_sync
+        ]
     )
 
 
@@ -310,11 +568,24 @@ def test_sync_with_errors(
     type(mock_load_config.return_value).github_token = PropertyMock(
         return_value=expected_github_token
     )
+    mock_load_config.return_value.owner_mapping = {}
+    mock_load_config.return_value.github_api_url = "https://api.github.com"
+    mock_load_config.return_value.mirror_interval_tiers = []
+    mock_load_config.return_value.migration_profiles = []
+    mock_get_gitea.return_value.get_user_login.return_value = GITEA_USER
+    mock_get_gitea.return_value.repo_exists.return_value = False
     mock_list_missing_github_repos.return_value = repos_to_sync
     mock_get_gitea.return_value.get_repos.return_value = MULTIPLE_REPOS
 
     # Mocking migrate_repo to raise an error for 'some-team/migerr-repo'
-    def migrate_repo_side_effect(repo: Repository, github_token: str) -> None:
+    def migrate_repo_side_effect(
+        repo: Repository,
+        github_token: str,
+        repo_owner: Optional[str] = None,
+        mirror_interval: Optional[str] = None,
+        options: Optional[Dict[str, Any]] = None,
+        github_url: str = "https://github.com",
+    ) -> None:
         if repo.full_repo_name == "some-team/migerr-repo":
             raise GiteaMigrationError(full_repo_name=repo.full_repo_name)
 
@@ -331,9 +602,20 @@ def test_sync_with_errors(
     mock_list_missing_github_repos.assert_called_once_with(
         gh_repos=mock_list_all_repositories.return_value,
         gitea_repos=mock_get_gitea.return_value.get_repos.return_value,
+        owner_mapping=OwnerMapping(mapping={}, default_owner=GITEA_USER),
     )
     mock_get_gitea.return_value.migrate_repo.assert_has_calls(
-        [call(repo=repo, github_token=expected_github_token) for repo in repos_to_sync]
+        [
+            call(
+                repo=repo,
+                github_token=expected_github_token,
+                repo_owner=GITEA_USER,
+                github_url="https://github.com",
+                mirror_interval=None,
+                options=None,
+            )
+            for repo in repos_to_sync
+        ]
     )
 
 
@@ -364,3 +646,599 @@ def test_print_repositories(stdout: StringIO, repositories_fixture: List[Reposit
     )
 
     assert stdout.getvalue() == expected_result
+
+
+@patch("gitea_github_sync.cli.print_repositories", autospec=True)
+@patch("gitea_github_sync.cli.gitea.get_gitea", autospec=True)
+def test_list_all_gitea_repositories_format(
+    mock_get_gitea: MagicMock,
+    mock_print_repositories: MagicMock,
+    repositories_fixture: List[Repository],
+) -> None:
+    mock_get_gitea.return_value.get_repos.return_value = repositories_fixture
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["list-all-gitea-repositories", "--format", "jsonl"])
+
+    assert result.exit_code == 0
+    mock_print_repositories.assert_called_once_with(repositories_fixture, False, "jsonl")
+
+
+@patch("sys.stdout", new_callable=StringIO)
+def test_print_repositories_json(stdout: StringIO, repositories_fixture: List[Repository]) -> None:
+    print_repositories(repositories_fixture, True, "json")
+
+    assert json.loads(stdout.getvalue()) == {
+        "repositories": [
+            {
+                "full_repo_name": "some-team/a-repo",
+                "owner": "some-team",
+                "name": "a-repo",
+                "visibility": "public",
+            },
+            {
+                "full_repo_name": "some-team/b-repo",
+                "owner": "some-team",
+                "name": "b-repo",
+                "visibility": "private",
+            },
+            {
+                "full_repo_name": "some-team/c-repo",
+                "owner": "some-team",
+                "name": "c-repo",
+                "visibility": "unknown",
+            },
+        ],
+        "stats": {"public": 1, "private": 1, "unknown": 1, "total": 3},
+    }
+
+
+@patch("sys.stderr", new_callable=StringIO)
+@patch("sys.stdout", new_callable=StringIO)
+def test_print_repositories_jsonl(
+    stdout: StringIO, stderr: StringIO, repositories_fixture: List[Repository]
+) -> None:
+    print_repositories(repositories_fixture, True, "jsonl")
+
+    lines = [json.loads(line) for line in stdout.getvalue().splitlines()]
+    assert [line["full_repo_name"] for line in lines] == [
+        "some-team/a-repo",
+        "some-team/b-repo",
+        "some-team/c-repo",
+    ]
+    assert json.loads(stderr.getvalue()) == {"public": 1, "private": 1, "unknown": 1, "total": 3}
+
+
+@patch("sys.stderr", new_callable=StringIO)
+@patch("sys.stdout", new_callable=StringIO)
+def test_print_repositories_csv(
+    stdout: StringIO, stderr: StringIO, repositories_fixture: List[Repository]
+) -> None:
+    print_repositories(repositories_fixture, False, "csv")
+
+    assert stdout.getvalue().splitlines() == [
+        "full_repo_name,owner,name,visibility",
+        "some-team/a-repo,some-team,a-repo,public",
+        "some-team/b-repo,some-team,b-repo,private",
+        "some-team/c-repo,some-team,c-repo,unknown",
+    ]
+    assert stderr.getvalue() == ""
+
+
+@patch("sys.stdout", new_callable=StringIO)
+def test_print_repositories_rich(stdout: StringIO, repositories_fixture: List[Repository]) -> None:
+    print_repositories(repositories_fixture, True, "rich")
+
+    assert stdout.getvalue() == textwrap.dedent(
+        """\
+    some-team/a-repo
+    some-team/b-repo
+    some-team/c-repo
+
+    Repository stats
+    Number of public repos identified: 1
+    Number of private repos identified: 1
+    Number of unknown repos identified: 1
+    Total number of repos identified: 3
+    """
+    )
+
+
+def test_repository_stats() -> None:
+    repos = [
+        Repository("some-team/a-repo", Visibility.PUBLIC),
+        Repository("some-team/b-repo", Visibility.PUBLIC),
+        Repository("some-team/c-repo", Visibility.UNKNOWN),
+    ]
+
+    assert RepositoryStats.from_repos(repos) == RepositoryStats(public=2, private=0, unknown=1)
+
+
+TUNE_UPDATES = [
+    MirrorIntervalUpdate("gitea-user/a-repo", "8h0m0s", "10m"),
+    MirrorIntervalUpdate("gitea-user/b-repo", "8h0m0s", "24h"),
+]
+
+
+@pytest.mark.parametrize("dry_run", [True, False])
+@patch("gitea_github_sync.cli.mirror_interval.list_mirror_interval_updates", autospec=True)
+@patch("gitea_github_sync.cli.config.load_config", autospec=True)
+@patch("gitea_github_sync.cli.github.list_all_repositories", autospec=True)
+@patch("gitea_github_sync.cli.github.get_github", autospec=True)
+@patch("gitea_github_sync.cli.gitea.get_gitea", autospec=True)
+def test_tune_mirrors(
+    mock_get_gitea: MagicMock,
+    mock_get_github: MagicMock,
+    mock_list_all_repositories: MagicMock,
+    mock_load_config: MagicMock,
+    mock_list_mirror_interval_updates: MagicMock,
+    dry_run: bool,
+) -> None:
+    mock_load_config.return_value.owner_mapping = {}
+    mock_load_config.return_value.mirror_interval_tiers = DEFAULT_MIRROR_INTERVAL_TIERS
+    mock_get_gitea.return_value.get_user_login.return_value = GITEA_USER
+    mock_list_mirror_interval_updates.return_value = TUNE_UPDATES
+
+    def edit_repo(full_repo_name: str, changes: Dict[str, Any]) -> None:
+        if full_repo_name == "gitea-user/b-repo":
+            raise GiteaEditError(full_repo_name)
+
+    mock_get_gitea.return_value.edit_repo.side_effect = edit_repo
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["tune-mirrors", "--dry-run"] if dry_run else ["tune-mirrors"])
+
+    assert result.exit_code == 0
+    assert "Mirror interval of gitea-user/a-repo: 8h0m0s -> 10m" in result.stdout
+    assert "Mirror interval of gitea-user/b-repo: 8h0m0s -> 24h" in result.stdout
+    if dry_run:
+        assert "2 mirrors would be updated" in result.stdout
+        mock_get_gitea.return_value.edit_repo.assert_not_called()
+    else:
+        assert "Update Error for gitea-user/b-repo" in result.stdout
+        assert "Updated 1 out of 2 mirrors" in result.stdout
+        mock_get_gitea.return_value.edit_repo.assert_any_call(
+            "gitea-user/a-repo", {"mirror_interval": "10m"}
+        )
+    mock_list_mirror_interval_updates.assert_called_once_with(
+        gh_repos=mock_list_all_repositories.return_value,
+        gitea_repos=mock_get_gitea.return_value.get_repos.return_value,
+        owner_mapping=OwnerMapping(mapping={}, default_owner=GITEA_USER),
+        tiers=DEFAULT_MIRROR_INTERVAL_TIERS,
+        now=ANY,
+    )
+
+
+@patch("gitea_github_sync.cli.config.load_config", autospec=True)
+@patch("gitea_github_sync.cli.gitea.get_gitea", autospec=True)
+def test_tune_mirrors_without_tiers(mock_get_gitea: MagicMock, mock_load_config: MagicMock) -> None:
+    mock_load_config.return_value.mirror_interval_tiers = []
+    mock_load_config.return_value.migration_profiles = []
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["tune-mirrors"])
+
+    assert result.exit_code == 0
+    assert "No mirror interval tiers are configured" in result.stdout
+    mock_get_gitea.assert_not_called()
+
+
+@patch("gitea_github_sync.cli.config.load_config", autospec=True)
+@patch("gitea_github_sync.cli.github.get_repository", autospec=True)
+@patch("gitea_github_sync.cli.github.get_github", autospec=True)
+@patch("gitea_github_sync.cli.gitea.get_gitea", autospec=True)
+def test_migrate_repo_mirror_interval(
+    mock_get_gitea: MagicMock,
+    mock_get_github: MagicMock,
+    mock_get_repository: MagicMock,
+    mock_load_config: MagicMock,
+) -> None:
+    repo = Repository("some-team/a-repo", Visibility.PUBLIC, pushed_at=datetime.now(timezone.utc))
+    mock_load_config.return_value.owner_mapping = {}
+    mock_load_config.return_value.github_api_url = "https://api.github.com"
+    mock_load_config.return_value.mirror_interval_tiers = DEFAULT_MIRROR_INTERVAL_TIERS
+    mock_get_gitea.return_value.get_user_login.return_value = GITEA_USER
+    mock_get_gitea.return_value.repo_exists.return_value = False
+    mock_get_repository.return_value = repo
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["migrate-repo", "some-team/a-repo"])
+
+    assert result.exit_code == 0
+    mock_get_gitea.return_value.migrate_repo.assert_called_once_with(
+        repo=repo,
+        github_token=mock_load_config.return_value.github_token,
+        repo_owner=GITEA_USER,
+        github_url="https://github.com",
+        mirror_interval="10m",
+        options=None,
+    )
+
+
+@patch("gitea_github_sync.cli.config.load_config", autospec=True)
+@patch("gitea_github_sync.cli.github.get_repository", autospec=True)
+@patch("gitea_github_sync.cli.github.get_github", autospec=True)
+@patch("gitea_github_sync.cli.gitea.get_gitea", autospec=True)
+def test_migrate_repo_github_enterprise(
+    mock_get_gitea: MagicMock,
+    mock_get_github: MagicMock,
+    mock_get_repository: MagicMock,
+    mock_load_config: MagicMock,
+) -> None:
+    repo = Repository("some-team/a-repo", Visibility.PUBLIC)
+    mock_load_config.return_value.owner_mapping = {}
+    mock_load_config.return_value.github_api_url = "https://github.example.com/api/v3"
+    mock_load_config.return_value.mirror_interval_tiers = []
+    mock_load_config.return_value.migration_profiles = []
+    mock_get_gitea.return_value.get_user_login.return_value = GITEA_USER
+    mock_get_gitea.return_value.repo_exists.return_value = False
+    mock_get_repository.return_value = repo
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["migrate-repo", "some-team/a-repo"])
+
+    assert result.exit_code == 0
+    mock_get_gitea.return_value.migrate_repo.assert_called_once_with(
+        repo=repo,
+        github_token=mock_load_config.return_value.github_token,
+        repo_owner=GITEA_USER,
+        github_url="https://github.example.com",
+        mirror_interval=None,
+        options=None,
+    )
+
+
+@patch("gitea_github_sync.cli.config.load_config", autospec=True)
+@patch("gitea_github_sync.cli.github.get_repository", autospec=True)
+@patch("gitea_github_sync.cli.github.get_github", autospec=True)
+@patch("gitea_github_sync.cli.gitea.get_gitea", autospec=True)
+def test_migrate_repo_migration_profile(
+    mock_get_gitea: MagicMock,
+    mock_get_github: MagicMock,
+    mock_get_repository: MagicMock,
+    mock_load_config: MagicMock,
+) -> None:
+    repo = Repository("some-team/a-repo", Visibility.PUBLIC)
+    mock_load_config.return_value.owner_mapping = {}
+    mock_load_config.return_value.github_api_url = "https://api.github.com"
+    mock_load_config.return_value.mirror_interval_tiers = []
+    mock_load_config.return_value.migration_profiles = [
+        MigrationProfile(name="wiki", owners=["some-team"], wiki=True)
+    ]
+    mock_get_gitea.return_value.get_user_login.return_value = GITEA_USER
+    mock_get_gitea.return_value.repo_exists.return_value = False
+    mock_get_repository.return_value = repo
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["migrate-repo", "some-team/a-repo"])
+
+    assert result.exit_code == 0
+    mock_get_gitea.return_value.migrate_repo.assert_called_once_with(
+        repo=repo,
+        github_token=mock_load_config.return_value.github_token,
+        repo_owner=GITEA_USER,
+        github_url="https://github.com",
+        mirror_interval=None,
+        options={
+            "mirror": True,
+            "wiki": True,
+            "lfs": False,
+            "issues": False,
+            "labels": False,
+            "milestones": False,
+            "releases": False,
+            "pull_requests": False,
+        },
+    )
+
+
+ORPHANS = [
+    Repository(
+        "gitea-user/a-repo", Visibility.PUBLIC, original_url="https://github.com/team/a-repo"
+    ),
+    Repository(
+        "gitea-user/b-repo",
+        Visibility.PUBLIC,
+        original_url="https://github.com/team/b-repo",
+        archived=True,
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "command, expected_output, expected_edits, expected_deletes",
+    [
+        pytest.param(
+            ["prune", "--dry-run"],
+            "1 orphan mirrors would be archived",
+            [],
+            [],
+            id="dry-run",
+        ),
+        pytest.param(
+            ["prune"],
+            "Pruned 1 out of 1 orphan mirrors",
+            [call("gitea-user/a-repo", {"archived": True})],
+            [],
+            id="archive",
+        ),
+        pytest.param(
+            ["prune", "--action", "delete"],
+            "Pruned 2 out of 2 orphan mirrors",
+            [],
+            [call("gitea-user/a-repo"), call("gitea-user/b-repo")],
+            id="delete",
+        ),
+    ],
+)
+@patch("gitea_github_sync.cli.migration.list_orphan_mirrors", autospec=True)
+@patch("gitea_github_sync.cli.config.load_config", autospec=True)
+@patch("gitea_github_sync.cli.github.list_all_repositories", autospec=True)
+@patch("gitea_github_sync.cli.github.get_github", autospec=True)
+@patch("gitea_github_sync.cli.gitea.get_gitea", autospec=True)
+def test_prune(
+    mock_get_gitea: MagicMock,
+    mock_get_github: MagicMock,
+    mock_list_all_repositories: MagicMock,
+    mock_load_config: MagicMock,
+    mock_list_orphan_mirrors: MagicMock,
+    command: List[str],
+    expected_output: str,
+    expected_edits: List[Any],
+    expected_deletes: List[Any],
+) -> None:
+    mock_load_config.return_value.owner_mapping = {}
+    mock_load_config.return_value.github_api_url = "https://github.example.com/api/v3"
+    mock_get_gitea.return_value.get_user_login.return_value = GITEA_USER
+    mock_list_orphan_mirrors.return_value = ORPHANS
+
+    runner = CliRunner()
+    result = runner.invoke(cli, command)
+
+    assert result.exit_code == 0
+    assert "Orphan mirror gitea-user/a-repo of https://github.com/team/a-repo" in result.stdout
+    assert expected_output in result.stdout
+    mock_get_gitea.return_value.edit_repo.assert_has_calls(expected_edits, any_order=True)
+    mock_get_gitea.return_value.delete_repo.assert_has_calls(expected_deletes, any_order=True)
+    assert mock_get_gitea.return_value.edit_repo.call_count == len(expected_edits)
+    assert mock_get_gitea.return_value.delete_repo.call_count == len(expected_deletes)
+    mock_list_orphan_mirrors.assert_called_once_with(
+        gh=mock_get_github.return_value,
+        gitea_repos=mock_get_gitea.return_value.get_repos.return_value,
+        gh_repos=mock_list_all_repositories.return_value,
+        owner_mapping=OwnerMapping(mapping={}, default_owner=GITEA_USER),
+        concurrency=4,
+        github_url="https://github.example.com",
+    )
+
+
+@patch("gitea_github_sync.cli.migration.list_orphan_mirrors", autospec=True)
+@patch("gitea_github_sync.cli.config.load_config", autospec=True)
+@patch("gitea_github_sync.cli.github.list_all_repositories", autospec=True)
+@patch("gitea_github_sync.cli.github.get_github", autospec=True)
+@patch("gitea_github_sync.cli.gitea.get_gitea", autospec=True)
+def test_prune_above_max_prune(
+    mock_get_gitea: MagicMock,
+    mock_get_github: MagicMock,
+    mock_list_all_repositories: MagicMock,
+    mock_load_config: MagicMock,
+    mock_list_orphan_mirrors: MagicMock,
+) -> None:
+    mock_load_config.return_value.owner_mapping = {}
+    mock_list_orphan_mirrors.return_value = ORPHANS
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["prune", "--action", "delete", "--max-prune", "1"])
+
+    assert result.exit_code != 0
+    assert "2 orphan mirrors found, more than --max-prune 1" in result.stdout
+    mock_get_gitea.return_value.delete_repo.assert_not_called()
+
+
+@patch("gitea_github_sync.cli.git_mirror.get_migrate_function", autospec=True)
+@patch("gitea_github_sync.cli.config.load_config", autospec=True)
+@patch("gitea_github_sync.cli.github.list_all_repositories", autospec=True)
+@patch("gitea_github_sync.cli.github.get_github", autospec=True)
+@patch("gitea_github_sync.cli.gitea.get_gitea", autospec=True)
+def test_sync_git_engine(
+    mock_get_gitea: MagicMock,
+    mock_get_github: MagicMock,
+    mock_list_all_repositories: MagicMock,
+    mock_load_config: MagicMock,
+    mock_get_migrate_function: MagicMock,
+    tmp_path: Path,
+) -> None:
+    mock_load_config.return_value.owner_mapping = {}
+    mock_load_config.return_value.git_cache_dir = tmp_path
+    mock_get_gitea.return_value.get_user_login.return_value = GITEA_USER
+    mock_list_all_repositories.return_value = MULTIPLE_REPOS
+    # a-repo was pushed by a previous run, it is refreshed rather than adopted
+    cache_path = GitMirrorEngine(cache_dir=tmp_path).cache_path("some-team/a-repo")
+    cache_path.mkdir(parents=True)
+    (cache_path / PUSHED_REFS_FILE).write_text("")
+    mock_get_gitea.return_value.get_repos.return_value = [
+        Repository("gitea-user/a-repo", Visibility.PUBLIC),
+        Repository(
+            "gitea-user/b-repo",
+            Visibility.PRIVATE,
+            original_url="https://github.com/some-team/b-repo",
+        ),
+    ]
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["sync", "--engine", "git", "--concurrency", "2"])
+
+    assert result.exit_code == 0
+    assert "Migrated 2 out of 2 repos successfully" in result.stdout
+    mock_get_migrate_function.assert_called_once_with(
+        engine=GitMirrorEngine(cache_dir=tmp_path),
+        gt=mock_get_gitea.return_value,
+        github_api_url=mock_load_config.return_value.github_api_url,
+        github_token=mock_load_config.return_value.github_token,
+        owner_mapping=OwnerMapping(mapping={}, default_owner=GITEA_USER),
+        repos_to_create={"some-team/c-repo"},
+    )
+    mock_get_migrate_function.return_value.assert_has_calls(
+        [call(MULTIPLE_REPOS[0]), call(MULTIPLE_REPOS[2])], any_order=True
+    )
+
+
+@patch("gitea_github_sync.cli.config.load_config", autospec=True)
+def test_sync_streaming_git_engine(mock_load_config: MagicMock) -> None:
+    runner = CliRunner()
+    result = runner.invoke(cli, ["sync", "--streaming", "--engine", "git"])
+
+    assert result.exit_code == 2
+    assert "--streaming is not supported by the git engine" in result.output
+    mock_load_config.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "command, expected_error",
+    [
+        (["sync", "--estimate"], "--estimate requires --dry-run"),
+        (["sync", "--streaming", "--dry-run"], "--dry-run is not supported with --streaming"),
+        (["sync", "--adopt-existing"], "--adopt-existing requires the git engine"),
+        (["sync", "--max-duration", "2 hours"], "expected a duration such as 45m or 2h30m"),
+    ],
+)
+@patch("gitea_github_sync.cli.config.load_config", autospec=True)
+def test_sync_dry_run_usage_errors(
+    mock_load_config: MagicMock, command: List[str], expected_error: str
+) -> None:
+    runner = CliRunner()
+    result = runner.invoke(cli, command)
+
+    assert result.exit_code == 2
+    assert expected_error in result.output
+    mock_load_config.assert_not_called()
+
+
+HISTORY_FINISHED_AT = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+@patch("gitea_github_sync.cli.history.load_history", autospec=True)
+@patch("gitea_github_sync.cli.config.load_config", autospec=True)
+@patch("gitea_github_sync.cli.github.list_all_repositories", autospec=True)
+@patch("gitea_github_sync.cli.github.get_github", autospec=True)
+@patch("gitea_github_sync.cli.gitea.get_gitea", autospec=True)
+def test_sync_dry_run_estimate(
+    mock_get_gitea: MagicMock,
+    mock_get_github: MagicMock,
+    mock_list_all_repositories: MagicMock,
+    mock_load_config: MagicMock,
+    mock_load_history: MagicMock,
+) -> None:
+    mock_load_config.return_value.owner_mapping = {}
+    mock_get_gitea.return_value.get_user_login.return_value = GITEA_USER
+    mock_get_gitea.return_value.get_repos.return_value = []
+    mock_get_github.return_value.per_page = 30
+    mock_get_github.return_value.rate_limiting = (10, 5000)
+    mock_list_all_repositories.return_value = [
+        Repository("some-team/a-repo", Visibility.PUBLIC, size_kb=2048),
+        Repository("some-team/b-repo", Visibility.PRIVATE),
+    ]
+    mock_load_history.return_value = [
+        MigrationRecord("some-team/c-repo", "gitea", 0, 10.0, True, HISTORY_FINISHED_AT),
+        MigrationRecord("some-team/d-repo", "gitea", 1024, 20.0, True, HISTORY_FINISHED_AT),
+    ]
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["sync", "--dry-run", "--estimate", "--concurrency", "2"])
+
+    assert result.exit_code == 0
+    assert result.stdout == textwrap.dedent(
+        """\
+        Would migrate some-team/a-repo
+        Would migrate some-team/b-repo
+        2 repos would be migrated
+        Estimate for 2 repos with the gitea engine and a concurrency of 2
+        API calls: github 1, gitea 4
+        Github rate limit consumption: 5 calls, 4 of them by Gitea
+        Github rate limit remaining: 10 out of 5000
+        Size to clone: 2.0 MiB (1 repos of unknown size)
+        Projected wall time: 0:00:30 (based on 2 previous migrations)
+        """
+    )
+    mock_load_history.assert_called_once_with(mock_load_config.return_value.history_file, "gitea")
+    mock_get_gitea.return_value.migrate_repo.assert_not_called()
+
+
+RECONCILE_DRIFTS = [
+    RepositoryDrift(
+        "gitea-user/a-repo", [FieldChange("visibility", Visibility.PRIVATE, Visibility.PUBLIC)]
+    ),
+    RepositoryDrift(
+        "gitea-user/b-repo",
+        [FieldChange("description", "[old]", "new"), FieldChange("archived", False, True)],
+    ),
+]
+
+
+@pytest.mark.parametrize("dry_run", [True, False])
+@patch("gitea_github_sync.cli.reconcile.list_repository_drifts", autospec=True)
+@patch("gitea_github_sync.cli.config.load_config", autospec=True)
+@patch("gitea_github_sync.cli.github.list_all_repositories", autospec=True)
+@patch("gitea_github_sync.cli.github.get_github", autospec=True)
+@patch("gitea_github_sync.cli.gitea.get_gitea", autospec=True)
+def test_reconcile(
+    mock_get_gitea: MagicMock,
+    mock_get_github: MagicMock,
+    mock_list_all_repositories: MagicMock,
+    mock_load_config: MagicMock,
+    mock_list_repository_drifts: MagicMock,
+    dry_run: bool,
+) -> None:
+    mock_load_config.return_value.owner_mapping = {}
+    mock_get_gitea.return_value.get_user_login.return_value = GITEA_USER
+    mock_list_repository_drifts.return_value = RECONCILE_DRIFTS
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["reconcile", "--dry-run"] if dry_run else ["reconcile"])
+
+    assert result.exit_code == 0
+    assert "gitea-user/a-repo: visibility: private -> public" in result.stdout
+    assert "gitea-user/b-repo: description: '[old]' -> 'new', archived: False -> True" in (
+        result.stdout
+    )
+    if dry_run:
+        assert "2 repos would be updated" in result.stdout
+        mock_get_gitea.return_value.edit_repo.assert_not_called()
+    else:
+        assert "Updated 2 out of 2 repos" in result.stdout
+        mock_get_gitea.return_value.edit_repo.assert_has_calls(
+            [
+                call("gitea-user/a-repo", {"private": False}),
+                call("gitea-user/b-repo", {"description": "new", "archived": True}),
+            ],
+            any_order=True,
+        )
+    mock_list_repository_drifts.assert_called_once_with(
+        gh_repos=mock_list_all_repositories.return_value,
+        gitea_repos=mock_get_gitea.return_value.get_repos.return_value,
+        owner_mapping=OwnerMapping(mapping={}, default_owner=GITEA_USER),
+        fields=FIELDS,
+    )
+
+
+@patch("gitea_github_sync.cli.reconcile.list_repository_drifts", autospec=True)
+@patch("gitea_github_sync.cli.config.load_config", autospec=True)
+@patch("gitea_github_sync.cli.github.list_all_repositories", autospec=True)
+@patch("gitea_github_sync.cli.github.get_github", autospec=True)
+@patch("gitea_github_sync.cli.gitea.get_gitea", autospec=True)
+def test_reconcile_selected_fields(
+    mock_get_gitea: MagicMock,
+    mock_get_github: MagicMock,
+    mock_list_all_repositories: MagicMock,
+    mock_load_config: MagicMock,
+    mock_list_repository_drifts: MagicMock,
+) -> None:
+    mock_load_config.return_value.owner_mapping = {}
+    mock_get_gitea.return_value.get_user_login.return_value = GITEA_USER
+    mock_list_repository_drifts.return_value = []
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["reconcile", "--field", "visibility", "--field", "archived"])
+
+    assert result.exit_code == 0
+    assert mock_list_repository_drifts.call_args.kwargs["fields"] == ("visibility", "archived")
@@ -4,7 +4,12 @@ from unittest.mock import MagicMock, mock_open, patch
 import pytest
 from piny import ValidationError
 
-from gitea_github_sync.config import Config, config_file_location, load_config
+from gitea_github_sync.config import (
+    Config,
+    config_file_location,
+    default_history_file,
+    load_config,
+)
 
 VALID_CONFIG_FILE = """
 github_token: some-github-token
@@ -49,3 +54,10 @@ def test_load_config_bad_file(mock_file_open: MagicMock) -> None:
 def test_config_file_location() -> None:
     result = config_file_location()
     assert result == Path.home() / ".config" / "gitea-github-sync" / "config.yml"
+
+
+def test_default_history_file() -> None:
+    result = default_history_file()
+    assert result == (
+        Path.home() / ".local" / "state" / "gitea-github-sync" / "migration-history.jsonl"
+    )
@@ -0,0 +1,108 @@
+from datetime import datetime, timezone
+from typing import List, Optional
+
+import pytest
+
+from gitea_github_sync.estimate import (
+    DurationModel,
+    estimate_sync,
+    projected_wall_seconds,
+)
+from gitea_github_sync.history import MigrationRecord
+from gitea_github_sync.repository import Repository, Visibility
+
+FINISHED_AT = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def record(size_kb: Optional[int], seconds: float, succeeded: bool = True) -> MigrationRecord:
+    return MigrationRecord("some-team/a-repo", "gitea", size_kb, seconds, succeeded, FINISHED_AT)
+
+
+def repos(sizes: List[Optional[int]]) -> List[Repository]:
+    return [
+        Repository(f"some-team/repo-{i}", Visibility.PUBLIC, size_kb=size)
+        for i, size in enumerate(sizes)
+    ]
+
+
+def test_duration_model_fit() -> None:
+    model = DurationModel.fit(
+        [record(0, 10), record(1000, 30), record(2000, 50), record(5000, 1, succeeded=False)]
+    )
+
+    assert model is not None
+    assert model.overhead_seconds == pytest.approx(10)
+    assert model.seconds_per_kb == pytest.approx(0.02)
+    assert model.sample_size == 3
+    assert model.predict(500) == pytest.approx(20)
+    assert model.predict(None) == pytest.approx(10)
+
+
+def test_duration_model_fit_same_sizes() -> None:
+    model = DurationModel.fit([record(None, 10), record(None, 20)])
+
+    assert model == DurationModel(15, 0, 2)
+
+
+def test_duration_model_fit_clamped() -> None:
+    model = DurationModel.fit([record(0, 50), record(1000, 10)])
+
+    assert model is not None
+    assert model.seconds_per_kb == 0
+
+
+def test_duration_model_fit_no_success() -> None:
+    assert DurationModel.fit([record(0, 10, succeeded=False)]) is None
+
+
+@pytest.mark.parametrize(
+    "durations, concurrency, expected",
+    [([], 4, 0), ([10, 20, 30], 1, 60), ([10, 20, 30], 2, 40), ([30, 10, 10, 10], 2, 30)],
+)
+def test_projected_wall_seconds(durations: List[float], concurrency: int, expected: float) -> None:
+    assert projected_wall_seconds(durations, concurrency) == expected
+
+
+def test_estimate_sync() -> None:
+    to_migrate = repos([1024, None, 3072])
+
+    estimate = estimate_sync(
+        repos_to_migrate=to_migrate,
+        missing_repos=to_migrate,
+        nb_github_repos=250,
+        nb_gitea_repos=61,
+        engine="gitea",
+        concurrency=2,
+        history=[record(0, 10), record(1024, 20)],
+        github_page_size=100,
+    )
+
+    assert estimate.nb_repos == 3
+    assert estimate.size_kb == 4096
+    assert estimate.nb_unknown_sizes == 1
+    assert estimate.api_calls == {"github": 3, "gitea": 3 + 1 + 3}
+    assert estimate.github_calls_by_gitea == 6
+    assert estimate.github_rate_limit_consumption == 9
+    assert estimate.wall_seconds == pytest.approx(50)
+
+
+def test_estimate_sync_git_engine_without_history() -> None:
+    missing = repos([1024])
+
+    estimate = estimate_sync(
+        repos_to_migrate=missing + repos([2048, 4096]),
+        missing_repos=missing,
+        nb_github_repos=0,
+        nb_gitea_repos=0,
+        engine="git",
+        concurrency=1,
+        history=[],
+        github_page_size=100,
+    )
+
+    assert estimate.nb_repos == 3
+    assert estimate.size_kb == 1024
+    assert estimate.api_calls == {"github": 1, "gitea": 3}
+    assert estimate.github_calls_by_gitea == 0
+    assert estimate.model is None
+    assert estimate.wall_seconds is None
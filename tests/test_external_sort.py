@@ -0,0 +1,49 @@
+import json
+import random
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from gitea_github_sync.external_sort import external_sort
+
+
+@pytest.mark.parametrize(
+    "nb_items, run_size, max_open_runs",
+    [(0, 10, 4), (5, 10, 4), (100, 10, 4), (1000, 7, 3)],
+)
+def test_external_sort(nb_items: int, run_size: int, max_open_runs: int, tmp_path: Path) -> None:
+    rng = random.Random(nb_items)
+    items = [rng.randint(0, 100) for _ in range(nb_items)]
+
+    result = list(
+        external_sort(
+            items,
+            key=lambda item: item,
+            dump=json.dumps,
+            load=json.loads,
+            directory=tmp_path,
+            run_size=run_size,
+            max_open_runs=max_open_runs,
+        )
+    )
+
+    assert result == sorted(items)
+    assert len(list(tmp_path.iterdir())) <= max_open_runs
+
+
+def test_external_sort_is_stable(tmp_path: Path) -> None:
+    items = [["b", 0], ["a", 1], ["b", 2], ["a", 3], ["a", 4]]
+
+    result: List[List[object]] = list(
+        external_sort(
+            items,
+            key=lambda item: item[0],
+            dump=json.dumps,
+            load=json.loads,
+            directory=tmp_path,
+            run_size=2,
+        )
+    )
+
+    assert result == [["a", 1], ["a", 3], ["a", 4], ["b", 0], ["b", 2]]
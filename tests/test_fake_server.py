@@ -0,0 +1,230 @@
+from functools import partial
+from pathlib import Path
+from typing import Iterator
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+from click.testing import CliRunner
+
+from gitea_github_sync.cli import cli
+from gitea_github_sync.config import Config, MigrationPriority
+from gitea_github_sync.gitea import Gitea, GiteaMigrationError
+from gitea_github_sync.github import get_github, list_all_repositories
+from gitea_github_sync.history import load_history
+from gitea_github_sync.repository import Repository, Visibility
+from gitea_github_sync.throttling import CircuitBreaker
+
+from .fake_server import FakeServer, FakeServerSettings, generate_state
+
+
+@pytest.fixture
+def fake_server() -> Iterator[FakeServer]:
+    with FakeServer(generate_state(nb_github_repos=75, nb_mirrored_repos=40)) as server:
+        yield server
+
+
+def fake_config(server: FakeServer, history_file: Path) -> Config:
+    return Config(
+        github_token="some-github-token",
+        github_api_url=server.github_api_url,
+        gitea_api_url=server.gitea_api_url,
+        gitea_token="some-gitea-token",
+        history_file=history_file,
+    )
+
+
+def test_fake_server_pagination(fake_server: FakeServer, tmp_path: Path) -> None:
+    gt = Gitea(api_url=fake_server.gitea_api_url, api_token="some-gitea-token")
+    gh = get_github(fake_config(fake_server, tmp_path / "history.jsonl"))
+
+    assert len(gt.get_repos()) == 40
+    assert len(list_all_repositories(gh)) == 75
+    assert fake_server.count_requests("GET", "/gitea/api/v1/user/repos") == 2
+    assert fake_server.count_requests("GET", "/github/user/repos") == 3
+
+
+@patch("gitea_github_sync.cli.config.load_config", autospec=True)
+def test_fake_server_sync(
+    mock_load_config: MagicMock, fake_server: FakeServer, tmp_path: Path
+) -> None:
+    fake_server.settings.failing_repos = {"some-team/repo-000050"}
+    mock_load_config.return_value = fake_config(fake_server, tmp_path / "history.jsonl")
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["sync"])
+
+    assert result.exit_code == 0
+    assert "Migrated 34 out of 35 repos successfully" in result.stdout
+    assert "Migration Error for some-team/repo-000050" in result.stdout
+    assert len(fake_server.state.gitea_repos) == 74
+    assert fake_server.count_requests("POST", "/gitea/api/v1/repos/migrate") == 35
+    records = load_history(tmp_path / "history.jsonl")
+    assert len(records) == 35
+    assert sum(not record.succeeded for record in records) == 1
+
+
+@patch("gitea_github_sync.cli.config.load_config", autospec=True)
+def test_fake_server_sync_unwritable_history(
+    mock_load_config: MagicMock, fake_server: FakeServer, tmp_path: Path
+) -> None:
+    (tmp_path / "not-a-directory").write_text("")
+    mock_load_config.return_value = fake_config(
+        fake_server, tmp_path / "not-a-directory" / "history.jsonl"
+    )
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["sync"])
+
+    assert result.exit_code == 0
+    assert "Migrated 35 out of 35 repos successfully" in result.stdout
+    assert result.stdout.count("Could not write the migration history") == 1
+
+
+@patch("gitea_github_sync.cli.config.load_config", autospec=True)
+def test_fake_server_sync_dry_run_estimate(
+    mock_load_config: MagicMock, fake_server: FakeServer, tmp_path: Path
+) -> None:
+    mock_load_config.return_value = fake_config(fake_server, tmp_path / "history.jsonl")
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["sync", "--dry-run", "--estimate"])
+
+    assert result.exit_code == 0
+    assert "35 repos would be migrated" in result.stdout
+    assert "API calls: github 3, gitea 38" in result.stdout
+    assert "Projected wall time: unknown" in result.stdout
+    assert fake_server.count_requests("POST", "/gitea/api/v1/repos/migrate") == 0
+
+    runner.invoke(cli, ["sync"])
+    result = runner.invoke(cli, ["sync", "--dry-run", "--estimate"])
+
+    assert "0 repos would be migrated" in result.stdout
+    assert "based on 35 previous migrations" in result.stdout
+
+
+@patch("gitea_github_sync.cli.config.load_config", autospec=True)
+def test_fake_server_sync_priority(
+    mock_load_config: MagicMock, fake_server: FakeServer, tmp_path: Path
+) -> None:
+    conf = fake_config(fake_server, tmp_path / "history.jsonl")
+    conf.migration_priority = MigrationPriority(repos=["some-team/repo-000070"])
+    mock_load_config.return_value = conf
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["sync", "--dry-run"])
+
+    assert result.exit_code == 0
+    assert result.stdout.splitlines()[0] == "Would migrate some-team/repo-000070"
+
+    result = runner.invoke(cli, ["sync", "--max-duration", "0s"])
+
+    assert result.exit_code == 0
+    assert "Deferred 35 repos to the next run after reaching --max-duration" in result.stdout
+    assert fake_server.count_requests("POST", "/gitea/api/v1/repos/migrate") == 0
+
+
+@patch("gitea_github_sync.cli.config.load_config", autospec=True)
+def test_fake_server_sync_streaming(
+    mock_load_config: MagicMock, fake_server: FakeServer, tmp_path: Path
+) -> None:
+    mock_load_config.return_value = fake_config(fake_server, tmp_path / "history.jsonl")
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["sync", "--streaming", "--concurrency", "4"])
+
+    assert result.exit_code == 0
+    assert "Migrated 35 out of 35 repos successfully" in result.stdout
+    assert len(fake_server.state.gitea_repos) == 75
+
+
+def test_fake_server_migration_timeout(fake_server: FakeServer) -> None:
+    fake_server.settings.migration_latency = 0.5
+    gt = Gitea(
+        api_url=fake_server.gitea_api_url,
+        api_token="some-gitea-token",
+        migration_timeout_seconds=0.05,
+    )
+
+    with pytest.raises(GiteaMigrationError) as e:
+        gt.migrate_repo(Repository("some-team/repo-000050", Visibility.PUBLIC), "some-token")
+
+    assert e.value.unreachable
+    assert e.value.is_overload
+
+
+@patch("gitea_github_sync.cli.config.load_config", autospec=True)
+def test_fake_server_sync_circuit_breaker(
+    mock_load_config: MagicMock, fake_server: FakeServer, tmp_path: Path
+) -> None:
+    fake_server.settings.failing_repos = {
+        name for name in fake_server.state.github_repos if name.startswith("some-team/")
+    }
+    mock_load_config.return_value = fake_config(fake_server, tmp_path / "history.jsonl")
+
+    runner = CliRunner()
+    with patch(
+        "gitea_github_sync.cli.throttling.CircuitBreaker",
+        partial(CircuitBreaker, reset_timeout=0.01),
+    ):
+        result = runner.invoke(cli, ["sync", "--concurrency", "4", "--adaptive"])
+
+    assert result.exit_code == 0
+    assert "Gitea looks unavailable, pausing migrations" in result.stdout
+    assert "Skipped" in result.stdout
+    # 5 failures open the circuit, then 4 probes fail before giving up
+    assert fake_server.count_requests("POST", "/gitea/api/v1/repos/migrate") == 9
+
+
+@patch("gitea_github_sync.cli.config.load_config", autospec=True)
+def test_fake_server_reconcile(
+    mock_load_config: MagicMock, fake_server: FakeServer, tmp_path: Path
+) -> None:
+    mock_load_config.return_value = fake_config(fake_server, tmp_path / "history.jsonl")
+    github_repo = fake_server.state.github_repos["some-team/repo-000003"]
+    github_repo["private"] = not github_repo["private"]
+    github_repo["visibility"] = "private" if github_repo["private"] else "public"
+    fake_server.state.github_repos["some-team/repo-000007"]["description"] = "Some description"
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["reconcile"])
+
+    assert result.exit_code == 0
+    assert "Updated 2 out of 2 repos" in result.stdout
+    gitea_repos = fake_server.state.gitea_repos
+    assert gitea_repos["gitea-user/repo-000003"]["private"] == github_repo["private"]
+    assert gitea_repos["gitea-user/repo-000007"]["description"] == "Some description"
+    assert fake_server.count_requests("PATCH", "/gitea/api/v1/repos/") == 2
+
+
+def test_fake_server_rate_limit() -> None:
+    settings = FakeServerSettings(rate_limit=2)
+    with FakeServer(generate_state(nb_github_repos=1), settings) as server:
+        responses = [requests.get(f"{server.github_api_url}/user/repos") for _ in range(3)]
+
+    assert [response.status_code for response in responses] == [200, 200, 403]
+    assert responses[1].headers["X-RateLimit-Remaining"] == "0"
+    assert "Retry-After" in responses[2].headers
+
+
+def test_fake_server_error_injection() -> None:
+    settings = FakeServerSettings(error_rate=1.0)
+    with FakeServer(settings=settings) as server:
+        response = requests.get(f"{server.gitea_api_url}/user")
+
+    assert response.status_code == 500
+
+
+def test_fake_server_record_and_replay(tmp_path: Path) -> None:
+    recording = tmp_path / "recording.json"
+    with FakeServer(generate_state(nb_github_repos=0, nb_mirrored_repos=0), record=True) as server:
+        server.state = generate_state(nb_github_repos=40, nb_mirrored_repos=40)
+        expected = Gitea(api_url=server.gitea_api_url, api_token="some-token").get_repos()
+        server.save_recording(recording)
+
+    with FakeServer.replay(recording) as server:
+        result = Gitea(api_url=server.gitea_api_url, api_token="some-token").get_repos()
+        unknown = requests.get(f"{server.gitea_api_url}/user")
+
+    assert result == expected
+    assert unknown.status_code == 501
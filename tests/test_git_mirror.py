@@ -0,0 +1,269 @@
+import base64
+import shutil
+import subprocess
+from pathlib import Path
+from typing import List
+from unittest.mock import MagicMock
+
+import pytest
+
+from gitea_github_sync.git_mirror import (
+    PUSHED_REFS_FILE,
+    GitMirrorEngine,
+    GitMirrorError,
+    GitRemote,
+    get_migrate_function,
+    gitea_web_url,
+    list_repos_to_push,
+)
+from gitea_github_sync.gitea import Gitea, GiteaMigrationError
+from gitea_github_sync.migration import OwnerMapping
+from gitea_github_sync.repository import Repository, Visibility
+
+requires_git = pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+
+
+def git(*args: str) -> str:
+    return subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+
+
+@pytest.fixture
+def source_repo(tmp_path: Path) -> Path:
+    path = tmp_path / "source"
+    git("init", "-q", "-b", "main", str(path))
+    git("-C", str(path), "commit", "-q", "--allow-empty", "-m", "first")
+    return path
+
+
+@pytest.fixture
+def target_repo(tmp_path: Path) -> Path:
+    path = tmp_path / "target.git"
+    git("init", "-q", "--bare", str(path))
+    return path
+
+
+@requires_git
+def test_git_mirror_engine(tmp_path: Path, source_repo: Path, target_repo: Path) -> None:
+    engine = GitMirrorEngine(cache_dir=tmp_path / "cache")
+    source = GitRemote(source_repo.as_uri())
+    target = GitRemote(target_repo.as_uri())
+
+    assert engine.mirror("some-team/a-repo", source, target)
+    assert (engine.cache_path("some-team/a-repo") / "HEAD").exists()
+    assert git("-C", str(target_repo), "rev-parse", "main") == git(
+        "-C", str(source_repo), "rev-parse", "main"
+    )
+
+    assert not engine.mirror("some-team/a-repo", source, target)
+
+    git("-C", str(source_repo), "commit", "-q", "--allow-empty", "-m", "second")
+    git("-C", str(source_repo), "branch", "feature")
+    assert engine.mirror("some-team/a-repo", source, target)
+    assert git("-C", str(target_repo), "rev-parse", "feature") == git(
+        "-C", str(source_repo), "rev-parse", "main"
+    )
+
+    assert engine.mirror("some-team/a-repo", source, target, force=True)
+
+
+@requires_git
+def test_git_mirror_engine_only_mirrors_branches_and_tags(
+    tmp_path: Path, source_repo: Path, target_repo: Path
+) -> None:
+    engine = GitMirrorEngine(cache_dir=tmp_path / "cache")
+    source = GitRemote(source_repo.as_uri())
+    target = GitRemote(target_repo.as_uri())
+    git("-C", str(source_repo), "tag", "v1")
+    git("-C", str(source_repo), "update-ref", "refs/pull/1/head", "main")
+    engine.mirror("some-team/a-repo", source, target)
+    # Refs written by Gitea itself, and a branch deleted on Github since the last push
+    git("-C", str(target_repo), "update-ref", "refs/pull/9/head", "main")
+    git("-C", str(source_repo), "branch", "stale")
+    engine.mirror("some-team/a-repo", source, target)
+    git("-C", str(source_repo), "branch", "-D", "stale")
+
+    assert engine.mirror("some-team/a-repo", source, target)
+
+    target_refs = git("-C", str(target_repo), "for-each-ref", "--format=%(refname)").split()
+    assert sorted(target_refs) == ["refs/heads/main", "refs/pull/9/head", "refs/tags/v1"]
+
+
+@requires_git
+def test_git_mirror_engine_failure(tmp_path: Path, target_repo: Path) -> None:
+    engine = GitMirrorEngine(cache_dir=tmp_path / "cache")
+
+    with pytest.raises(GitMirrorError) as e:
+        engine.mirror(
+            "some-team/a-repo",
+            GitRemote((tmp_path / "missing").as_uri()),
+            GitRemote(target_repo.as_uri()),
+        )
+
+    assert str(e.value).startswith("Could not mirror some-team/a-repo")
+
+
+def test_git_remote_with_basic_auth() -> None:
+    remote = GitRemote.with_basic_auth("https://github.com/a/b.git", "user", "token")
+
+    assert remote.url == "https://github.com/a/b.git"
+    assert remote.authorization == f"Basic {base64.b64encode(b'user:token').decode()}"
+
+
+def test_gitea_web_url() -> None:
+    assert gitea_web_url("https://gitea.example.com/api/v1") == "https://gitea.example.com"
+
+
+LIST_REPOS_TO_PUSH_GH_REPOS = [
+    Repository("team/missing", Visibility.PUBLIC),
+    Repository("team/pushed", Visibility.PUBLIC),
+    Repository("team/handmade", Visibility.PUBLIC),
+    Repository("team/pull-mirror", Visibility.PUBLIC),
+]
+LIST_REPOS_TO_PUSH_GITEA_REPOS = [
+    Repository("gitea-user/pushed", Visibility.PUBLIC),
+    Repository("gitea-user/handmade", Visibility.PUBLIC),
+    Repository(
+        "gitea-user/pull-mirror",
+        Visibility.PUBLIC,
+        original_url="https://github.com/team/pull-mirror",
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "adopt_existing, expected",
+    [(False, ["missing", "pushed"]), (True, ["missing", "pushed", "handmade"])],
+)
+def test_list_repos_to_push(tmp_path: Path, adopt_existing: bool, expected: List[str]) -> None:
+    engine = GitMirrorEngine(cache_dir=tmp_path)
+    engine.cache_path("team/pushed").mkdir(parents=True)
+    (engine.cache_path("team/pushed") / PUSHED_REFS_FILE).write_text("")
+
+    result = list_repos_to_push(
+        gh_repos=LIST_REPOS_TO_PUSH_GH_REPOS,
+        gitea_repos=LIST_REPOS_TO_PUSH_GITEA_REPOS,
+        missing_repos=[LIST_REPOS_TO_PUSH_GH_REPOS[0]],
+        owner_mapping=OwnerMapping(default_owner="gitea-user"),
+        engine=engine,
+        adopt_existing=adopt_existing,
+    )
+
+    assert [repo.get_repo_name() for repo in result] == expected
+
+
+@pytest.mark.parametrize(
+    "full_repo_name, expected_org, create",
+    [
+        ("team-a/a-repo", None, True),
+        ("team-b/b-repo", "gitea-b", True),
+        ("team-a/existing", None, False),
+    ],
+)
+def test_get_migrate_function(full_repo_name: str, expected_org: str, create: bool) -> None:
+    mock_engine = MagicMock(spec_set=GitMirrorEngine)
+    mock_gitea = MagicMock(spec=Gitea)
+    mock_gitea.api_url = "https://gitea.example.com/api/v1"
+    mock_gitea.api_token = "gitea-token"
+    repo = Repository(full_repo_name, Visibility.PRIVATE)
+
+    migrate = get_migrate_function(
+        engine=mock_engine,
+        gt=mock_gitea,
+        github_api_url="https://api.github.com",
+        github_token="github-token",
+        owner_mapping=OwnerMapping(mapping={"team-b": "gitea-b"}, default_owner="gitea-user"),
+        repos_to_create={"team-a/a-repo", "team-b/b-repo"},
+    )
+    migrate(repo)
+
+    gitea_owner = expected_org or "gitea-user"
+    if create:
+        mock_gitea.create_repo.assert_called_once_with(
+            name=repo.get_repo_name(), private=True, org=expected_org
+        )
+        mock_engine.mark_created.assert_called_once_with(full_repo_name)
+    else:
+        mock_gitea.create_repo.assert_not_called()
+        mock_engine.mark_created.assert_not_called()
+    mock_engine.mirror.assert_called_once_with(
+        full_repo_name,
+        source=GitRemote.with_basic_auth(
+            f"https://github.com/{full_repo_name}.git", "x-access-token", "github-token"
+        ),
+        target=GitRemote.with_basic_auth(
+            f"https://gitea.example.com/{gitea_owner}/{repo.get_repo_name()}.git",
+            "gitea-github-sync",
+            "gitea-token",
+        ),
+        force=create,
+    )
+
+
+def test_get_migrate_function_git_error() -> None:
+    mock_engine = MagicMock(spec_set=GitMirrorEngine)
+    mock_engine.mirror.side_effect = GitMirrorError("team-a/a-repo", "fatal: error")
+    mock_gitea = MagicMock(spec=Gitea)
+    mock_gitea.api_url = "https://gitea.example.com/api/v1"
+    mock_gitea.api_token = "gitea-token"
+
+    migrate = get_migrate_function(
+        engine=mock_engine,
+        gt=mock_gitea,
+        github_api_url="https://api.github.com",
+        github_token="github-token",
+        owner_mapping=OwnerMapping(default_owner="gitea-user"),
+        repos_to_create=set(),
+    )
+
+    with pytest.raises(GiteaMigrationError):
+        migrate(Repository("team-a/a-repo", Visibility.PUBLIC))
+
+
+@requires_git
+def test_get_migrate_function_push_failure_after_create(tmp_path: Path) -> None:
+    repo = Repository("team-a/a-repo", Visibility.PUBLIC)
+    source_repo = tmp_path / "github" / "team-a" / "a-repo.git"
+    git("init", "-q", "-b", "main", str(source_repo))
+    git("-C", str(source_repo), "commit", "-q", "--allow-empty", "-m", "first")
+    target_repo = tmp_path / "gitea" / "gitea-user" / "a-repo.git"
+    engine = GitMirrorEngine(cache_dir=tmp_path / "cache")
+    mock_gitea = MagicMock(spec=Gitea)
+    mock_gitea.api_url = f"{(tmp_path / 'gitea').as_uri()}/api/v1"
+    mock_gitea.api_token = "gitea-token"
+    owner_mapping = OwnerMapping(default_owner="gitea-user")
+
+    def run(repos_to_create: List[str]) -> None:
+        migrate = get_migrate_function(
+            engine=engine,
+            gt=mock_gitea,
+            github_api_url=(tmp_path / "github").as_uri(),
+            github_token="github-token",
+            owner_mapping=owner_mapping,
+            repos_to_create=repos_to_create,
+        )
+        migrate(repo)
+
+    # The repository is created but the push fails, e.g. because Gitea went down
+    with pytest.raises(GiteaMigrationError):
+        run(["team-a/a-repo"])
+    git("init", "-q", "--bare", str(target_repo))
+
+    # The next run finds the plain repository on Gitea and still owns it
+    repos_to_push = list_repos_to_push(
+        gh_repos=[repo],
+        gitea_repos=[Repository("gitea-user/a-repo", Visibility.PUBLIC)],
+        missing_repos=[],
+        owner_mapping=owner_mapping,
+        engine=engine,
+    )
+    assert repos_to_push == [repo]
+    run([])
+
+    assert git("-C", str(target_repo), "rev-parse", "main") == git(
+        "-C", str(source_repo), "rev-parse", "main"
+    )
@@ -1,11 +1,19 @@
+from typing import Any, Dict, Optional
 from unittest.mock import MagicMock, patch
 
 import pytest
+import requests
 import responses
 from responses import matchers
 
 from gitea_github_sync.config import Config
-from gitea_github_sync.gitea import Gitea, GiteaMigrationError, get_gitea
+from gitea_github_sync.gitea import (
+    Gitea,
+    GiteaDeleteError,
+    GiteaEditError,
+    GiteaMigrationError,
+    get_gitea,
+)
 from gitea_github_sync.repository import Repository, Visibility
 
 GITEA_BASE_API_URL = "https://gitea.yourinstance.com/api/v1"
@@ -45,6 +53,26 @@ def test_gitea_get_repos(gitea_fixture: Gitea) -> None:
     assert expected_repos == result
 
 
+@responses.activate
+def test_gitea_iter_repos(gitea_fixture: Gitea) -> None:
+    responses.get(
+        f"{GITEA_BASE_API_URL}/user/repos",
+        json=[{"full_name": "some-team/a-repo", "private": True}],
+        headers={"link": f'<{GITEA_BASE_API_URL}/user/repos?page=2>; rel="next"'},
+    )
+    responses.get(
+        f"{GITEA_BASE_API_URL}/user/repos?page=2",
+        json=[{"full_name": "some-team/b-repo", "private": False}],
+    )
+
+    result = gitea_fixture.iter_repos()
+
+    assert next(result) == Repository("some-team/a-repo", Visibility.PRIVATE)
+    assert len(responses.calls) == 1
+    assert list(result) == [Repository("some-team/b-repo", Visibility.PUBLIC)]
+    assert len(responses.calls) == 2
+
+
 @responses.activate
 def test_gitea_get_repos_multiple_pages(gitea_fixture: Gitea) -> None:
     json_1 = [
@@ -135,6 +163,26 @@ def test_gitea_migrate_repo(gitea_fixture: Gitea, is_private: bool) -> None:
     gitea_fixture.migrate_repo(repo, gh_token)
 
 
+@responses.activate
+def test_gitea_migrate_repo_github_enterprise(gitea_fixture: Gitea) -> None:
+    gh_token = "some-github-token"
+    expected_data = {
+        "auth_token": gh_token,
+        "clone_addr": "https://github.example.com/Muscaw/gitea-github-sync",
+        "repo_name": "gitea-github-sync",
+        "service": "github",
+        "mirror": True,
+        "private": False,
+    }
+    repo = Repository(full_repo_name="Muscaw/gitea-github-sync", visibility=Visibility.PUBLIC)
+    responses.post(
+        f"{GITEA_BASE_API_URL}/repos/migrate",
+        match=[matchers.json_params_matcher(expected_data)],
+    )
+
+    gitea_fixture.migrate_repo(repo, gh_token, github_url="https://github.example.com")
+
+
 @responses.activate
 @pytest.mark.parametrize("is_private", [True, False])
 def test_gitea_migrate_repo_failure_to_migrate(gitea_fixture: Gitea, is_private: bool) -> None:
@@ -160,9 +208,329 @@ def test_gitea_migrate_repo_failure_to_migrate(gitea_fixture: Gitea, is_private:
         status=409,
     )
 
-    with pytest.raises(GiteaMigrationError):
+    with pytest.raises(GiteaMigrationError) as e:
         gitea_fixture.migrate_repo(repo, gh_token)
 
+    assert e.value.status_code == 409
+    assert not e.value.is_overload
+
+
+@responses.activate
+@pytest.mark.parametrize(
+    "response_kwargs, expected_error",
+    [
+        (
+            {"status": 503},
+            GiteaMigrationError("Muscaw/gitea-github-sync", status_code=503),
+        ),
+        (
+            {"status": 429},
+            GiteaMigrationError("Muscaw/gitea-github-sync", status_code=429),
+        ),
+        (
+            {"body": requests.ConnectionError()},
+            GiteaMigrationError("Muscaw/gitea-github-sync", unreachable=True),
+        ),
+        (
+            {"body": requests.ReadTimeout()},
+            GiteaMigrationError("Muscaw/gitea-github-sync", unreachable=True),
+        ),
+    ],
+)
+def test_gitea_migrate_repo_overload(
+    gitea_fixture: Gitea, response_kwargs: Dict[str, Any], expected_error: GiteaMigrationError
+) -> None:
+    repo = Repository(full_repo_name="Muscaw/gitea-github-sync", visibility=Visibility.PUBLIC)
+    responses.post(f"{GITEA_BASE_API_URL}/repos/migrate", **response_kwargs)
+
+    with pytest.raises(GiteaMigrationError) as e:
+        gitea_fixture.migrate_repo(repo, "some-github-token")
+
+    assert e.value == expected_error
+    assert e.value.is_overload
+
+
+@responses.activate
+def test_gitea_migrate_repo_with_owner(gitea_fixture: Gitea) -> None:
+    gh_token = "some-github-token"
+    expected_data = {
+        "auth_token": gh_token,
+        "clone_addr": "https://github.com/Muscaw/gitea-github-sync",
+        "repo_name": "gitea-github-sync",
+        "service": "github",
+        "mirror": True,
+        "private": False,
+        "repo_owner": "some-org",
+    }
+    repo = Repository(full_repo_name="Muscaw/gitea-github-sync", visibility=Visibility.PUBLIC)
+    responses.post(
+        f"{GITEA_BASE_API_URL}/repos/migrate",
+        match=[
+            matchers.header_matcher({"Authorization": f"token {GITEA_TOKEN}"}),
+            matchers.json_params_matcher(expected_data),
+        ],
+    )
+
+    gitea_fixture.migrate_repo(repo, gh_token, repo_owner="some-org")
+
+
+@responses.activate
+def test_gitea_migrate_repo_with_mirror_interval(gitea_fixture: Gitea) -> None:
+    gh_token = "some-github-token"
+    expected_data = {
+        "auth_token": gh_token,
+        "clone_addr": "https://github.com/Muscaw/gitea-github-sync",
+        "repo_name": "gitea-github-sync",
+        "service": "github",
+        "mirror": True,
+        "private": False,
+        "mirror_interval": "10m",
+    }
+    repo = Repository(full_repo_name="Muscaw/gitea-github-sync", visibility=Visibility.PUBLIC)
+    responses.post(
+        f"{GITEA_BASE_API_URL}/repos/migrate",
+        match=[matchers.json_params_matcher(expected_data)],
+    )
+
+    gitea_fixture.migrate_repo(repo, gh_token, mirror_interval="10m")
+
+
+@responses.activate
+def test_gitea_migrate_repo_with_description(gitea_fixture: Gitea) -> None:
+    gh_token = "some-github-token"
+    expected_data = {
+        "auth_token": gh_token,
+        "clone_addr": "https://github.com/Muscaw/gitea-github-sync",
+        "repo_name": "gitea-github-sync",
+        "service": "github",
+        "mirror": True,
+        "private": False,
+        "description": "Some description",
+    }
+    repo = Repository(
+        full_repo_name="Muscaw/gitea-github-sync",
+        visibility=Visibility.PUBLIC,
+        description="Some description",
+    )
+    responses.post(
+        f"{GITEA_BASE_API_URL}/repos/migrate",
+        match=[matchers.json_params_matcher(expected_data)],
+    )
+
+    gitea_fixture.migrate_repo(repo, gh_token)
+
+
+@responses.activate
+def test_gitea_migrate_repo_with_options(gitea_fixture: Gitea) -> None:
+    gh_token = "some-github-token"
+    expected_data = {
+        "auth_token": gh_token,
+        "clone_addr": "https://github.com/Muscaw/gitea-github-sync",
+        "repo_name": "gitea-github-sync",
+        "service": "github",
+        "mirror": True,
+        "private": False,
+        "wiki": True,
+        "lfs": False,
+    }
+    repo = Repository(full_repo_name="Muscaw/gitea-github-sync", visibility=Visibility.PUBLIC)
+    responses.post(
+        f"{GITEA_BASE_API_URL}/repos/migrate",
+        match=[matchers.json_params_matcher(expected_data)],
+    )
+
+    gitea_fixture.migrate_repo(repo, gh_token, options={"wiki": True, "lfs": False})
+
+
+@responses.activate
+def test_gitea_migrate_repo_one_shot(gitea_fixture: Gitea) -> None:
+    gh_token = "some-github-token"
+    expected_data = {
+        "auth_token": gh_token,
+        "clone_addr": "https://github.com/Muscaw/gitea-github-sync",
+        "repo_name": "gitea-github-sync",
+        "service": "github",
+        "mirror": False,
+        "private": False,
+        "issues": True,
+    }
+    repo = Repository(full_repo_name="Muscaw/gitea-github-sync", visibility=Visibility.PUBLIC)
+    responses.post(
+        f"{GITEA_BASE_API_URL}/repos/migrate",
+        match=[matchers.json_params_matcher(expected_data)],
+    )
+
+    gitea_fixture.migrate_repo(
+        repo, gh_token, mirror_interval="10m", options={"mirror": False, "issues": True}
+    )
+
+
+@responses.activate
+def test_gitea_get_repos_mirror_interval(gitea_fixture: Gitea) -> None:
+    responses.get(
+        f"{GITEA_BASE_API_URL}/user/repos",
+        json=[
+            {
+                "full_name": "some-team/a-repo",
+                "private": True,
+                "mirror": True,
+                "mirror_interval": "8h0m0s",
+            },
+            {
+                "full_name": "some-team/b-repo",
+                "private": False,
+                "mirror": False,
+                "mirror_interval": "",
+            },
+        ],
+    )
+
+    result = gitea_fixture.get_repos()
+
+    assert [repo.mirror_interval for repo in result] == ["8h0m0s", None]
+
+
+@responses.activate
+def test_gitea_get_repos_mirror_metadata(gitea_fixture: Gitea) -> None:
+    responses.get(
+        f"{GITEA_BASE_API_URL}/user/repos",
+        json=[
+            {
+                "full_name": "some-team/a-repo",
+                "private": True,
+                "mirror": True,
+                "original_url": "https://github.com/team/a-repo",
+                "archived": True,
+            },
+            {
+                "full_name": "some-team/b-repo",
+                "private": False,
+                "original_url": "",
+                "description": "Some description",
+            },
+        ],
+    )
+
+    result = gitea_fixture.get_repos()
+
+    assert [repo.original_url for repo in result] == ["https://github.com/team/a-repo", None]
+    assert [repo.archived for repo in result] == [True, False]
+    assert [repo.description for repo in result] == [None, "Some description"]
+
+
+@responses.activate
+def test_gitea_delete_repo(gitea_fixture: Gitea) -> None:
+    responses.delete(
+        f"{GITEA_BASE_API_URL}/repos/some-team/a-repo",
+        match=[matchers.header_matcher({"Authorization": f"token {GITEA_TOKEN}"})],
+        status=204,
+    )
+
+    gitea_fixture.delete_repo("some-team/a-repo")
+
+
+@responses.activate
+def test_gitea_delete_repo_failure(gitea_fixture: Gitea) -> None:
+    responses.delete(f"{GITEA_BASE_API_URL}/repos/some-team/a-repo", status=403)
+
+    with pytest.raises(GiteaDeleteError):
+        gitea_fixture.delete_repo("some-team/a-repo")
+
+
+@responses.activate
+@pytest.mark.parametrize(
+    "org, expected_path", [(None, "/user/repos"), ("some-org", "/orgs/some-org/repos")]
+)
+def test_gitea_create_repo(gitea_fixture: Gitea, org: Optional[str], expected_path: str) -> None:
+    responses.post(
+        f"{GITEA_BASE_API_URL}{expected_path}",
+        match=[
+            matchers.header_matcher({"Authorization": f"token {GITEA_TOKEN}"}),
+            matchers.json_params_matcher({"name": "a-repo", "private": True}),
+        ],
+        status=201,
+    )
+
+    gitea_fixture.create_repo("a-repo", private=True, org=org)
+
+
+@responses.activate
+def test_gitea_migration_timeout() -> None:
+    gt = Gitea(api_url=GITEA_BASE_API_URL, api_token=GITEA_TOKEN, migration_timeout_seconds=30)
+    timeout_matcher = matchers.request_kwargs_matcher({"timeout": 30})
+    responses.post(f"{GITEA_BASE_API_URL}/repos/migrate", match=[timeout_matcher])
+    responses.post(f"{GITEA_BASE_API_URL}/user/repos", match=[timeout_matcher], status=201)
+
+    gt.migrate_repo(Repository("some-team/a-repo", Visibility.PUBLIC), "some-github-token")
+    gt.create_repo("a-repo", private=False)
+
+
+def test_gitea_migration_timeout_from_config(conf_fixture: Config) -> None:
+    conf_fixture.gitea_migration_timeout_seconds = 30
+
+    assert get_gitea(conf_fixture).migration_timeout_seconds == 30
+
+
+@responses.activate
+def test_gitea_create_repo_failure(gitea_fixture: Gitea) -> None:
+    responses.post(f"{GITEA_BASE_API_URL}/orgs/some-org/repos", status=409)
+
+    with pytest.raises(GiteaMigrationError):
+        gitea_fixture.create_repo("a-repo", private=False, org="some-org")
+
+
+@responses.activate
+def test_gitea_edit_repo(gitea_fixture: Gitea) -> None:
+    responses.patch(
+        f"{GITEA_BASE_API_URL}/repos/some-team/a-repo",
+        match=[
+            matchers.header_matcher({"Authorization": f"token {GITEA_TOKEN}"}),
+            matchers.json_params_matcher({"mirror_interval": "10m"}),
+        ],
+    )
+
+    gitea_fixture.edit_repo("some-team/a-repo", {"mirror_interval": "10m"})
+
+
+@responses.activate
+def test_gitea_edit_repo_failure(gitea_fixture: Gitea) -> None:
+    responses.patch(f"{GITEA_BASE_API_URL}/repos/some-team/a-repo", status=422)
+
+    with pytest.raises(GiteaEditError):
+        gitea_fixture.edit_repo("some-team/a-repo", {"mirror_interval": "1s"})
+
+
+@responses.activate
+def test_gitea_get_user_login(gitea_fixture: Gitea) -> None:
+    responses.get(
+        f"{GITEA_BASE_API_URL}/user",
+        match=[matchers.header_matcher({"Authorization": f"token {GITEA_TOKEN}"})],
+        json={"id": 1, "login": "some-user"},
+    )
+
+    assert gitea_fixture.get_user_login() == "some-user"
+
+
+@responses.activate
+@pytest.mark.parametrize("status, expected", [(200, True), (404, False)])
+def test_gitea_repo_exists(gitea_fixture: Gitea, status: int, expected: bool) -> None:
+    responses.get(
+        f"{GITEA_BASE_API_URL}/repos/some-team/a-repo",
+        match=[matchers.header_matcher({"Authorization": f"token {GITEA_TOKEN}"})],
+        json={},
+        status=status,
+    )
+
+    assert gitea_fixture.repo_exists("some-team/a-repo") == expected
+
+
+@responses.activate
+def test_gitea_repo_exists_server_error(gitea_fixture: Gitea) -> None:
+    responses.get(f"{GITEA_BASE_API_URL}/repos/some-team/a-repo", status=500)
+
+    with pytest.raises(requests.HTTPError):
+        gitea_fixture.repo_exists("some-team/a-repo")
+
 
 def test_gitea(gitea_fixture: Gitea, conf_fixture: Config) -> None:
     gt = get_gitea(conf_fixture)
@@ -181,6 +549,16 @@ def test_gitea_default_value(
     mock_load_config.assert_called_once()
 
 
+def test_gitea_delete_error() -> None:
+    error = GiteaDeleteError("Muscaw/gitea-github-sync")
+    assert str(error) == "Could not delete Muscaw/gitea-github-sync"
+
+
+def test_gitea_edit_error() -> None:
+    error = GiteaEditError("Muscaw/gitea-github-sync")
+    assert str(error) == "Could not edit Muscaw/gitea-github-sync"
+
+
 def test_gitea_migration_error() -> None:
     error = GiteaMigrationError("Muscaw/gitea-github-sync")
     assert str(error) == "Could not migrate Muscaw/gitea-github-sync"
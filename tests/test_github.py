@@ -1,12 +1,20 @@
 from dataclasses import dataclass
-from typing import List
+from datetime import datetime, timezone
+from typing import List, Optional
 from unittest.mock import MagicMock, patch
 
 import pytest
-from github import Github
+from github import Github, UnknownObjectException
 
 from gitea_github_sync.config import Config
-from gitea_github_sync.github import get_github, list_all_repositories
+from gitea_github_sync.github import (
+    get_github,
+    get_repositories,
+    get_repository,
+    github_web_url,
+    iter_all_repositories,
+    list_all_repositories,
+)
 from gitea_github_sync.repository import Repository, Visibility
 
 from .test_config import VALID_CONFIG
@@ -31,6 +39,19 @@ def test_visibility_from_str(str_value: str, expected: Visibility) -> None:
     assert result == expected
 
 
+@pytest.mark.parametrize(
+    "visibility, expected",
+    [
+        (Visibility.PUBLIC, "public"),
+        (Visibility.PRIVATE, "private"),
+        (Visibility.UNKNOWN, "unknown"),
+    ],
+)
+def test_visibility_to_str(visibility: Visibility, expected: str) -> None:
+    assert visibility.to_str() == expected
+    assert Visibility.from_str(visibility.to_str()) == visibility
+
+
 @pytest.mark.parametrize(
     "expected_org, repo",
     [
@@ -66,7 +87,9 @@ def test_github(mock_github: MagicMock, conf_fixture: Config) -> None:
     gh = get_github(conf_fixture)
 
     assert gh == mock_github.return_value
-    mock_github.assert_called_once_with(conf_fixture.github_token)
+    mock_github.assert_called_once_with(
+        conf_fixture.github_token, base_url="https://api.github.com"
+    )
 
 
 @patch("gitea_github_sync.github.config.load_config", autospec=True)
@@ -78,7 +101,9 @@ def test_github_default_value(
     gh = get_github()
 
     assert gh == mock_github.return_value
-    mock_github.assert_called_once_with(conf_fixture.github_token)
+    mock_github.assert_called_once_with(
+        conf_fixture.github_token, base_url="https://api.github.com"
+    )
     mock_load_config.assert_called_once()
 
 
@@ -86,6 +111,10 @@ def test_github_default_value(
 class MockGithubRepository:
     full_name: str
     visibility: str
+    pushed_at: Optional[datetime] = None
+    size: Optional[int] = None
+    archived: bool = False
+    description: Optional[str] = None
 
 
 @pytest.mark.parametrize(
@@ -126,3 +155,96 @@ def test_list_all_repositories(
     assert result == expected_repos
     mock_gh.get_user.assert_called_once()
     mock_gh.get_user.return_value.get_repos.assert_called_once()
+
+
+def test_list_all_repositories_pushed_at() -> None:
+    mock_gh = MagicMock(spec_set=Github)
+    mock_gh.get_user.return_value.get_repos.return_value = [
+        MockGithubRepository("a/a-repo", "public", datetime(2023, 1, 1, tzinfo=timezone.utc)),
+        MockGithubRepository("a/b-repo", "public", datetime(2023, 1, 1)),
+    ]
+
+    result = list_all_repositories(mock_gh)
+
+    assert [repo.pushed_at for repo in result] == [
+        datetime(2023, 1, 1, tzinfo=timezone.utc),
+        datetime(2023, 1, 1, tzinfo=timezone.utc),
+    ]
+
+
+def test_iter_all_repositories() -> None:
+    pages = [
+        [MockGithubRepository("a/a-repo", "public"), MockGithubRepository("a/b-repo", "private")],
+        [MockGithubRepository("b/a-repo", "public")],
+        [],
+    ]
+    mock_gh = MagicMock(spec_set=Github)
+    mock_get_page = mock_gh.get_user.return_value.get_repos.return_value.get_page
+    mock_get_page.side_effect = pages
+
+    result = iter_all_repositories(mock_gh)
+
+    assert next(result) == Repository("a/a-repo", Visibility.PUBLIC)
+    mock_get_page.assert_called_once_with(0)
+    assert list(result) == [
+        Repository("a/b-repo", Visibility.PRIVATE),
+        Repository("b/a-repo", Visibility.PUBLIC),
+    ]
+    assert mock_get_page.call_count == 3
+
+
+def test_list_all_repositories_metadata() -> None:
+    mock_gh = MagicMock(spec_set=Github)
+    mock_gh.get_user.return_value.get_repos.return_value = [
+        MockGithubRepository("a/a-repo", "public", size=42, archived=True, description="A"),
+        MockGithubRepository("a/b-repo", "public", description=""),
+    ]
+
+    result = list_all_repositories(mock_gh)
+
+    assert result == [
+        Repository("a/a-repo", Visibility.PUBLIC, archived=True, size_kb=42, description="A"),
+        Repository("a/b-repo", Visibility.PUBLIC),
+    ]
+
+
+def test_get_repository() -> None:
+    mock_gh = MagicMock(spec_set=Github)
+    mock_gh.get_repo.return_value = MockGithubRepository(full_name="a/a-repo", visibility="private")
+
+    result = get_repository(mock_gh, "a/a-repo")
+
+    assert result == Repository(full_repo_name="a/a-repo", visibility=Visibility.PRIVATE)
+    mock_gh.get_repo.assert_called_once_with("a/a-repo")
+
+
+def test_get_repository_not_found() -> None:
+    mock_gh = MagicMock(spec_set=Github)
+    mock_gh.get_repo.side_effect = UnknownObjectException(404)
+
+    result = get_repository(mock_gh, "a/a-repo")
+
+    assert result is None
+
+
+@patch("gitea_github_sync.github.get_repository", autospec=True)
+def test_get_repositories(mock_get_repository: MagicMock) -> None:
+    expected_repo = Repository(full_repo_name="a/a-repo", visibility=Visibility.PUBLIC)
+    mock_get_repository.side_effect = lambda gh, name: expected_repo if name == "a/a-repo" else None
+    mock_gh = MagicMock(spec_set=Github)
+
+    result = get_repositories(mock_gh, ["a/a-repo", "b/b-repo"], concurrency=2)
+
+    assert result == {"a/a-repo": expected_repo, "b/b-repo": None}
+
+
+@pytest.mark.parametrize(
+    "api_url, expected",
+    [
+        ("https://api.github.com", "https://github.com"),
+        ("https://api.github.com/", "https://github.com"),
+        ("https://github.example.com/api/v3", "https://github.example.com"),
+    ],
+)
+def test_github_web_url(api_url: str, expected: str) -> None:
+    assert github_web_url(api_url) == expected
@@ -0,0 +1,88 @@
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List
+
+from gitea_github_sync.history import HistoryRecorder, MigrationRecord, load_history
+from gitea_github_sync.repository import Repository, Visibility
+
+from .conftest import FakeClock
+
+A_REPO = Repository("some-team/a-repo", Visibility.PUBLIC, size_kb=512)
+B_REPO = Repository("some-team/b-repo", Visibility.PRIVATE)
+FINISHED_AT = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def test_migration_record_json_round_trip() -> None:
+    record = MigrationRecord("some-team/a-repo", "gitea", 512, 12.5, True, FINISHED_AT)
+
+    assert MigrationRecord.from_json(record.to_json()) == record
+
+
+def test_history_recorder(tmp_path: Path, clock: FakeClock) -> None:
+    path = tmp_path / "state" / "history.jsonl"
+    recorder = HistoryRecorder(path, "git", clock=clock)
+
+    recorder.start(A_REPO)
+    recorder.start(B_REPO)
+    clock.now += 5
+    recorder.finish(B_REPO, succeeded=False)
+    clock.now += 5
+    recorder.finish(A_REPO, succeeded=True)
+    recorder.finish(A_REPO, succeeded=True)
+
+    records = load_history(path)
+    assert [(r.full_repo_name, r.size_kb, r.seconds, r.succeeded) for r in records] == [
+        ("some-team/b-repo", None, 5.0, False),
+        ("some-team/a-repo", 512, 10.0, True),
+    ]
+    assert {record.engine for record in records} == {"git"}
+
+
+def test_history_recorder_write_error(tmp_path: Path) -> None:
+    (tmp_path / "not-a-directory").write_text("")
+    errors: List[OSError] = []
+    recorder = HistoryRecorder(
+        tmp_path / "not-a-directory" / "history.jsonl", "gitea", on_error=errors.append
+    )
+
+    for repo in [A_REPO, B_REPO]:
+        recorder.start(repo)
+        recorder.finish(repo, succeeded=True)
+
+    assert len(errors) == 1
+
+
+def test_history_recorder_trims_history(tmp_path: Path) -> None:
+    path = tmp_path / "history.jsonl"
+    old = MigrationRecord("some-team/old-repo", "gitea", None, 1.0, True, FINISHED_AT)
+    path.write_text("".join(f"{old.to_json()}\n" for _ in range(5)))
+    recorder = HistoryRecorder(path, "gitea", max_records=3)
+
+    for repo in [A_REPO, B_REPO]:
+        recorder.start(repo)
+        recorder.finish(repo, succeeded=True)
+
+    assert [r.full_repo_name for r in load_history(path)] == [
+        "some-team/old-repo",
+        "some-team/old-repo",
+        "some-team/old-repo",
+        "some-team/a-repo",
+        "some-team/b-repo",
+    ]
+
+
+def test_load_history(tmp_path: Path) -> None:
+    path = tmp_path / "history.jsonl"
+    lines = [
+        MigrationRecord(f"some-team/repo-{i}", engine, None, i, True, FINISHED_AT).to_json()
+        for i, engine in enumerate(["gitea", "git", "gitea", "gitea"])
+    ]
+    path.write_text("\n".join([lines[0], "not json", '{"engine": "gitea"}', *lines[1:]]) + "\n")
+
+    assert [r.seconds for r in load_history(path)] == [0, 1, 2, 3]
+    assert [r.seconds for r in load_history(path, "gitea")] == [0, 2, 3]
+    assert [r.seconds for r in load_history(path, "gitea", limit=2)] == [2, 3]
+
+
+def test_load_history_missing_file(tmp_path: Path) -> None:
+    assert load_history(tmp_path / "history.jsonl") == []
@@ -1,9 +1,36 @@
-from typing import List
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from unittest.mock import MagicMock, patch
 
 import pytest
+from github import Github
 
-from gitea_github_sync.migration import list_missing_github_repos
+from gitea_github_sync.gitea import (
+    Gitea,
+    GiteaDeleteError,
+    GiteaEditError,
+    GiteaMigrationError,
+)
+from gitea_github_sync.migration import (
+    OwnerMapping,
+    RepoOperationError,
+    delete_repos,
+    edit_repos,
+    iter_missing_github_repos,
+    list_conflicting_github_repos,
+    list_missing_github_repos,
+    list_orphan_mirror_candidates,
+    list_orphan_mirrors,
+    migrate_repos,
+    parse_github_full_repo_name,
+    probe_missing_github_repos,
+)
 from gitea_github_sync.repository import Repository, Visibility
+from gitea_github_sync.throttling import AIMDController, CircuitBreaker
 
 
 def r(org_name: str, repo_name: str) -> Repository:
@@ -47,3 +74,487 @@ def test_list_missing_github_repos(
     result = list_missing_github_repos(gh_repos=gh_repos, gitea_repos=gt_repos)
 
     assert result == expected_diff
+
+
+def test_migrate_repos() -> None:
+    repos = [team_a_repo("a-repo"), team_a_repo("b-repo"), team_a_repo("c-repo")]
+    started: List[Repository] = []
+    results: List[Tuple[Repository, Optional[GiteaMigrationError]]] = []
+
+    def migrate(repo: Repository) -> None:
+        if repo.get_repo_name() == "b-repo":
+            raise GiteaMigrationError(repo.full_repo_name)
+
+    summary = migrate_repos(
+        repos,
+        migrate,
+        on_start=started.append,
+        on_result=lambda repo, error: results.append((repo, error)),
+    )
+
+    assert summary.migrated == 2
+    assert summary.failed == 1
+    assert summary.total == 3
+    assert started == repos
+    assert results == [
+        (team_a_repo("a-repo"), None),
+        (team_a_repo("b-repo"), GiteaMigrationError("team-a/b-repo")),
+        (team_a_repo("c-repo"), None),
+    ]
+
+
+def test_migrate_repos_concurrently() -> None:
+    repos = [team_a_repo(f"repo-{i}") for i in range(20)]
+    lock = threading.Lock()
+    in_flight = 0
+    max_in_flight = 0
+
+    def migrate(repo: Repository) -> None:
+        nonlocal in_flight, max_in_flight
+        with lock:
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+        time.sleep(0.01)
+        with lock:
+            in_flight -= 1
+
+    summary = migrate_repos(repos, migrate, concurrency=4)
+
+    assert summary.migrated == 20
+    assert 1 < max_in_flight <= 4
+
+
+def test_migrate_repos_adaptive_concurrency() -> None:
+    repos = [team_a_repo(f"repo-{i}") for i in range(40)]
+    lock = threading.Lock()
+    in_flight = 0
+    max_in_flight = 0
+    controller = AIMDController(min_limit=1, max_limit=4)
+
+    def migrate(repo: Repository) -> None:
+        nonlocal in_flight, max_in_flight
+        with lock:
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+        time.sleep(0.005)
+        with lock:
+            in_flight -= 1
+        if repos.index(repo) >= 30:
+            raise GiteaMigrationError(repo.full_repo_name, status_code=503)
+
+    summary = migrate_repos(repos, migrate, concurrency=1, controller=controller)
+
+    assert summary.migrated == 30
+    assert 1 < max_in_flight <= 4
+    assert controller.limit < 4
+
+
+def test_migrate_repos_circuit_breaker() -> None:
+    repos = [team_a_repo(f"repo-{i}") for i in range(10)]
+    started: List[Repository] = []
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=0.01, max_trips=2)
+
+    def migrate(repo: Repository) -> None:
+        raise GiteaMigrationError(repo.full_repo_name, unreachable=True)
+
+    summary = migrate_repos(repos, migrate, on_start=started.append, breaker=breaker)
+
+    # 3 failures open the circuit, then one failed probe before giving up
+    assert started == repos[:4]
+    assert summary.failed == 4
+    assert summary.skipped
+    assert summary.nb_remaining == 6
+
+
+def test_migrate_repos_circuit_breaker_stops_reading_repos() -> None:
+    nb_read = 0
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=0.01, max_trips=2)
+
+    def repos() -> Iterator[Repository]:
+        nonlocal nb_read
+        for i in range(1000):
+            nb_read += 1
+            yield team_a_repo(f"repo-{i}")
+
+    def migrate(repo: Repository) -> None:
+        raise GiteaMigrationError(repo.full_repo_name, unreachable=True)
+
+    summary = migrate_repos(repos(), migrate, breaker=breaker)
+
+    assert summary.skipped
+    assert summary.nb_remaining is None
+    assert nb_read == 4
+
+
+def test_migrate_repos_circuit_breaker_recovers() -> None:
+    repos = [team_a_repo(f"repo-{i}") for i in range(10)]
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.01)
+    failures = 0
+
+    def migrate(repo: Repository) -> None:
+        nonlocal failures
+        if failures < 3:
+            failures += 1
+            raise GiteaMigrationError(repo.full_repo_name, status_code=502)
+
+    summary = migrate_repos(repos, migrate, breaker=breaker)
+
+    assert summary.failed == 3
+    assert summary.migrated == 7
+    assert not summary.skipped
+    assert not breaker.is_open
+
+
+def test_migrate_repos_circuit_breaker_ignores_repository_errors() -> None:
+    repos = [team_a_repo(f"repo-{i}") for i in range(5)]
+    breaker = CircuitBreaker(failure_threshold=1)
+
+    def migrate(repo: Repository) -> None:
+        raise GiteaMigrationError(repo.full_repo_name, status_code=409)
+
+    summary = migrate_repos(repos, migrate, breaker=breaker)
+
+    assert summary.failed == 5
+    assert not breaker.is_open
+
+
+def test_migrate_repos_max_duration() -> None:
+    repos = [team_a_repo(f"repo-{i}") for i in range(10)]
+    now = 0.0
+
+    def migrate(repo: Repository) -> None:
+        nonlocal now
+        now += 10
+
+    with patch("gitea_github_sync.migration.time.monotonic", lambda: now):
+        summary = migrate_repos(repos, migrate, max_duration=25)
+
+    # Migrations start at 0, 10 and 20 seconds, none after the deadline
+    assert summary.migrated == 3
+    assert summary.deferred
+    assert summary.nb_remaining == 7
+
+
+def test_migrate_repos_max_duration_stops_reading_repos() -> None:
+    nb_read = 0
+
+    def repos() -> Iterator[Repository]:
+        nonlocal nb_read
+        for i in range(1000):
+            nb_read += 1
+            yield team_a_repo(f"repo-{i}")
+
+    now = 0.0
+
+    def migrate(repo: Repository) -> None:
+        nonlocal now
+        now += 10
+
+    with patch("gitea_github_sync.migration.time.monotonic", lambda: now):
+        summary = migrate_repos(repos(), migrate, max_duration=25)
+
+    assert summary.migrated == 3
+    assert summary.deferred
+    assert summary.nb_remaining is None
+    assert nb_read == 3
+
+
+def test_migrate_repos_max_duration_while_circuit_open() -> None:
+    repos = [team_a_repo(f"repo-{i}") for i in range(5)]
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+
+    def migrate(repo: Repository) -> None:
+        raise GiteaMigrationError(repo.full_repo_name, unreachable=True)
+
+    started = time.monotonic()
+    summary = migrate_repos(repos, migrate, breaker=breaker, max_duration=0.05)
+
+    assert time.monotonic() - started < 1
+    assert summary.failed == 1
+    assert summary.deferred
+    assert summary.nb_remaining == 4
+    assert not summary.skipped
+
+
+def test_migrate_repos_unexpected_error() -> None:
+    def migrate(repo: Repository) -> None:
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        migrate_repos([team_a_repo("a-repo")], migrate)
+
+
+@pytest.mark.parametrize(
+    "gh_repos, gt_repos, owner_mapping, expected_diff",
+    [
+        pytest.param(
+            [team_a_repo("a-repo"), team_b_repo("a-repo")],
+            [r("gitea-a", "a-repo")],
+            OwnerMapping(mapping={"team-a": "gitea-a", "team-b": "gitea-b"}),
+            [team_b_repo("a-repo")],
+            id="same-name-different-owner",
+        ),
+        pytest.param(
+            [team_a_repo("a-repo"), team_b_repo("b-repo")],
+            [r("gitea-user", "A-Repo"), r("other-user", "b-repo")],
+            OwnerMapping(default_owner="gitea-user"),
+            [team_b_repo("b-repo")],
+            id="default-owner-case-insensitive",
+        ),
+        pytest.param(
+            [team_a_repo("a-repo"), team_b_repo("a-repo")],
+            [],
+            OwnerMapping(default_owner="gitea-user"),
+            [team_a_repo("a-repo")],
+            id="conflicting-targets",
+        ),
+        pytest.param(
+            [team_a_repo("a-repo"), team_b_repo("b-repo")],
+            [r("some-user", "b-repo")],
+            OwnerMapping(mapping={"team-a": "gitea-a"}),
+            [team_a_repo("a-repo")],
+            id="unmapped-owner-by-name",
+        ),
+    ],
+)
+def test_list_missing_github_repos_with_owner_mapping(
+    gh_repos: List[Repository],
+    gt_repos: List[Repository],
+    owner_mapping: OwnerMapping,
+    expected_diff: List[Repository],
+) -> None:
+    result = list_missing_github_repos(
+        gh_repos=gh_repos, gitea_repos=gt_repos, owner_mapping=owner_mapping
+    )
+
+    assert result == expected_diff
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_iter_missing_github_repos(seed: int, tmp_path: Path) -> None:
+    rng = random.Random(seed)
+    owners = ["team-a", "team-b", "team-c"]
+    gh_repos = [
+        Repository(
+            f"{rng.choice(owners)}/repo-{rng.randint(0, 40)}",
+            rng.choice([Visibility.PUBLIC, Visibility.PRIVATE]),
+            pushed_at=datetime(2023, 1, rng.randint(1, 28), tzinfo=timezone.utc),
+            size_kb=rng.randint(0, 1000),
+        )
+        for _ in range(60)
+    ]
+    gt_repos = [r(rng.choice(["gitea-a", "gitea-user"]), f"repo-{i}") for i in range(0, 40, 3)]
+    owner_mapping = OwnerMapping(mapping={"team-a": "gitea-a"}, default_owner="gitea-user")
+    conflicts: List[Repository] = []
+
+    result = list(
+        iter_missing_github_repos(
+            gh_repos,
+            gt_repos,
+            owner_mapping,
+            on_conflict=conflicts.append,
+            run_size=7,
+            directory=tmp_path,
+        )
+    )
+
+    expected = list_missing_github_repos(gh_repos, gt_repos, owner_mapping)
+    assert sorted(result, key=gh_repos.index) == expected
+    assert sorted(conflicts, key=gh_repos.index) == list_conflicting_github_repos(
+        gh_repos, owner_mapping
+    )
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_iter_missing_github_repos_without_owner_mapping() -> None:
+    gh_repos = [team_a_repo("b-repo"), team_a_repo("a-repo"), team_b_repo("c-repo")]
+
+    result = iter_missing_github_repos(gh_repos, [team_b_repo("a-repo")])
+
+    assert list(result) == [team_a_repo("b-repo"), team_b_repo("c-repo")]
+
+
+def test_iter_missing_github_repos_keeps_every_field() -> None:
+    repo = Repository(
+        "team-a/a-repo",
+        Visibility.PRIVATE,
+        pushed_at=datetime(2023, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+        mirror_interval="8h0m0s",
+        original_url="https://github.com/team-a/a-repo",
+        archived=True,
+        size_kb=1234,
+        description="Some [description]",
+    )
+
+    result = iter_missing_github_repos([repo], [], run_size=1)
+
+    assert list(result) == [repo]
+
+
+def test_list_conflicting_github_repos() -> None:
+    gh_repos = [team_a_repo("a-repo"), team_b_repo("a-repo"), team_b_repo("b-repo")]
+
+    assert list_conflicting_github_repos(gh_repos) == [team_b_repo("a-repo")]
+    assert (
+        list_conflicting_github_repos(
+            gh_repos, OwnerMapping(mapping={"team-b": "gitea-b"}, default_owner="gitea-user")
+        )
+        == []
+    )
+
+
+def test_owner_mapping() -> None:
+    owner_mapping = OwnerMapping(mapping={"team-a": "gitea-a"}, default_owner="gitea-user")
+
+    assert owner_mapping.get_gitea_owner(team_a_repo("a-repo")) == "gitea-a"
+    assert owner_mapping.get_gitea_full_repo_name(team_b_repo("a-repo")) == "gitea-user/a-repo"
+    assert OwnerMapping().get_gitea_full_repo_name(team_b_repo("a-repo")) is None
+
+
+def test_probe_missing_github_repos() -> None:
+    mock_gitea = MagicMock(spec_set=Gitea)
+    mock_gitea.repo_exists.side_effect = lambda full_repo_name: full_repo_name == "gitea-a/a-repo"
+    gh_repos = [team_a_repo("a-repo"), team_a_repo("b-repo"), team_b_repo("b-repo")]
+
+    result = probe_missing_github_repos(
+        mock_gitea,
+        gh_repos,
+        OwnerMapping(mapping={"team-a": "gitea-a"}, default_owner="gitea-user"),
+        concurrency=2,
+    )
+
+    assert result == [team_a_repo("b-repo"), team_b_repo("b-repo")]
+    assert mock_gitea.repo_exists.call_count == 3
+
+
+def test_probe_missing_github_repos_without_default_owner() -> None:
+    with pytest.raises(ValueError):
+        probe_missing_github_repos(MagicMock(spec_set=Gitea), [], OwnerMapping())
+
+
+def test_edit_repos() -> None:
+    mock_gitea = MagicMock(spec_set=Gitea)
+
+    def edit_repo(full_repo_name: str, changes: Dict[str, Any]) -> None:
+        if full_repo_name == "gitea-user/b-repo":
+            raise GiteaEditError(full_repo_name)
+
+    mock_gitea.edit_repo.side_effect = edit_repo
+    results: List[Tuple[str, Optional[RepoOperationError]]] = []
+
+    summary = edit_repos(
+        mock_gitea,
+        [("gitea-user/a-repo", {"private": True}), ("gitea-user/b-repo", {"private": False})],
+        concurrency=2,
+        on_result=lambda name, error: results.append((name, error)),
+    )
+
+    assert summary.updated == ["gitea-user/a-repo"]
+    assert summary.failed == ["gitea-user/b-repo"]
+    assert summary.total == 2
+    assert sorted(results, key=lambda result: result[0]) == [
+        ("gitea-user/a-repo", None),
+        ("gitea-user/b-repo", GiteaEditError("gitea-user/b-repo")),
+    ]
+    mock_gitea.edit_repo.assert_any_call("gitea-user/a-repo", {"private": True})
+
+
+def test_edit_repos_unexpected_error() -> None:
+    mock_gitea = MagicMock(spec_set=Gitea)
+    mock_gitea.edit_repo.side_effect = RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        edit_repos(mock_gitea, [("gitea-user/a-repo", {"private": True})])
+
+
+def test_delete_repos() -> None:
+    mock_gitea = MagicMock(spec_set=Gitea)
+    mock_gitea.delete_repo.side_effect = [None, GiteaDeleteError("gitea-user/b-repo")]
+
+    summary = delete_repos(mock_gitea, ["gitea-user/a-repo", "gitea-user/b-repo"])
+
+    assert summary.updated == ["gitea-user/a-repo"]
+    assert summary.failed == ["gitea-user/b-repo"]
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        ("https://github.com/some-team/a-repo", "some-team/a-repo"),
+        ("https://github.com/some-team/a-repo.git", "some-team/a-repo"),
+        ("https://github.com/some-team/a-repo/", "some-team/a-repo"),
+        ("https://gitlab.com/some-team/a-repo", None),
+        ("https://github.com/some-team", None),
+        ("", None),
+    ],
+)
+def test_parse_github_full_repo_name(url: str, expected: Optional[str]) -> None:
+    assert parse_github_full_repo_name(url) == expected
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        ("https://github.example.com/some-team/a-repo.git", "some-team/a-repo"),
+        ("https://github.com/some-team/a-repo", None),
+    ],
+)
+def test_parse_github_full_repo_name_enterprise(url: str, expected: Optional[str]) -> None:
+    assert parse_github_full_repo_name(url, "https://github.example.com") == expected
+
+
+def mirror(full_repo_name: str, source: str) -> Repository:
+    return Repository(
+        full_repo_name=full_repo_name,
+        visibility=Visibility.PUBLIC,
+        original_url=f"https://github.com/{source}",
+    )
+
+
+ORPHAN_GITEA_REPOS = [
+    mirror("gitea-user/a-repo", "team-a/a-repo"),
+    mirror("gitea-user/b-repo", "team-a/B-Repo"),
+    mirror("gitea-b/c-repo", "team-b/c-repo"),
+    mirror("someone-else/d-repo", "team-b/d-repo"),
+    mirror("gitea-b/a-repo-copy", "team-a/a-repo"),
+    r("gitea-user", "not-a-mirror"),
+]
+
+
+def test_list_orphan_mirror_candidates() -> None:
+    result = list_orphan_mirror_candidates(
+        gitea_repos=ORPHAN_GITEA_REPOS,
+        gh_repos=[team_a_repo("b-repo")],
+        owner_mapping=OwnerMapping(mapping={"team-b": "gitea-b"}, default_owner="gitea-user"),
+    )
+
+    assert result == {
+        "gitea-user/a-repo": ("team-a/a-repo", mirror("gitea-user/a-repo", "team-a/a-repo")),
+        "gitea-b/c-repo": ("team-b/c-repo", mirror("gitea-b/c-repo", "team-b/c-repo")),
+        "gitea-b/a-repo-copy": ("team-a/a-repo", mirror("gitea-b/a-repo-copy", "team-a/a-repo")),
+    }
+
+
+@patch("gitea_github_sync.migration.github.get_repositories", autospec=True)
+def test_list_orphan_mirrors(mock_get_repositories: MagicMock) -> None:
+    mock_gh = MagicMock(spec_set=Github)
+    mock_get_repositories.return_value = {
+        "team-a/a-repo": None,
+        "team-b/c-repo": team_b_repo("c-repo"),
+    }
+
+    result = list_orphan_mirrors(
+        gh=mock_gh,
+        gitea_repos=ORPHAN_GITEA_REPOS,
+        gh_repos=[team_a_repo("b-repo")],
+        owner_mapping=OwnerMapping(mapping={"team-b": "gitea-b"}, default_owner="gitea-user"),
+        concurrency=2,
+    )
+
+    assert result == [
+        mirror("gitea-user/a-repo", "team-a/a-repo"),
+        mirror("gitea-b/a-repo-copy", "team-a/a-repo"),
+    ]
+    mock_get_repositories.assert_called_once_with(
+        mock_gh, ["team-a/a-repo", "team-b/c-repo"], concurrency=2
+    )
@@ -0,0 +1,120 @@
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+import pytest
+
+from gitea_github_sync.config import DEFAULT_MIRROR_INTERVAL_TIERS, MirrorIntervalTier
+from gitea_github_sync.migration import OwnerMapping
+from gitea_github_sync.mirror_interval import (
+    MirrorIntervalUpdate,
+    list_mirror_interval_updates,
+    parse_duration,
+    select_mirror_interval,
+)
+from gitea_github_sync.repository import Repository, Visibility
+
+NOW = datetime(2023, 6, 1, tzinfo=timezone.utc)
+
+
+def gh_repo(name: str, days_since_push: Optional[int]) -> Repository:
+    return Repository(
+        full_repo_name=f"some-team/{name}",
+        visibility=Visibility.PUBLIC,
+        pushed_at=None if days_since_push is None else NOW - timedelta(days=days_since_push),
+    )
+
+
+def gitea_mirror(name: str, mirror_interval: Optional[str]) -> Repository:
+    return Repository(
+        full_repo_name=f"gitea-user/{name}",
+        visibility=Visibility.PUBLIC,
+        mirror_interval=mirror_interval,
+    )
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("8h0m0s", timedelta(hours=8)),
+        ("10m", timedelta(minutes=10)),
+        ("1h30m", timedelta(hours=1, minutes=30)),
+        ("1.5h", timedelta(hours=1, minutes=30)),
+        ("500ms", timedelta(milliseconds=500)),
+    ],
+)
+def test_parse_duration(value: str, expected: timedelta) -> None:
+    assert parse_duration(value) == expected
+
+
+@pytest.mark.parametrize("value", ["", "8", "8d", "h8"])
+def test_parse_duration_invalid(value: str) -> None:
+    with pytest.raises(ValueError):
+        parse_duration(value)
+
+
+@pytest.mark.parametrize(
+    "days_since_push, expected",
+    [
+        (0, "10m"),
+        (7, "10m"),
+        (8, "1h"),
+        (90, "8h"),
+        (1000, "24h"),
+        (None, "24h"),
+    ],
+)
+def test_select_mirror_interval(days_since_push: Optional[int], expected: str) -> None:
+    repo = gh_repo("a-repo", days_since_push)
+
+    assert select_mirror_interval(repo, DEFAULT_MIRROR_INTERVAL_TIERS, NOW) == expected
+
+
+def test_select_mirror_interval_without_catch_all() -> None:
+    tiers = [MirrorIntervalTier(max_inactivity_days=7, mirror_interval="10m")]
+
+    assert select_mirror_interval(gh_repo("a-repo", 30), tiers, NOW) == "10m"
+    assert select_mirror_interval(gh_repo("a-repo", 30), [], NOW) is None
+
+
+@pytest.mark.parametrize(
+    "gitea_repos, expected",
+    [
+        pytest.param(
+            [gitea_mirror("a-repo", "8h0m0s")],
+            [MirrorIntervalUpdate("gitea-user/a-repo", "8h0m0s", "10m")],
+            id="hot-repo",
+        ),
+        pytest.param([gitea_mirror("a-repo", "10m0s")], [], id="already-tuned"),
+        pytest.param(
+            [gitea_mirror("a-repo", "invalid")],
+            [MirrorIntervalUpdate("gitea-user/a-repo", "invalid", "10m")],
+            id="invalid-interval",
+        ),
+        pytest.param([gitea_mirror("a-repo", None)], [], id="not-a-mirror"),
+        pytest.param([gitea_mirror("other-repo", "8h0m0s")], [], id="not-mirrored"),
+    ],
+)
+def test_list_mirror_interval_updates(
+    gitea_repos: List[Repository], expected: List[MirrorIntervalUpdate]
+) -> None:
+    result = list_mirror_interval_updates(
+        gh_repos=[gh_repo("a-repo", 1)],
+        gitea_repos=gitea_repos,
+        owner_mapping=OwnerMapping(default_owner="gitea-user"),
+        tiers=DEFAULT_MIRROR_INTERVAL_TIERS,
+        now=NOW,
+    )
+
+    assert result == expected
+
+
+def test_list_mirror_interval_updates_unknown_owner() -> None:
+    result = list_mirror_interval_updates(
+        gh_repos=[gh_repo("a-repo", 1)],
+        gitea_repos=[gitea_mirror("a-repo", "8h0m0s")],
+        owner_mapping=OwnerMapping(),
+        tiers=DEFAULT_MIRROR_INTERVAL_TIERS,
+        now=NOW,
+    )
+
+    assert result == []
@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+import pytest
+from pydantic import ValidationError
+
+from gitea_github_sync.config import MigrationPriority
+from gitea_github_sync.priority import prioritize, priority_key
+from gitea_github_sync.repository import Repository, Visibility
+
+NOW = datetime(2024, 6, 1, tzinfo=timezone.utc)
+
+
+def repo(
+    full_repo_name: str, pushed_days_ago: Optional[float] = None, size_kb: Optional[int] = None
+) -> Repository:
+    pushed_at = None if pushed_days_ago is None else NOW - timedelta(days=pushed_days_ago)
+    return Repository(full_repo_name, Visibility.PUBLIC, pushed_at=pushed_at, size_kb=size_kb)
+
+
+REPOS = [
+    repo("some-team/dormant", pushed_days_ago=400, size_kb=10),
+    repo("some-team/big-active", pushed_days_ago=1, size_kb=90_000),
+    repo("some-team/never-pushed"),
+    repo("some-team/small-active", pushed_days_ago=3, size_kb=200),
+    repo("other-team/important", pushed_days_ago=200, size_kb=5000),
+    repo("some-team/unknown-size", pushed_days_ago=2),
+]
+
+
+def names(repos: List[Repository]) -> List[str]:
+    return [r.full_repo_name.split("/")[1] for r in repos]
+
+
+def test_prioritize_defaults() -> None:
+    result = prioritize(REPOS, MigrationPriority(), NOW)
+
+    assert names(result) == [
+        "small-active",
+        "big-active",
+        "unknown-size",
+        "important",
+        "dormant",
+        "never-pushed",
+    ]
+
+
+def test_prioritize_listed_repos() -> None:
+    priority = MigrationPriority(repos=["Other-Team/*", "some-team/dormant"])
+
+    result = prioritize(REPOS, priority, NOW)
+
+    assert names(result)[:3] == ["important", "dormant", "small-active"]
+
+
+def test_prioritize_custom_order() -> None:
+    priority = MigrationPriority(order=["small"])
+
+    result = prioritize(REPOS, priority, NOW)
+
+    # Repositories of unknown size keep their Github order at the end
+    assert names(result) == [
+        "dormant",
+        "small-active",
+        "important",
+        "big-active",
+        "never-pushed",
+        "unknown-size",
+    ]
+
+
+def test_priority_key_recent_days() -> None:
+    priority = MigrationPriority(order=["recent"], recent_days=30)
+
+    assert priority_key(repo("some-team/a", pushed_days_ago=29), priority, NOW) == (0,)
+    assert priority_key(repo("some-team/a", pushed_days_ago=31), priority, NOW) == (1,)
+    assert priority_key(repo("some-team/a", pushed_days_ago=-1), priority, NOW) == (0,)
+
+
+def test_migration_priority_unknown_criterion() -> None:
+    with pytest.raises(ValidationError):
+        MigrationPriority(order=["largest"])  # type: ignore[list-item]
+
+
+@pytest.mark.parametrize("recent_days", [0, -7])
+def test_migration_priority_invalid_recent_days(recent_days: int) -> None:
+    with pytest.raises(ValidationError):
+        MigrationPriority(recent_days=recent_days)
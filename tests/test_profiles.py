@@ -0,0 +1,98 @@
+from typing import List
+
+import pytest
+from pydantic import ValidationError
+
+from gitea_github_sync.config import MigrationProfile
+from gitea_github_sync.profiles import (
+    migration_options,
+    select_migration_options,
+    select_profile,
+)
+from gitea_github_sync.repository import Repository, Visibility
+
+PROFILES = [
+    MigrationProfile(name="docs", patterns=["*/docs-*"], wiki=True),
+    MigrationProfile(name="team", owners=["Some-Team"], mirror=False, issues=True, labels=True),
+    MigrationProfile(name="everything-else", mirror=False, releases=True),
+]
+
+
+def r(full_repo_name: str, size_kb: int = 0) -> Repository:
+    return Repository(full_repo_name, Visibility.PUBLIC, size_kb=size_kb)
+
+
+@pytest.mark.parametrize(
+    "full_repo_name, expected",
+    [
+        ("some-team/docs-site", "docs"),
+        ("some-team/a-repo", "team"),
+        ("SOME-TEAM/b-repo", "team"),
+        ("other-team/a-repo", "everything-else"),
+    ],
+)
+def test_select_profile(full_repo_name: str, expected: str) -> None:
+    profile = select_profile(r(full_repo_name), PROFILES)
+
+    assert profile is not None
+    assert profile.name == expected
+
+
+def test_select_profile_requires_owner_and_pattern() -> None:
+    profiles = [MigrationProfile(name="p", owners=["some-team"], patterns=["*/docs-*"])]
+
+    assert select_profile(r("other-team/docs-site"), profiles) is None
+    assert select_profile(r("some-team/a-repo"), profiles) is None
+    assert select_profile(r("some-team/docs-site"), profiles) == profiles[0]
+
+
+def test_select_migration_options_without_profile() -> None:
+    profiles: List[MigrationProfile] = []
+
+    assert select_migration_options(r("some-team/a-repo"), profiles) is None
+
+
+def test_migration_options() -> None:
+    profile = MigrationProfile(
+        name="full",
+        mirror=False,
+        wiki=True,
+        lfs=True,
+        lfs_endpoint="https://lfs.example.com",
+        issues=True,
+    )
+
+    assert migration_options(r("some-team/a-repo"), profile) == {
+        "mirror": False,
+        "wiki": True,
+        "lfs": True,
+        "lfs_endpoint": "https://lfs.example.com",
+        "issues": True,
+        "labels": False,
+        "milestones": False,
+        "releases": False,
+        "pull_requests": False,
+    }
+
+
+@pytest.mark.parametrize(
+    "component", ["issues", "labels", "milestones", "releases", "pull_requests"]
+)
+def test_migration_profile_rejects_components_dropped_by_mirrors(component: str) -> None:
+    with pytest.raises(ValidationError, match="mirror: false"):
+        MigrationProfile.model_validate({"name": "p", component: True})
+
+
+@pytest.mark.parametrize(
+    "size_kb, expected_lfs",
+    [(1024 * 1024, True), (2 * 1024 * 1024, False)],
+)
+def test_migration_options_lfs_size_threshold(size_kb: int, expected_lfs: bool) -> None:
+    profile = MigrationProfile(
+        name="lfs", lfs=True, lfs_endpoint="https://lfs.example.com", lfs_max_repo_size_gb=1
+    )
+
+    options = migration_options(r("some-team/a-repo", size_kb=size_kb), profile)
+
+    assert options["lfs"] is expected_lfs
+    assert ("lfs_endpoint" in options) is expected_lfs
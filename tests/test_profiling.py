@@ -0,0 +1,112 @@
+import pstats
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List
+from unittest.mock import MagicMock, patch
+
+import pytest
+from click.testing import CliRunner
+
+from gitea_github_sync import profiling
+from gitea_github_sync.cli import cli
+from gitea_github_sync.repository import Repository, Visibility
+
+
+def fibonacci(n: int) -> int:
+    return n if n < 2 else fibonacci(n - 1) + fibonacci(n - 2)
+
+
+def allocate() -> List[str]:
+    with profiling.section("test.allocate"):
+        return [str(i) * 10 for i in range(10_000)]
+
+
+def test_section_disabled() -> None:
+    with profiling.section("test.disabled"):
+        pass
+
+    assert "test.disabled" not in profiling._sections.stats
+
+
+def test_profiler_cprofile(tmp_path: Path) -> None:
+    profiler = profiling.Profiler(kind="cprofile", output_dir=tmp_path, name="profile")
+    profiler.start()
+    fibonacci(15)
+    allocate()
+    allocate()
+    written = profiler.stop()
+
+    assert sorted(path.name for path in written) == [
+        "profile.collapsed",
+        "profile.pstats",
+        "profile.sections.txt",
+    ]
+    stats = pstats.Stats(str(tmp_path / "profile.pstats"))
+    assert stats.total_calls > 0  # type: ignore[attr-defined]
+    collapsed = (tmp_path / "profile.collapsed").read_text().splitlines()
+    assert any(line.startswith("fibonacci (test_profiling.py:") for line in collapsed)
+    assert all(int(line.rsplit(" ", 1)[1]) > 0 for line in collapsed)
+    sections = (tmp_path / "profile.sections.txt").read_text()
+    assert sections.startswith("test.allocate\tcalls=2\t")
+
+
+def test_profiler_cprofile_threads(tmp_path: Path) -> None:
+    profiler = profiling.Profiler(kind="cprofile", output_dir=tmp_path, name="profile")
+    profiler.start()
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        list(executor.map(fibonacci, [12, 13]))
+    profiler.stop()
+
+    stats = pstats.Stats(str(tmp_path / "profile.pstats"))
+    functions = {name for _, _, name in stats.stats}  # type: ignore[attr-defined]
+    assert "fibonacci" in functions
+
+
+def test_profiler_tracemalloc(tmp_path: Path) -> None:
+    profiler = profiling.Profiler(kind="tracemalloc", output_dir=tmp_path, name="profile", top=5)
+    profiler.start()
+    kept = allocate()
+    written = profiler.stop()
+
+    assert sorted(path.name for path in written) == ["profile.memory.txt", "profile.sections.txt"]
+    memory = (tmp_path / "profile.memory.txt").read_text().splitlines()
+    assert 0 < len(memory) <= 5
+    assert "test_profiling.py" in memory[0]
+    sections = (tmp_path / "profile.sections.txt").read_text()
+    assert "net_allocated_kib=" in sections
+    assert "net_allocated_kib=0.0" not in sections
+    assert kept
+
+
+@pytest.mark.parametrize(
+    "profile_args, expected_files",
+    [
+        (["--profile"], ["pstats", "collapsed", "sections.txt"]),
+        (["--profile=tracemalloc"], ["memory.txt", "sections.txt"]),
+    ],
+)
+@patch("gitea_github_sync.cli.github.get_github", autospec=True)
+@patch("gitea_github_sync.cli.github.list_all_repositories", autospec=True)
+def test_cli_profile(
+    mock_list_all_repositories: MagicMock,
+    mock_get_github: MagicMock,
+    profile_args: List[str],
+    expected_files: List[str],
+    tmp_path: Path,
+) -> None:
+    mock_list_all_repositories.return_value = [Repository("some-team/a-repo", Visibility.PUBLIC)]
+
+    runner = CliRunner()
+    result = runner.invoke(
+        cli,
+        [*profile_args, "--profile-dir", str(tmp_path), "list-all-github-repositories"],
+    )
+
+    assert result.exit_code == 0
+    kind = "tracemalloc" if "tracemalloc" in profile_args[0] else "cprofile"
+    name = f"gitea-github-sync-list-all-github-repositories-{kind}"
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted(
+        f"{name}.{suffix}" for suffix in expected_files
+    )
+    assert "cli.print_repositories" in (tmp_path / f"{name}.sections.txt").read_text()
+    assert "Profile written to" in result.output
@@ -0,0 +1,123 @@
+import io
+import time
+from typing import Optional
+
+import pytest
+from rich.console import Console
+
+from gitea_github_sync.gitea import GiteaMigrationError
+from gitea_github_sync.migration import migrate_repos
+from gitea_github_sync.progress import (
+    LogProgressReporter,
+    MigrationProgress,
+    RichProgressReporter,
+    format_duration,
+    get_progress_reporter,
+)
+from gitea_github_sync.repository import Repository, Visibility
+
+from .conftest import FakeClock
+
+A_REPO = Repository("some-team/a-repo", Visibility.PUBLIC)
+B_REPO = Repository("some-team/b-repo", Visibility.PUBLIC)
+C_REPO = Repository("some-team/c-repo", Visibility.PRIVATE)
+
+
+def test_migration_progress_snapshot(clock: FakeClock) -> None:
+    progress = MigrationProgress(total=4, clock=clock)
+    progress.start(A_REPO)
+    progress.start(B_REPO)
+    clock.now += 10
+    progress.finish(A_REPO, failed=False)
+    progress.start(C_REPO)
+    clock.now += 10
+    progress.finish(B_REPO, failed=True)
+
+    snapshot = progress.snapshot()
+
+    assert (snapshot.migrated, snapshot.failed, snapshot.in_flight) == (1, 1, 1)
+    assert snapshot.elapsed == 20
+    assert snapshot.average_duration == 15
+    assert snapshot.throughput == 0.1
+    assert snapshot.eta == 20
+    assert snapshot.to_log_line() == (
+        "progress done=2/4 migrated=1 failed=1 in_flight=1 avg=15.0s throughput=6.0/min "
+        "eta=0:00:20"
+    )
+
+
+def test_migration_progress_moving_average(clock: FakeClock) -> None:
+    progress = MigrationProgress(total=3, window=2, clock=clock)
+    for repo, duration in [(A_REPO, 100), (B_REPO, 10), (C_REPO, 20)]:
+        progress.start(repo)
+        clock.now += duration
+        progress.finish(repo, failed=False)
+
+    assert progress.snapshot().average_duration == 15
+
+
+def test_migration_progress_not_started(clock: FakeClock) -> None:
+    snapshot = MigrationProgress(total=3, clock=clock).snapshot()
+
+    assert snapshot.average_duration is None
+    assert snapshot.throughput is None
+    assert snapshot.eta is None
+    assert "avg - · - · ETA -" in snapshot.to_status()
+
+
+@pytest.mark.parametrize("seconds, expected", [(None, "-"), (59.6, "0:01:00"), (3725, "1:02:05")])
+def test_format_duration(seconds: Optional[float], expected: str) -> None:
+    assert format_duration(seconds) == expected
+
+
+def test_migration_progress_concurrent_migrations() -> None:
+    repos = [Repository(f"some-team/repo-{i}", Visibility.PUBLIC) for i in range(50)]
+    progress = MigrationProgress(total=len(repos))
+
+    def migrate(repo: Repository) -> None:
+        time.sleep(0.001)
+        if repo.full_repo_name.endswith("7"):
+            raise GiteaMigrationError(repo.full_repo_name)
+
+    migrate_repos(
+        repos,
+        migrate,
+        concurrency=8,
+        on_start=progress.start,
+        on_result=lambda repo, error: progress.finish(repo, error is not None),
+    )
+    snapshot = progress.snapshot()
+
+    assert (snapshot.migrated, snapshot.failed, snapshot.in_flight) == (45, 5, 0)
+
+
+def test_log_progress_reporter() -> None:
+    output = io.StringIO()
+    progress = MigrationProgress(total=2)
+    with LogProgressReporter(progress, interval=0.01, file=output) as reporter:
+        reporter.start(A_REPO)
+        reporter.finish(A_REPO, failed=False)
+        time.sleep(0.05)
+
+    lines = output.getvalue().splitlines()
+    assert lines
+    assert lines[-1].startswith("progress done=1/2 migrated=1 failed=0 in_flight=0")
+
+
+def test_rich_progress_reporter() -> None:
+    output = io.StringIO()
+    console = Console(file=output, force_terminal=True, width=150)
+    with RichProgressReporter(MigrationProgress(total=2), console) as reporter:
+        reporter.start(A_REPO)
+        reporter.finish(A_REPO, failed=True)
+
+    assert "1/2" in output.getvalue()
+    assert "failed 1" in output.getvalue()
+
+
+def test_get_progress_reporter() -> None:
+    terminal = Console(file=io.StringIO(), force_terminal=True)
+    not_terminal = Console(file=io.StringIO(), force_terminal=False)
+
+    assert isinstance(get_progress_reporter(1, terminal), RichProgressReporter)
+    assert isinstance(get_progress_reporter(1, not_terminal), LogProgressReporter)
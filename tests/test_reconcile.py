@@ -0,0 +1,89 @@
+from typing import List
+
+import pytest
+
+from gitea_github_sync.migration import OwnerMapping
+from gitea_github_sync.reconcile import (
+    FieldChange,
+    RepositoryDrift,
+    list_repository_drifts,
+)
+from gitea_github_sync.repository import Repository, Visibility
+
+OWNER_MAPPING = OwnerMapping(mapping={"team-a": "gitea-a"}, default_owner="gitea-user")
+
+
+@pytest.mark.parametrize(
+    "gh_repo, gitea_repo, expected_changes",
+    [
+        pytest.param(
+            Repository("team-a/a-repo", Visibility.PUBLIC, description="A repo"),
+            Repository("gitea-a/a-repo", Visibility.PUBLIC, description="A repo"),
+            [],
+            id="in-sync",
+        ),
+        pytest.param(
+            Repository("team-a/a-repo", Visibility.PUBLIC),
+            Repository("gitea-a/a-repo", Visibility.PRIVATE),
+            [FieldChange("visibility", Visibility.PRIVATE, Visibility.PUBLIC)],
+            id="visibility",
+        ),
+        pytest.param(
+            Repository("team-a/a-repo", Visibility.UNKNOWN),
+            Repository("gitea-a/a-repo", Visibility.PRIVATE),
+            [],
+            id="unknown-visibility",
+        ),
+        pytest.param(
+            Repository("team-b/a-repo", Visibility.PRIVATE, description="New", archived=True),
+            Repository("Gitea-User/a-repo", Visibility.PRIVATE, description="Old"),
+            [FieldChange("description", "Old", "New"), FieldChange("archived", False, True)],
+            id="description-archived",
+        ),
+    ],
+)
+def test_list_repository_drifts(
+    gh_repo: Repository, gitea_repo: Repository, expected_changes: List[FieldChange]
+) -> None:
+    result = list_repository_drifts([gh_repo], [gitea_repo], OWNER_MAPPING)
+
+    expected = [RepositoryDrift(gitea_repo.full_repo_name, expected_changes)]
+    assert result == (expected if expected_changes else [])
+
+
+def test_list_repository_drifts_selected_fields() -> None:
+    gh_repos = [Repository("team-a/a-repo", Visibility.PUBLIC, description="New")]
+    gitea_repos = [Repository("gitea-a/a-repo", Visibility.PRIVATE, description="Old")]
+
+    result = list_repository_drifts(gh_repos, gitea_repos, OWNER_MAPPING, fields=["description"])
+
+    assert result == [RepositoryDrift("gitea-a/a-repo", [FieldChange("description", "Old", "New")])]
+
+
+def test_list_repository_drifts_unmatched_repos() -> None:
+    gh_repos = [
+        Repository("team-a/a-repo", Visibility.PUBLIC),
+        Repository("team-b/b-repo", Visibility.PUBLIC),
+    ]
+    gitea_repos = [Repository("gitea-user/a-repo", Visibility.PRIVATE)]
+
+    assert list_repository_drifts(gh_repos, gitea_repos, OWNER_MAPPING) == []
+    assert list_repository_drifts(gh_repos, gitea_repos, OwnerMapping()) == []
+
+
+def test_repository_drift_to_gitea() -> None:
+    drift = RepositoryDrift(
+        "gitea-a/a-repo",
+        [
+            FieldChange("visibility", Visibility.PRIVATE, Visibility.PUBLIC),
+            FieldChange("description", "Old", None),
+            FieldChange("archived", False, True),
+        ],
+    )
+
+    assert drift.to_gitea() == {"private": False, "description": "", "archived": True}
+    assert [change.to_str() for change in drift.changes] == [
+        "visibility: private -> public",
+        "description: 'Old' -> None",
+        "archived: False -> True",
+    ]
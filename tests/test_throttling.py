@@ -0,0 +1,89 @@
+import pytest
+
+from gitea_github_sync.throttling import AIMDController, CircuitBreaker
+
+from .conftest import FakeClock
+
+
+def test_aimd_controller_additive_increase() -> None:
+    controller = AIMDController(min_limit=1, max_limit=4)
+    limits = []
+    for _ in range(10):
+        controller.record(started_at=0, latency=1, overloaded=False)
+        limits.append(controller.limit)
+
+    assert limits == [2, 2, 2, 3, 3, 3, 4, 4, 4, 4]
+
+
+def test_aimd_controller_holds_when_slow() -> None:
+    controller = AIMDController(min_limit=2, max_limit=4, max_latency=10)
+    controller.record(started_at=0, latency=11, overloaded=False)
+
+    assert controller.limit == 2
+
+
+def test_aimd_controller_multiplicative_decrease(clock: FakeClock) -> None:
+    controller = AIMDController(min_limit=1, max_limit=16, clock=clock)
+    for _ in range(60):
+        controller.record(started_at=0, latency=1, overloaded=False)
+    assert controller.limit == 11
+
+    controller.record(started_at=90, latency=1, overloaded=True)
+    # Migrations started before the decrease belong to the same overload event
+    controller.record(started_at=95, latency=1, overloaded=True)
+    assert controller.limit == 5
+
+    controller.record(started_at=100, latency=1, overloaded=True)
+    assert controller.limit == 2
+
+    clock.now = 200
+    for _ in range(3):
+        controller.record(started_at=150, latency=1, overloaded=True)
+    assert controller.limit == 1
+
+
+def test_aimd_controller_invalid_limits() -> None:
+    with pytest.raises(ValueError):
+        AIMDController(min_limit=4, max_limit=2)
+
+
+def test_circuit_breaker(clock: FakeClock) -> None:
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, max_trips=3, clock=clock)
+
+    breaker.record(overloaded=True)
+    assert breaker.allow()
+    breaker.record(overloaded=True)
+    assert breaker.is_open
+    assert not breaker.allow()
+    assert breaker.retry_in() == 10
+
+    clock.now += 10
+    assert breaker.allow()
+    # A single probe is allowed while half-open
+    assert not breaker.allow()
+    breaker.record(overloaded=True)
+    assert breaker.retry_in() == 20
+
+    clock.now += 20
+    assert breaker.allow()
+    breaker.record(overloaded=False)
+    assert not breaker.is_open
+    assert breaker.trips == 0
+    assert breaker.allow()
+
+
+def test_circuit_breaker_gives_up(clock: FakeClock) -> None:
+    breaker = CircuitBreaker(
+        failure_threshold=1, reset_timeout=10, max_reset_timeout=15, max_trips=3, clock=clock
+    )
+
+    for expected_retry_in in [10, 15]:
+        breaker.record(overloaded=True)
+        assert breaker.retry_in() == expected_retry_in
+        clock.now += expected_retry_in
+        assert breaker.allow()
+    breaker.record(overloaded=True)
+
+    assert breaker.gave_up
+    clock.now += 1000
+    assert not breaker.allow()